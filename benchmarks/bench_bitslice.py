@@ -0,0 +1,49 @@
+"""
+Bit-sliced CRC against per-frame evaluation
+
+Times example.crc_calc over N random 32 bit frames called per frame, per
+frame through bitvec.compile, and once for all frames with bitslice_map.
+
+Run from the repository root:
+python benchmarks/bench_bitslice.py [count]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bitvec  # noqa: E402
+import example  # noqa: E402
+from bitvec.bitslice import bitslice_map, transpose64  # noqa: E402
+from bitvec.rand import BitVecRandom  # noqa: E402
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(n):
+    frames = BitVecRandom(1).uniform(32, n)
+    compiled = bitvec.compile(example.crc_calc)
+    # the first calls trace crc_calc
+    compiled(example.CRC_IN, frames.at(0))
+    bitslice_map(example.crc_calc, example.CRC_IN, frames)
+    plain, expected = timed(lambda: [example.crc_calc(example.CRC_IN, v) for v in frames])
+    fast, _ = timed(lambda: [compiled(example.CRC_IN, v) for v in frames])
+    sliced, result = timed(lambda: bitslice_map(example.crc_calc, example.CRC_IN, frames))
+    assert result.get_val() == [v.get_val() for v in expected]
+    print(f"crc_calc per frame   {plain * 1e3:9.1f}ms")
+    print(f"bitvec.compile       {fast * 1e3:9.1f}ms  x{plain / fast:.1f}")
+    print(f"bitslice_map         {sliced * 1e3:9.1f}ms  x{plain / sliced:.1f}")
+    blocks = -(-n // 64)
+    rows = BitVecRandom(2).uniform(64, blocks * 64).packed
+    elapsed, _ = timed(lambda: transpose64(rows, blocks))
+    print(f"transpose64 of {blocks} blocks: {elapsed * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
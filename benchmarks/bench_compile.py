@@ -0,0 +1,64 @@
+"""
+Benchmark of the @bitvec.compile tracing compiler
+
+Times example.crc_calc and the per-frame encode/decode work of
+example.data_generator/data_checker, interpreted and compiled.
+
+Run from the repository root:
+python benchmarks/bench_compile.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bitvec  # noqa: E402
+import example  # noqa: E402
+from bitvec import BitVec as bv  # noqa: E402
+
+
+def encode(cnt, src_addr):
+    """Frame of one data_generator step"""
+    data = (cnt @ src_addr) ^ example.KEY
+    crc = example.crc_calc(example.CRC_IN, data)
+    return bv.C(
+        data[7:0], crc[7:0], data[15:8], crc[15:8],
+        data[23:16], crc[23:16], data[31:24], crc[31:24],
+    )
+
+
+def decode(data):
+    """Checks of one data_checker step, without the sequence state"""
+    crc = bv.C(data[7:0], data[23:16], data[39:32], data[55:48])
+    field = bv.C(data[15:8], data[31:24], data[47:40], data[63:56])
+    unscr = field ^ example.KEY
+    return crc == example.crc_calc(example.CRC_IN, field), unscr[3:0], unscr[31:4]
+
+
+def rate(func):
+    loops, secs = timeit.Timer(func).autorange()
+    return loops / secs
+
+
+def main():
+    cnt, addr = bv(28, 12345), bv(4, 1)
+    frame = encode(cnt, addr)
+    cases = {
+        "crc_calc": (example.crc_calc, (example.CRC_IN, bv(32, 0xDEADBEEF))),
+        "encode": (encode, (cnt, addr)),
+        "decode": (decode, (frame,)),
+    }
+    print(f"{'function':<10}{'interpreted':>16}{'compiled':>16}")
+    for name, (func, args) in cases.items():
+        fast = bitvec.compile(func, debug=True)
+        fast(*args)  # trace and check once
+        fast = bitvec.compile(func)
+        slow_rate = rate(lambda: func(*args))
+        fast_rate = rate(lambda: fast(*args))
+        print(f"{name:<10}{slow_rate:>12,.0f} /s{fast_rate:>12,.0f} /s  ({fast_rate / slow_rate:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Micro benchmark of the core value paths of BitVec:
+get_val, part-select, reverse slice, part assignment and repr
+
+Run from the repository root:
+python benchmarks/bench_core.py [width ...]
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bitvec import BitVec as bv  # noqa: E402
+
+
+def cases(width):
+    a = bv(width, random.getrandbits(width), signed=True)
+    mid = width // 2
+    return {
+        "get_val": lambda: a.get_val(),
+        "a[i]": lambda: a[mid],
+        "a[hi:lo]": lambda: a[mid + 7 : mid],
+        "a[lo:hi]": lambda: a[mid : mid + 7],
+        "a[::-1]": lambda: a[::-1],
+        "a[hi:lo] = x": lambda: a.__setitem__(slice(mid + 7, mid), 0x5A),
+        "repr": lambda: repr(a),
+    }
+
+
+def main(widths):
+    random.seed(0)
+    print(f"{'operation':<14}" + "".join(f"{w:>14}" for w in widths))
+    results = {w: cases(w) for w in widths}
+    for name in results[widths[0]]:
+        row = f"{name:<14}"
+        for w in widths:
+            timer = timeit.Timer(results[w][name])
+            try:
+                number, _ = timer.autorange()
+            except ValueError:
+                row += f"{'failed':>14}"
+                continue
+            best = min(timer.repeat(3, number)) / number
+            row += f"{best * 1e6:>12.2f}us"
+        print(row)
+
+
+if __name__ == "__main__":
+    main([int(w) for w in sys.argv[1:]] or [64, 4096, 65536])
@@ -0,0 +1,55 @@
+"""
+Arithmetic loop with plain vectors against width-specialized types
+
+Runs the same add/xor/rotate/compare loop with bv(32, ...) and bv(64, ...)
+vectors and with BitVec[32] and BitVec[64] vectors, and checks that both
+give the same result.
+
+Run from the repository root:
+python benchmarks/bench_fixed.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bitvec import BitVec as bv  # noqa: E402
+
+
+def mix(make, width, n):
+    acc = make(0)
+    x = make(0x9E3779B97F4A7C15 & ((1 << width) - 1))
+    y = make(0x5A5A5A5A5A5A5A5A & ((1 << width) - 1))
+    for _ in range(n):
+        acc += x
+        acc ^= y
+        acc = (acc << 3) | (acc >> (width - 3))
+        if acc > x:
+            acc -= y
+    return acc
+
+
+def best(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main(n):
+    for width in (32, 64):
+        plain, r1 = best(lambda: mix(lambda v: bv(width, v), width, n))
+        fixed, r2 = best(lambda: mix(bv[width], width, n))
+        assert r1 == r2
+        print(
+            f"{width} bits, {n} iterations: plain {plain:.3f}s  "
+            f"BitVec[{width}] {fixed:.3f}s  x{plain / fixed:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,68 @@
+"""
+Accumulate loop benchmark of the in-place operators
+
+Runs `acc += x; acc ^= y` for N iterations (10M by default) with the
+ordinary BitVec operators, which build a new vector per step, and with
+InPlaceBitVec, which updates acc itself. Also reports the vectors
+constructed per iteration on a short run.
+
+Run from the repository root:
+python benchmarks/bench_inplace.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bitvec import BitVec as bv  # noqa: E402
+from bitvec import InPlaceBitVec  # noqa: E402
+
+
+def accumulate(acc, n):
+    x, y = bv(32, 0x9E3779B9), bv(32, 0x5A5A5A5A)
+    for _ in range(n):
+        acc += x
+        acc ^= y
+    return acc
+
+
+def vectors_per_iteration(make, n=10000):
+    acc = make()
+    count = 0
+    init = bv.__init__
+
+    def counting_init(self, *args, **kwargs):
+        nonlocal count
+        count += 1
+        init(self, *args, **kwargs)
+
+    bv.__init__ = counting_init
+    try:
+        accumulate(acc, n)
+    finally:
+        bv.__init__ = init
+    return (count - 2) / n  # minus x and y
+
+
+def main(n):
+    results = {}
+    for name, make in (
+        ("BitVec", lambda: bv(32)),
+        ("InPlaceBitVec", lambda: InPlaceBitVec(32)),
+    ):
+        start = time.perf_counter()
+        acc = accumulate(make(), n)
+        secs = time.perf_counter() - start
+        results[name] = (acc.val, secs)
+        print(f"{name:<14} {n:,} iterations: {secs:6.2f}s ({secs / n * 1e9:6.0f} ns/iter)")
+    assert results["BitVec"][0] == results["InPlaceBitVec"][0]
+    speedup = results["BitVec"][1] / results["InPlaceBitVec"][1]
+    print(f"speedup {speedup:.2f}x; final value {results['BitVec'][0]:#010x}")
+    for name, make in (("BitVec", lambda: bv(32)), ("InPlaceBitVec", lambda: InPlaceBitVec(32))):
+        print(f"{name:<14} vectors created per iteration: {vectors_per_iteration(make):.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
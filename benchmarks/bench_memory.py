@@ -0,0 +1,77 @@
+"""
+Memory benchmark of BitVec objects
+
+Reports the size of one vector, traced memory of 100k vectors, BitVec
+constructions and traced peak per example.crc_calc call, and peak RSS of
+expanding a 1M bit vector into its bits.
+
+Run from the repository root:
+python benchmarks/bench_memory.py
+"""
+
+import os
+import resource
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import example  # noqa: E402
+from bitvec import BitVec as bv  # noqa: E402
+
+
+def instance_bytes():
+    a = bv(32, 5)
+    size = sys.getsizeof(a)
+    if hasattr(a, "__dict__"):
+        size += sys.getsizeof(a.__dict__)
+    return size
+
+
+def traced_peak(func):
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def constructions(func):
+    """Number of BitVec.__init__ calls made by func"""
+    count = 0
+    init = bv.__init__
+
+    def counting_init(self, *args, **kwargs):
+        nonlocal count
+        count += 1
+        init(self, *args, **kwargs)
+
+    bv.__init__ = counting_init
+    try:
+        func()
+    finally:
+        bv.__init__ = init
+    return count
+
+
+def main():
+    crc_in, data = bv(32, 0x1234ABCD), bv(32, 0xA21B345C)
+
+    def crc():
+        return example.crc_calc(crc_in, data)
+
+    print(f"bytes per BitVec:            {instance_bytes()}")
+    print(f"traced bytes, 100k BitVec:   {traced_peak(lambda: [bv(32, i) for i in range(100000)])}")
+    print(f"BitVec created per crc_calc: {constructions(crc)}")
+    print(f"traced peak per crc_calc:    {traced_peak(crc)}")
+    timer = timeit.Timer(crc)
+    number, _ = timer.autorange()
+    print(f"time per crc_calc:           {min(timer.repeat(3, number)) / number * 1e6:.1f}us")
+    bits = list(bv(1 << 20, (1 << (1 << 20)) // 3))
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"peak RSS, list(1M bit vec):  {rss // 1024} MiB ({len(bits)} bits)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Scaling of bitvec.parallel.map over the number of worker processes
+
+Checks N random 64 bit frames with example.crc_calc serially and with
+parallel.map on 1, 2, 4, ... workers up to the number of CPUs, and also
+times pickling the frames one by one against packing them into records.
+
+Run from the repository root:
+python benchmarks/bench_parallel.py [frames]
+"""
+
+import os
+import pickle
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import example  # noqa: E402
+from bitvec import BitVec as bv  # noqa: E402
+from bitvec import BitVecArray, parallel  # noqa: E402
+
+
+def check(frame):
+    return example.crc_calc(example.CRC_IN, frame[31:0]).val
+
+
+def main(n):
+    frames = [bv(64, random.getrandbits(64)) for _ in range(n)]
+    start = time.perf_counter()
+    data = pickle.dumps(frames)
+    pickled = time.perf_counter() - start
+    start = time.perf_counter()
+    packed = BitVecArray(64, frames).to_bytes()
+    packing = time.perf_counter() - start
+    print(f"{n} frames: pickle {pickled * 1e3:.1f}ms {len(data)} bytes, "
+          f"records {packing * 1e3:.1f}ms {len(packed)} bytes")
+
+    start = time.perf_counter()
+    expected = [check(f) for f in frames]
+    serial = time.perf_counter() - start
+    print(f"serial      {serial:8.3f}s")
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        with ProcessPoolExecutor(workers) as pool:
+            parallel.map(check, frames[:workers], executor=pool)  # start the workers
+            start = time.perf_counter()
+            result = parallel.map(check, frames, workers, executor=pool)
+            elapsed = time.perf_counter() - start
+        assert result == expected
+        print(f"{workers:3} workers {elapsed:8.3f}s  x{serial / elapsed:.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,55 @@
+"""
+Benchmark of BitVec.pattern_match against the previous slice-per-index matcher
+
+Run from the repository root:
+python benchmarks/bench_pattern_match.py [--full]
+
+The previous matcher takes minutes at 1M bits; it is skipped at that width
+unless --full is given.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bitvec import BitVec as bv  # noqa: E402
+
+
+def previous_pattern_match(vec, pattern):
+    """Matcher before the bit-parallel rewrite: one part-select per index"""
+    for index in range(pattern.size - 1, vec.size):
+        if vec[index : (index - pattern.size + 1)] == pattern:
+            yield index
+
+
+def best_time(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(full):
+    random.seed(0)
+    pattern = bv(8, 0b10110011)
+    print(f"{'width':>8}{'hits':>8}{'previous':>14}{'bit-parallel':>14}{'hit mask':>14}")
+    for width in (1 << 10, 1 << 16, 1 << 20):
+        vec = bv(width, random.getrandbits(width))
+        new = best_time(lambda: list(vec.pattern_match(pattern)))
+        as_mask = best_time(lambda: vec.pattern_match(pattern, as_mask=True))
+        hits = len(list(vec.pattern_match(pattern)))
+        if full or width < (1 << 20):
+            old = f"{best_time(lambda: list(previous_pattern_match(vec, pattern)), 1) * 1e3:>12.2f}ms"
+            assert list(previous_pattern_match(vec, pattern)) == list(vec.pattern_match(pattern))
+        else:
+            old = f"{'skipped':>14}"
+        print(f"{width:>8}{hits:>8}{old}{new * 1e3:>12.2f}ms{as_mask * 1e3:>12.2f}ms")
+
+
+if __name__ == "__main__":
+    main("--full" in sys.argv[1:])
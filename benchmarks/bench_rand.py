@@ -0,0 +1,65 @@
+"""
+Constrained random batches against per-vector generation with retry loops
+
+Times N values drawn with BitVecRandom (uniform, a range, one-hot) against
+the same constraint written as bv(n, getrandbits(n)) with a retry loop.
+
+Run from the repository root:
+python benchmarks/bench_rand.py [count]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bitvec import BitVec as bv  # noqa: E402
+from bitvec.rand import BitVecRandom  # noqa: E402
+
+
+def retry(rng, size, n, accept):
+    out = []
+    while len(out) < n:
+        x = rng.getrandbits(size)
+        if accept(x):
+            out.append(bv(size, x))
+    return out
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(n):
+    rng = random.Random(1)
+    rnd = BitVecRandom(1)
+    cases = [
+        ("uniform 32", lambda: retry(rng, 32, n, lambda x: True), lambda: rnd.uniform(32, n)),
+        (
+            "between 1000..3e9",
+            lambda: retry(rng, 32, n, lambda x: 1000 <= x <= 3_000_000_000),
+            lambda: rnd.between(32, n, 1000, 3_000_000_000),
+        ),
+        (
+            "onehot 8",
+            lambda: retry(rng, 8, n, lambda x: x.bit_count() == 1),
+            lambda: rnd.onehot(8, n),
+        ),
+        (
+            "popcount 3 of 12",
+            lambda: retry(rng, 12, n, lambda x: x.bit_count() == 3),
+            lambda: rnd.popcount(12, n, 3),
+        ),
+    ]
+    for name, loop, batch in cases:
+        old, new = timed(loop), timed(batch)
+        print(f"{name:<20} retry loop {old * 1e3:8.1f}ms  BitVecRandom {new * 1e3:8.1f}ms  x{old / new:.1f}")
+    print(f"uniform 32 as a list of BitVec: {timed(lambda: rnd.uniform(32, n).tolist()) * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
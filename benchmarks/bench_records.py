@@ -0,0 +1,74 @@
+"""
+Record file benchmark: archive example.py frames and read them back
+
+Writes N frames (1M by default) from example.generate_frames to a
+temporary record file, once as whole BitVecArray blocks and once record
+by record, then times random access to single records, a chunked scan
+through the memory map and the same archive kept as hex() strings.
+
+Run from the repository root:
+python benchmarks/bench_records.py [frames]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import example  # noqa: E402
+from bitvec import BitVec as bv  # noqa: E402
+from bitvec.records import RecordFile, RecordWriter  # noqa: E402
+
+CHUNK = 65536
+
+
+def timed(label, n, func):
+    start = time.perf_counter()
+    result = func()
+    secs = time.perf_counter() - start
+    print(f"{label:<28} {secs:7.3f}s  {n / secs:12,.0f} records/s")
+    return result
+
+
+def main(n):
+    frames = [example.generate_frames(1, k, min(CHUNK, n - k)) for k in range(0, n, CHUNK)]
+    values = [v for batch in frames for v in batch.get_val()]
+    with tempfile.TemporaryDirectory() as tmp:
+        bulk, single = os.path.join(tmp, "bulk.bv"), os.path.join(tmp, "single.bv")
+
+        def write_bulk():
+            with RecordWriter(bulk, 64) as w:
+                for batch in frames:
+                    w.write_all(batch)
+
+        def write_single():
+            with RecordWriter(single, 64) as w:
+                for v in values:
+                    w.write(v)
+
+        timed("write, BitVecArray blocks", n, write_bulk)
+        timed("write, one record at a time", n, write_single)
+        print(f"file size {os.path.getsize(bulk):,} bytes; hex() strings "
+              f"{sum(len(bv(64, v).hex()) + 1 for v in values[:1000]) * n // 1000:,} bytes")
+
+        with RecordFile(bulk) as f:
+            idx = [random.randrange(n) for _ in range(min(n, 200_000))]
+            got = timed("random access f[i]", len(idx), lambda: [f[i].val for i in idx])
+            assert got == [values[i] for i in idx]
+            total = timed("chunked scan", n, lambda: sum(b.count for b in f.chunks(CHUNK)))
+            assert total == n
+            flags = timed(
+                "chunked scan + check_frames",
+                n,
+                lambda: [example.check_frames(b, 1)["good"] for b in f.chunks(CHUNK)],
+            )
+            assert sum(flags) == n
+        hexes = [bv(64, v).hex() for v in values]
+        timed("parse hex() strings", n, lambda: [int(h, 16) for h in hexes])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,50 @@
+"""
+Sparse vector benchmark: SparseBitVec against dense BitVec
+
+Builds an N bit vector (10M by default) with a few hundred scattered set
+bits and one with a 3M bit run of ones, and times set bit listing,
+popcount, & and | in both representations, with their memory.
+
+Run from the repository root:
+python benchmarks/bench_sparse.py [bits]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bitvec import BitVec as bv  # noqa: E402
+from bitvec.sparse import SparseBitVec  # noqa: E402
+
+
+def per_call(func, n=10):
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n
+
+
+def main(n):
+    positions = random.sample(range(n), 500)
+    few = bv(n, sum(1 << p for p in positions))
+    run = bv(n, ((1 << (3 * n // 10)) - 1) << (n // 10))
+    sfew, srun = SparseBitVec.from_bitvec(few), SparseBitVec.from_bitvec(run)
+    assert sfew.to_bitvec() == few and srun.to_bitvec() == run
+    print(f"{sfew}\n{srun}\ndense: {n // 8:,} bytes each")
+    for label, dense, sparse in (
+        ("get_all_set_bits", few.get_all_set_bits, sfew.get_all_set_bits),
+        ("popcount", few.popcount, sfew.popcount),
+        ("few & run", lambda: few & run, lambda: sfew & srun),
+        ("few | run", lambda: few | run, lambda: sfew | srun),
+    ):
+        print(
+            f"{label:<18} dense {per_call(dense) * 1e3:8.3f}ms"
+            f"   sparse {per_call(sparse) * 1e3:8.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
@@ -0,0 +1,254 @@
+"""
+Benchmark suite of the BitVec operations, with JSON results and a compare mode
+
+Times construction, every operator and in-place operator, part-selects,
+__setitem__, concatenation, pattern_match, get_all_set_bits, the reductions
+and example.crc_calc, for each width and for unsigned and signed vectors.
+Every case is timed as the best of `--repeat` runs of a loop calibrated to
+last at least `--min-time` seconds.
+
+Run from the repository root:
+python benchmarks/bench_suite.py run [-o results.json] [--widths 1 8 32 ...] [--filter text]
+python benchmarks/bench_suite.py compare base.json new.json [--threshold 0.10]
+
+compare lists the cases that got slower or faster by more than the
+threshold (a fraction, 0.10 = 10%) and exits with status 1 on a regression.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import example  # noqa: E402
+from bitvec import BitVec as bv  # noqa: E402
+
+WIDTHS = [1, 8, 32, 64, 256, 4096, 1 << 20]
+
+
+def cases(width, signed):
+    """name -> function for one width and signedness"""
+    rnd = random.Random(width)
+    a = bv(width, rnd.getrandbits(width), signed)
+    b = bv(width, rnd.getrandbits(width) | 1, signed)
+    x = bv(width, rnd.getrandbits(width), signed)
+    val = a.val
+    lo = width // 3
+    hi = min(width - 1, lo + 7)
+    two = bv(2, 2)
+    pattern = bv(4, 0b1011)
+    return {
+        "bv(size, val)": lambda: bv(width, val, signed),
+        "get_val": a.get_val,
+        "repr": lambda: repr(a),
+        "a + b": lambda: a + b,
+        "a - b": lambda: a - b,
+        "a * b": lambda: a * b,
+        "a ** 2": lambda: a**two,
+        "a / b": lambda: a / b,
+        "a // b": lambda: a // b,
+        "a % b": lambda: a % b,
+        "a << 3": lambda: a << 3,
+        "a >> 3": lambda: a >> 3,
+        "a.clshift(3)": lambda: a.clshift(3),
+        "a.crshift(3)": lambda: a.crshift(3),
+        "a & b": lambda: a & b,
+        "a | b": lambda: a | b,
+        "a ^ b": lambda: a ^ b,
+        "~a": lambda: ~a,
+        "a & int": lambda: a & 0x5A5A,
+        "a == b": lambda: a == b,
+        "a != b": lambda: a != b,
+        "a < b": lambda: a < b,
+        "a <= b": lambda: a <= b,
+        "a > b": lambda: a > b,
+        "a >= b": lambda: a >= b,
+        "a += b": lambda: a.__iadd__(b),
+        "a -= b": lambda: a.__isub__(b),
+        "a *= b": lambda: a.__imul__(b),
+        "a **= 2": lambda: a.__ipow__(two),
+        "a /= b": lambda: a.__itruediv__(b),
+        "a //= b": lambda: a.__ifloordiv__(b),
+        "a %= b": lambda: a.__imod__(b),
+        "a <<= 3": lambda: a.__ilshift__(3),
+        "a >>= 3": lambda: a.__irshift__(3),
+        "a &= b": lambda: a.__iand__(b),
+        "a |= b": lambda: a.__ior__(b),
+        "a ^= b": lambda: a.__ixor__(b),
+        "a[i]": lambda: a[lo],
+        "a[hi:lo]": lambda: a[hi:lo],
+        "a[lo:hi]": lambda: a[lo:hi],
+        "a[::-1]": lambda: a[::-1],
+        "a[::2]": lambda: a[::2],
+        "x[i] = 1": lambda: x.__setitem__(lo, 1),
+        "x[hi:lo] = v": lambda: x.__setitem__(slice(hi, lo), 0x5A),
+        "x[lo:hi] = v": lambda: x.__setitem__(slice(lo, hi), 0x5A),
+        "x[...] = v": lambda: x.__setitem__(Ellipsis, val),
+        "a @ b": lambda: a @ b,
+        "a @ 3": lambda: a @ 3,
+        "bv.C(a, b, a)": lambda: bv.C(a, b, a),
+        "pattern_match": lambda: list(a.pattern_match(pattern)),
+        "pattern_match mask": lambda: a.pattern_match(pattern, as_mask=True),
+        "get_all_set_bits": a.get_all_set_bits,
+        "get_all_reset_bits": a.get_all_reset_bits,
+        "popcount": a.popcount,
+        "R | a": lambda: bv.R() | a,
+        "R & a": lambda: bv.R() & a,
+        "R ^ a": lambda: bv.R() ^ a,
+        "R.nor(a)": lambda: bv.R().nor(a),
+        "R.nand(a)": lambda: bv.R().nand(a),
+        "R.xnor(a)": lambda: bv.R().xnor(a),
+    }
+
+
+def example_cases():
+    data = bv(32, 0x5A5A1234)
+    gen = example.data_generator(3)
+    frames = example.data_generator(3)
+    checker = example.data_checker(3)
+
+    def check():
+        next(checker)
+        return checker.send(next(frames))
+
+    return {
+        "example.crc_calc": lambda: example.crc_calc(example.CRC_IN, data),
+        "example.data_generator": lambda: next(gen),
+        "example.data_checker": check,
+    }
+
+
+def measure(func, min_time, repeat):
+    """Best seconds per call over `repeat` loops of at least min_time each"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number, number
+
+
+def _commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _key(result):
+    return (result["name"], result["width"], result["signed"])
+
+
+def _label(key):
+    name, width, signed = key
+    if width is None:
+        return name
+    return f"{name} [{width}{'s' if signed else 'u'}]"
+
+
+def run(args):
+    groups = [(None, None, example_cases())]
+    for width in args.widths:
+        for signed in (False, True):
+            groups.append((width, signed, cases(width, signed)))
+    results = []
+    for width, signed, group in groups:
+        for name, func in group.items():
+            if args.filter and args.filter not in name:
+                continue
+            entry = {"name": name, "width": width, "signed": signed}
+            try:
+                seconds, number = measure(func, args.min_time, args.repeat)
+                entry.update(seconds=seconds, number=number)
+            except Exception as exc:  # report the case and keep going
+                entry.update(seconds=None, error=f"{type(exc).__name__}: {exc}")
+            results.append(entry)
+            shown = "failed" if entry["seconds"] is None else f"{entry['seconds'] * 1e6:12.3f}us"
+            print(f"{_label(_key(entry)):<40}{shown:>16}", flush=True)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "commit": _commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "min_time": args.min_time,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=1)
+        print(f"wrote {len(results)} results to {args.output}")
+    return 0
+
+
+def compare(args):
+    with open(args.base) as fh:
+        base = {_key(r): r["seconds"] for r in json.load(fh)["results"]}
+    with open(args.new) as fh:
+        new = {_key(r): r["seconds"] for r in json.load(fh)["results"]}
+    slower, faster = [], []
+    for key in base.keys() & new.keys():
+        old, cur = base[key], new[key]
+        if not old or not cur:
+            continue
+        ratio = cur / old
+        if ratio > 1 + args.threshold:
+            slower.append((ratio, key, old, cur))
+        elif ratio < 1 / (1 + args.threshold):
+            faster.append((ratio, key, old, cur))
+    for title, rows in (("REGRESSIONS", sorted(slower, reverse=True)), ("improvements", sorted(faster))):
+        print(f"{title} beyond {args.threshold:.0%}: {len(rows)}")
+        for ratio, key, old, cur in rows:
+            print(f"  {_label(key):<40}{old * 1e6:12.3f}us -> {cur * 1e6:12.3f}us  x{ratio:.2f}")
+    missing = sorted(base.keys() ^ new.keys(), key=str)
+    if missing:
+        print(f"{len(missing)} cases only in one run: " + ", ".join(_label(k) for k in missing))
+    return 1 if slower else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="time every case")
+    p_run.add_argument("-o", "--output", help="JSON file for the results")
+    p_run.add_argument("--widths", type=int, nargs="+", default=WIDTHS)
+    p_run.add_argument("--filter", help="only cases whose name contains this text")
+    p_run.add_argument("--min-time", type=float, default=0.02, help="seconds per timing loop")
+    p_run.add_argument("--repeat", type=int, default=5)
+    p_cmp = sub.add_parser("compare", help="compare two JSON results")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+    return run(args) if args.command == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
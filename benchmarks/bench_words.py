@@ -0,0 +1,56 @@
+"""
+Single bit and small part-select updates on a very large vector
+
+Times a[i] = 1, 16 bit part-select reads and writes, and a whole-vector
+XOR on an N bit vector (100M by default) with the int backend and the
+words backend.
+
+Run from the repository root:
+python benchmarks/bench_words.py [bits]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bitvec import BitVec as bv  # noqa: E402
+
+
+def per_op(func, positions):
+    start = time.perf_counter()
+    for i in positions:
+        func(i)
+    return (time.perf_counter() - start) / len(positions)
+
+
+def main(n):
+    positions = [random.randrange(n - 16) for _ in range(50)]
+    seed = random.getrandbits(n)
+    for backend in ("int", "words"):
+        a = bv(n, seed, backend=backend)
+
+        def set_bit(i):
+            a[i] = 1
+
+        def read_field(i):
+            return a[i + 15 : i]
+
+        def write_field(i):
+            a[i + 15 : i] = 0xBEEF
+
+        start = time.perf_counter()
+        a ^ a
+        xor = time.perf_counter() - start
+        print(
+            f"{backend:<6} a[i] = 1 {per_op(set_bit, positions) * 1e6:9.1f}us"
+            f"   read [i+15:i] {per_op(read_field, positions) * 1e6:9.1f}us"
+            f"   write [i+15:i] {per_op(write_field, positions) * 1e6:9.1f}us"
+            f"   a ^ a {xor * 1e3:7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000_000)
@@ -0,0 +1,1279 @@
+"""
+Provides verilog like Bitvec type
+Has both signed and unsigned arithmatic
+"""
+
+import sys
+from array import array
+
+# bit reversed value of every byte
+_REV8 = bytes(sum(((i >> b) & 1) << (7 - b) for b in range(8)) for i in range(256))
+
+
+def _reverse_bits(val, width):
+    """Reverse the low `width` bits of val"""
+    if width <= 0:
+        return 0
+    nbytes = (width + 7) // 8
+    rev = int.from_bytes(val.to_bytes(nbytes, "little").translate(_REV8), "big")
+    return rev >> (nbytes * 8 - width)
+
+
+def _iter_set_bits(val):
+    """Yield indices of the set bits of val in increasing order, a 64 bit word at a time"""
+    nwords = (val.bit_length() + 63) // 64
+    words = array("Q", val.to_bytes(nwords * 8, "little"))
+    if sys.byteorder != "little":
+        words.byteswap()
+    for base, word in enumerate(words):
+        base *= 64
+        while word:
+            low = word & -word
+            yield base + low.bit_length() - 1
+            word ^= low
+
+
+def _gather_bits(window, width, step):
+    """Bits 0, step, 2*step, ... of window packed into the low `width` bits"""
+    if width <= 64:
+        val = 0
+        for j in range(width):
+            val |= ((window >> (j * step)) & 1) << j
+        return val
+    # wide selects: one pass over the binary digits (MSB first) instead of
+    # shifting the whole window once per selected bit
+    return int(format(window, f"0{(width - 1) * step + 1}b")[::step], 2)
+
+
+def _decode_slice(size, index):
+    """
+    Decode a part-select slice into (lsb, width, step, reverse)
+    Selects bits lsb, lsb+step, ... lsb+(width-1)*step; with reverse set, the
+    lowest selected bit ends up at the MSB of the result
+    """
+    start, stop, step = index.start, index.stop, index.step
+    start = size - 1 if start is None else start
+    stop = 0 if stop is None else stop
+    step = 1 if step is None else step
+    reverse = step < 0
+    if reverse:
+        step = -step
+    if start < stop:
+        start, stop = stop, start
+        reverse = not reverse
+    return stop, (start - stop) // step + 1, step, reverse
+
+
+class BitVec:
+    """
+    Class for verilog-like bitvector. You can define bitvector of arbitrary size, either
+    signed or unsigned.
+    Example usage:
+    from bitvec import BitVec as bv
+
+    #Define an unsigned bitvec: bit [10:0] a;
+    a = bv(11)
+
+    #With size and value; unsigned:
+    a = bv(11, 0b10111)
+
+    #With size and value; signed:
+    a = bv(11, 0b10111, True)
+
+    #Very large vector kept as an array of 64 bit words (see WordBitVec):
+    a = bv(100_000_000, backend="words")
+
+    Supports:
+     - all arithmatic and bitwise operator
+     - Verilog style slice indexing and slice assignment. Unlike verilog, also supports
+       reverse index
+     - concatenation & repetiton through @ operator and concat/C class method
+     - Some extra helper function such as get_all_set_bits to return index of all set bits
+
+    """
+
+    __slots__ = ("val", "size", "is_signed", "_rank")
+
+    val: int
+    size: int
+    is_signed: bool
+
+    def __init__(self, size=32, val=0, signed=False, backend=None):
+        if backend is not None:
+            _switch_backend(self, backend)
+            self.__init__(size, val, signed)
+            return
+        if isinstance(val, BitVec):
+            val = val.val
+        # negative values wrap to 2's complement
+        self.val = val & ((1 << size) - 1)
+        self.size = size
+        self.is_signed = signed
+
+    @classmethod
+    def type(cls, size, signed=False):
+        """
+        Width-specialized subclass for size and signedness, created once
+        BitVec[size] is BitVec.type(size); see bitvec.fixed
+        """
+        return fixed_type(size, signed)
+
+    def __class_getitem__(cls, size):
+        return fixed_type(size)
+
+    @property
+    def backend(self):
+        """Storage of the value: "int" or "words" (see WordBitVec)"""
+        return "int"
+
+    def to_backend(self, backend):
+        """Copy of the vector using the given backend ("int" or "words")"""
+        return BitVec(self.size, self, self.is_signed, backend)
+
+    def get_val(self):
+        """
+        Get the integer value
+        Signed vectors are read as 2's complement: flipping the sign bit and
+        subtracting it back sign-extends without a branch
+        """
+        if self.is_signed and self.size:
+            sign = 1 << (self.size - 1)
+            return (self.val ^ sign) - sign
+        return self.val
+
+    def __int__(self):
+        return self.get_val()
+
+    def set_val(self, val):
+        """Setter for value"""
+        self.val = ((1 << self.size) - 1) & val
+
+    @classmethod
+    def assign(cls, lhs, rhs):
+        """
+        assign allowd you to assign concatenations and other
+        bit vector assignment pattern
+
+        bv.assign(x, (y,z)) === x = {y,z} in Verilog
+        """
+        if isinstance(rhs, BitVec):
+            pass
+        elif isinstance(rhs, int):
+            rhs = BitVec(rhs.bit_length(), rhs)
+        else:
+            raise TypeError("RHS should be either int or BitVec")
+        if isinstance(lhs, BitVec):
+            lhs[...] = rhs
+        elif isinstance(lhs, tuple):
+            shift = 0
+            for v in reversed(lhs):
+                v.set_val(rhs.val >> shift)
+                shift += v.size
+
+    @classmethod
+    def signed(cls, size=32, val=0):
+        """
+        Create signed BitVec
+        """
+        return cls(size, val, signed=True)
+
+    @classmethod
+    def u2s(cls, ubv):
+        """
+        Convert unsigned bitvec to signed bitvec
+        """
+        return cls(ubv.size, ubv.get_val(), True)
+
+    @classmethod
+    def unsigned(cls, size=32, val=0):
+        """
+        Create unsigned BitVec
+        """
+        return cls(size, val, signed=False)
+
+    @classmethod
+    def from_val(cls, val, signed=False):
+        """
+        Deduces size from the value
+        """
+        return cls(val.bit_length() if val != 0 else 1, val, signed)
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            if index > self.size - 1:
+                raise ValueError(f"index {index} > size-1 {self.size-1}")
+            if index < 0:
+                if index < -self.size:
+                    raise ValueError(f"index {index} < -size {-self.size}")
+                index += self.size
+            try:
+                return _BITS[(self.val >> index) & 1]
+            except TypeError:  # symbolic value while tracing, see bitvec.trace
+                return FrozenBitVec(1, (self.val >> index) & 1)
+        elif isinstance(index, slice):
+            lsb, width, step, reverse = _decode_slice(self.size, index)
+            if step == 1:
+                val = (self.val >> lsb) & ((1 << width) - 1)
+            else:
+                window = (self.val >> lsb) & ((1 << ((width - 1) * step + 1)) - 1)
+                val = _gather_bits(window, width, step)
+            if reverse:
+                val = _reverse_bits(val, width)
+            # a fresh vector: part-selects are often modified, unlike single bits
+            return BitVec(width, val)
+        raise IndexError(f"Index of type {type(index)} not expected")
+
+    # represent method
+    def __repr__(self):
+        if not self.is_signed:
+            return "0b" + bin(self.val)[2:].zfill(self.size)
+        elif self.size and self.val >> (self.size - 1):  # if_negative
+            value = (1 << self.size) - self.val
+            return "-" + str(self.size) + "b" + bin(value)[2:].zfill(self.size)
+        else:
+            return str(self.size) + "b" + bin(self.val)[2:].zfill(self.size)
+
+    # add method
+    def __add__(self, lhs):
+        if isinstance(lhs, int):
+            size = max([self.size, lhs.bit_length()]) + 1
+            val = self.val + lhs
+            return BitVec(size=size, val=val, signed=self.is_signed)
+        else:
+            size = max([self.size, lhs.size]) + 1
+            val = self.val + lhs.val
+            return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    # inplace add method
+    def __iadd__(self, lhs):
+        size = self.size
+        if isinstance(lhs, int):
+            val = (self.val + lhs) & ((1 << size) - 1)
+            return BitVec(size=size, val=val, signed=self.is_signed)
+        else:
+            val = (self.val + lhs.val) & ((1 << size) - 1)
+            return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    # sub method
+    def __sub__(self, lhs):
+        if isinstance(lhs, int):
+            size = max([self.size, lhs.bit_length()]) + 1
+            val = self.val + ~lhs + 1
+            return BitVec(size=size, val=val, signed=self.is_signed)
+        else:
+            size = max([self.size, lhs.size]) + 1
+            val = self.val + ~lhs.val + 1
+            return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    # inplace sub method
+    def __isub__(self, lhs):
+        size = self.size
+        if isinstance(lhs, int):
+            val = (self.val + ~lhs + 1) & ((1 << size) - 1)
+            return BitVec(size=size, val=val, signed=self.is_signed)
+        else:
+            val = (self.val + ~lhs.val + 1) & ((1 << size) - 1)
+            return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    # mul method
+    def __mul__(self, lhs):
+        if isinstance(lhs, int):
+            val = self.val * lhs
+            size = val.bit_length()
+            return BitVec(size=size, val=val, signed=self.is_signed)
+        else:
+            val = self.val * lhs.val
+            size = val.bit_length()
+            return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    # inplace mul method
+    def __imul__(self, lhs):
+        size = self.size
+        if isinstance(lhs, int):
+            val = self.val * lhs & ((1 << size) - 1)
+            return BitVec(size=size, val=val, signed=self.is_signed)
+        else:
+            val = self.val * lhs.val & ((1 << size) - 1)
+            return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    # power method
+    def __pow__(self, lhs):
+        val = self.val**lhs.val
+        size = val.bit_length()
+        return BitVec(size, val)
+
+    def __ipow__(self, lhs):
+        size = self.size
+        val = (self.val**lhs.val) & ((1 << size) - 1)
+        return BitVec(size, val)
+
+    def __truediv__(self, lhs):
+        """
+        In case of negative/positive or vice versa, leaves positive reminder
+        """
+        if isinstance(lhs, int):
+            size = max([self.size, lhs.bit_length()])
+            val = (-1 if self.get_val() * lhs < 0 else 1) * (
+                abs(self.get_val()) // abs(lhs)
+            )
+            return BitVec(size=size, val=val, signed=self.is_signed)
+        elif isinstance(lhs, BitVec):
+            size = max([self.size, lhs.size])
+            val = (-1 if self.get_val() * lhs.get_val() < 0 else 1) * (
+                abs(self.get_val()) // abs(lhs.get_val())
+            )
+            return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    def __floordiv__(self, lhs):
+        """
+        In case of negative/positive or vice versa, leaves positive reminder
+        """
+        if isinstance(lhs, int):
+            size = max([self.size, lhs.bit_length()])
+            val = self.get_val() // lhs
+            return BitVec(size=size, val=val, signed=self.is_signed)
+        elif isinstance(lhs, BitVec):
+            size = max([self.size, lhs.size])
+            val = self.get_val() // lhs.get_val()
+            return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    # inplace div method
+    def __itruediv__(self, lhs):
+        res = self / lhs
+        return BitVec(self.size, res.val, res.is_signed)
+
+    def __ifloordiv__(self, lhs):
+        res = self // lhs
+        return BitVec(self.size, res.val, res.is_signed)
+
+    def __mod__(self, lhs):
+        if isinstance(lhs, int):
+            size = max([self.size, lhs.bit_length()])
+            val = (-1 if self.get_val() * lhs < 0 else 1) * (
+                abs(self.get_val()) % abs(lhs)
+            )
+            return BitVec(size, val, signed=self.is_signed)
+        elif isinstance(lhs, BitVec):
+            size = max([self.size, lhs.size])
+            val = (-1 if self.get_val() * lhs.get_val() < 0 else 1) * (
+                abs(self.get_val()) % abs(lhs.get_val())
+            )
+            return BitVec(size, val, signed=self.is_signed | lhs.is_signed)
+
+    # inplace modulo method
+    def __imod__(self, lhs):
+        res = self % lhs
+        return BitVec(self.size, res.val, res.is_signed)
+
+    # left shift method
+    def __lshift__(self, lhs):
+        size = self.size
+        if isinstance(lhs, int):
+            val = self.val << lhs
+        else:
+            val = self.val << lhs.val
+        return BitVec(size, val)
+
+    def __ilshift__(self, lhs):
+        size = self.size
+        if isinstance(lhs, int):
+            val = self.val << lhs
+        else:
+            val = self.val << lhs.val
+        return BitVec(size, val)
+
+    # right shift method
+    def __rshift__(self, lhs):
+        size = self.size
+        if isinstance(lhs, int):
+            val = self.val >> lhs
+        else:
+            val = self.val >> lhs.val
+        return BitVec(size, val)
+
+    def clshift(self, lhs):
+        """
+        circular left shift method
+        """
+        size = self.size
+        if isinstance(lhs, int):
+            val = (self.val << lhs % size) | (self.val >> (size - lhs % size))
+        else:
+            val = (self.val << lhs.val % size) | (self.val >> (size - lhs.val % size))
+        return BitVec(size, val)
+
+    def __irshift__(self, lhs):
+        size = self.size
+        if isinstance(lhs, int):
+            val = self.val >> lhs
+        else:
+            val = self.val >> lhs.val
+        return BitVec(size, val)
+
+    def crshift(self, lhs):
+        """
+        circular right shift method
+        """
+        size = self.size
+        if isinstance(lhs, int):
+            val = (self.val >> lhs % size) | (self.val << (size - lhs % size))
+        else:
+            val = (self.val >> lhs.val % size) | (self.val << (size - lhs.val % size))
+        return BitVec(size, val)
+
+    # bitwise and method
+    def __and__(self, lhs):
+        if isinstance(lhs, int):
+            lhs = BitVec(lhs.bit_length(), lhs)
+        size = max([self.size, lhs.size])
+        val = self.val & lhs.val
+        return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    def __rand__(self, lhs):
+        if isinstance(lhs, int):
+            lhs = BitVec(lhs.bit_length(), lhs)
+        size = max([self.size, lhs.size])
+        val = self.val & lhs.val
+        return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    def __iand__(self, lhs):
+        if isinstance(lhs, int):
+            lhs = BitVec(lhs.bit_length(), lhs)
+        size = self.size
+        val = self.val & lhs.val
+        return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    # bitwise or method
+    def __or__(self, lhs):
+        if isinstance(lhs, int):
+            lhs = BitVec(lhs.bit_length(), lhs)
+        size = max([self.size, lhs.size])
+        val = self.val | lhs.val
+        return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    def __ror__(self, lhs):
+        if isinstance(lhs, int):
+            lhs = BitVec(lhs.bit_length(), lhs)
+        size = max([self.size, lhs.size])
+        val = self.val | lhs.val
+        return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    def __ior__(self, lhs):
+        if isinstance(lhs, int):
+            lhs = BitVec(lhs.bit_length(), lhs)
+        size = self.size
+        val = self.val | lhs.val
+        return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    # bitwise XOR method
+    def __xor__(self, lhs):
+        if isinstance(lhs, int):
+            lhs = BitVec(lhs.bit_length(), lhs)
+        size = max([self.size, lhs.size])
+        val = self.val ^ lhs.val
+        return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    def __rxor__(self, lhs):
+        if isinstance(lhs, int):
+            lhs = BitVec(lhs.bit_length(), lhs)
+        size = max([self.size, lhs.size])
+        val = self.val ^ lhs.val
+        return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    def __ixor__(self, lhs):
+        if isinstance(lhs, int):
+            lhs = BitVec(lhs.bit_length(), lhs)
+        size = self.size
+        val = self.val ^ lhs.val
+        return BitVec(size=size, val=val, signed=self.is_signed | lhs.is_signed)
+
+    # invert method
+    def __invert__(self):
+        size = self.size
+        val = ~self.val
+        return BitVec(size=size, val=val, signed=self.is_signed)
+
+    # to_hex convert method
+    def hex(self):
+        """
+        returns hex string
+        """
+        return hex(self.get_val())
+
+    def dec(self):
+        """
+        returns decimal string
+        """
+        return str(self.get_val())
+
+    def bin(self):
+        """
+        returns binary string
+        """
+        return bin(self.val)
+
+    # equal to
+    def __eq__(self, lhs):
+        if isinstance(lhs, int):
+            bool_var = self.get_val() == lhs
+        else:
+            bool_var = self.get_val() == lhs.get_val()
+        return bool_var
+
+    # less than
+    def __lt__(self, lhs):
+        if isinstance(lhs, int):
+            bool_var = self.get_val() < lhs
+        else:
+            bool_var = self.get_val() < lhs.get_val()
+        return bool_var
+
+    # less than or equal
+    def __le__(self, lhs):
+        if isinstance(lhs, int):
+            bool_var = self.get_val() <= lhs
+        else:
+            bool_var = self.get_val() <= lhs.get_val()
+        return bool_var
+
+    # not equal to
+    def __ne__(self, lhs):
+        if isinstance(lhs, int):
+            bool_var = self.get_val() != lhs
+        else:
+            bool_var = self.get_val() != lhs.get_val()
+        return bool_var
+
+    # greater than
+    def __gt__(self, lhs):
+        if isinstance(lhs, int):
+            bool_var = self.get_val() > lhs
+        else:
+            bool_var = self.get_val() > lhs.get_val()
+        return bool_var
+
+    # greater than equal
+    def __ge__(self, lhs):
+        if isinstance(lhs, int):
+            bool_var = self.get_val() >= lhs
+        else:
+            bool_var = self.get_val() >= lhs.get_val()
+        return bool_var
+
+    def __matmul__(self, lhs):
+        """
+        Use @ operator for repetition and concatenation
+        If one of the argument is integer then it acts like repetition operator
+        If both arguments are bitvector, then it concatenates them
+        ex: a:BitVec and b:BitVec
+        2@a #Repeat a or concatenate a with itself
+        a@b #concat a with b
+        """
+        if isinstance(lhs, int):
+            v = self.val
+            for _ in range(lhs):
+                v = (v << self.size) | self.val
+            return BitVec(self.size * lhs, v)
+        elif isinstance(lhs, BitVec):
+            rsize = self.size + lhs.size
+            outval = (self.val << lhs.size) | lhs.val
+            return BitVec(rsize, outval)
+
+    def __rmatmul__(self, rhs):
+        return self @ rhs
+
+    @classmethod
+    def concat(cls, *args):
+        """Concatenate vectors
+        Under the hood calls concat operator
+        If integer is passed, converts it to BitVec using from_val method.
+        """
+        res = BitVec(0)
+        for v in args:
+            if isinstance(v, int):
+                v = BitVec.from_val(v)
+            res @= v
+        return res
+
+    C = concat
+
+    @classmethod
+    def reduce(cls):
+        """
+        Returns a Reducer object that can be used to use bitwise operator as reduction operators
+        Ex in verilog: |4'b1101 == 1'b1
+        Here: bv.R|bv(4, 0b1101) == bv(1,0b1)
+        or  : bv.reduce()|bv(4, 0b1101)==bv(1,0b1)
+        """
+        return _REDUCER
+
+    R = reduce
+
+    def __setitem__(self, index, val):
+        if isinstance(val, int):
+            # same bits as BitVec.from_val(val)
+            val = val & ((1 << max(val.bit_length(), 1)) - 1)
+        elif isinstance(val, BitVec):
+            val = val.val
+        else:
+            raise TypeError(f"Expected RHS to be either BitVec or int; got {type(val)}")
+        if isinstance(index, int):
+            if index > (self.size - 1) or index < -self.size:
+                raise IndexError(
+                    f"Index {index} out of range; size of the vector is {self.size}"
+                )
+            elif index < 0:
+                index += self.size
+            self.val = (self.val & ~(1 << index)) | ((val & 1) << index)
+        elif isinstance(index, slice):
+            if index.step is not None:
+                raise IndexError("Step is not supported in BitVector set")
+            lsb, width, _, reverse = _decode_slice(self.size, index)
+            val &= (1 << width) - 1
+            if reverse:
+                val = _reverse_bits(val, width)
+            field = ((1 << width) - 1) << lsb
+            self.val = ((self.val & ~field) | (val << lsb)) & ((1 << self.size) - 1)
+        elif index is Ellipsis:
+            self.val = ((1 << self.size) - 1) & val
+        else:
+            raise IndexError(f"Index of type {type(index)} not expected")
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self[i]
+
+    def pattern_match(self, pattern=None, mask=None, as_mask=False):
+        """
+        Return an iterator returns index on the vector where MSB of the
+        pattern coincide with bitvector value
+        Ex: a = bv(12, 0b110111011101)
+        pat = a.pattern_match(bv(4, 0b1101))
+        next(pat) => 3
+        next(pat) => 7
+        ...
+
+        If no pattern is passed, default is assumed to be bv(1,1)
+
+        mask selects the pattern bits that take part in the compare, bits
+        cleared in mask are don't-care:
+        a.pattern_match(bv(4, 0b1001), mask=0b1001) matches 1xx1
+
+        With as_mask=True a BitVec of the same size is returned instead, with
+        a bit set at every index the iterator would give.
+
+        All alignments are tested at once: every pattern bit ANDs the hit
+        map with the vector (or its inverse) shifted by that bit, so the
+        cost is a few whole-integer operations per pattern bit
+        """
+        if pattern is None:
+            pattern = BitVec(1, 1)
+        assert isinstance(self, BitVec)
+        size, psize = self.size, pattern.size
+        hits = 0
+        if 0 < psize <= size:
+            care = (1 << psize) - 1
+            if mask is not None:
+                care &= mask.val if isinstance(mask, BitVec) else mask
+            val = self.val
+            inv = val ^ ((1 << size) - 1)
+            # bit i of hits: pattern matches with its LSB at index i
+            hits = (1 << (size - psize + 1)) - 1
+            for j in range(psize):
+                if (care >> j) & 1:
+                    hits &= (val if (pattern.val >> j) & 1 else inv) >> j
+                    if not hits:
+                        break
+            hits <<= psize - 1
+        if as_mask:
+            return BitVec(size, hits)
+        return _iter_set_bits(hits)
+
+    def get_all_set_bits(self):
+        """
+        Returns list of indices of set bits
+        Can be used directly as bv.get_all_set_bits(<int>)
+        """
+        if isinstance(self, int):
+            return list(_iter_set_bits(self))
+        return list(_iter_set_bits(self.val))
+
+    def get_all_reset_bits(self):
+        """Returns list of all indices of bits not set"""
+        if isinstance(self, int):
+            self = BitVec.from_val(self)
+        return list(_iter_set_bits(self.val ^ ((1 << self.size) - 1)))
+
+    def rank_index(self):
+        """
+        Returns the RankIndex (rank/select tables) of the vector
+        It is built on first use and rebuilt only once the value has changed,
+        e.g. through __setitem__ or set_val. See bitvec.rank for its size.
+        """
+        index = getattr(self, "_rank", None)
+        if (
+            index is None
+            or index.size != self.size
+            or (index.val is not self.val and index.val != self.val)
+        ):
+            index = RankIndex(self.size, self.val)
+            object.__setattr__(self, "_rank", index)
+        return index
+
+    def rank1(self, i):
+        """Number of set bits below index i"""
+        return self.rank_index().rank1(i)
+
+    def rank0(self, i):
+        """Number of reset bits below index i"""
+        return self.rank_index().rank0(i)
+
+    def select1(self, k):
+        """Index of the k-th set bit, counting from 0"""
+        return self.rank_index().select1(k)
+
+    def select0(self, k):
+        """Index of the k-th reset bit, counting from 0"""
+        return self.rank_index().select0(k)
+
+    def get_parity(self):
+        """Returns parity of vector"""
+        return BitVec.reduce() ^ self
+
+    def popcount(self):
+        """Returns number of set bits"""
+        return self.val.bit_count()
+
+    def inplace(self, enable=True):
+        """
+        Switch the vector to in-place operators (see InPlaceBitVec), or
+        back with enable=False. Returns the vector itself.
+        """
+        if isinstance(self, FrozenBitVec):
+            raise TypeError(f"{type(self).__name__} is immutable")
+        if isinstance(self, WordBitVec):
+            raise TypeError("In-place operators need the int backend; use to_backend(\"int\")")
+        self.__class__ = InPlaceBitVec if enable else BitVec
+        return self
+
+    def __reduce__(self):
+        # a constructor call pickles smaller than the slots, and leaves out the rank cache
+        return (type(self), (self.size, self.val, self.is_signed))
+
+    def freeze(self):
+        """Immutable, hashable copy of the vector (see FrozenBitVec)"""
+        return FrozenBitVec(self.size, self.val, self.is_signed)
+
+    def view(self, msb, lsb=None, signed=False):
+        """
+        Returns a BitVecView of bits msb..lsb (bit msb alone when lsb is None)
+        The view shares the vector's bits instead of copying them, see BitVecView
+        """
+        return BitVecView(self, msb, msb if lsb is None else lsb, signed)
+
+
+class Reducer:
+    """
+    This is a helper class to introduce reduce operation in a readable fashion
+    Use case:
+    from bitvec import Reducer as R
+
+    R| bv(9, 0b1111) => bv(1,1)
+
+    This works on binary bitwise operators (|, &, ^), the inverted forms are
+    provided as nand, nor and xnor methods
+
+    alternatively, this object is provided in bv class as classmethod
+    bv.reduce()|bv(9, 0b11010101) or bv.R()|bv(9, 0b11101010) (recommonded)
+
+    Each reduction is a single integer test on the value. A list or tuple of
+    vectors gives a list of results and a BitVecArray gives a 1 bit
+    BitVecArray, one result per element:
+    bv.R() ^ [bv(4, 0b1101), bv(4, 0b1001)] => [bv(1,1), bv(1,0)]
+    """
+
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        pass
+
+    def _batch(self, op, name, method):
+        if isinstance(op, BitVecArray):
+            return getattr(op, "reduce_" + name)()
+        if isinstance(op, (list, tuple)):
+            return [method(v) for v in op]
+        raise TypeError(f"Expected BitVec, list of BitVec or BitVecArray; got {type(op)}")
+
+    def __or__(self, op: BitVec) -> BitVec:
+        if isinstance(op, BitVec):
+            return _bit(op.val != 0)
+        return self._batch(op, "or", self.__or__)
+
+    def __and__(self, op: BitVec) -> BitVec:
+        if isinstance(op, BitVec):
+            return _bit(op.val == (1 << op.size) - 1)
+        return self._batch(op, "and", self.__and__)
+
+    def __xor__(self, op: BitVec) -> BitVec:
+        if isinstance(op, BitVec):
+            return _bit(op.val.bit_count() & 1)
+        return self._batch(op, "xor", self.__xor__)
+
+    def nor(self, op: BitVec) -> BitVec:
+        """Inverted OR reduction, ~| in verilog"""
+        if isinstance(op, BitVec):
+            return _bit(op.val == 0)
+        return self._batch(op, "nor", self.nor)
+
+    def nand(self, op: BitVec) -> BitVec:
+        """Inverted AND reduction, ~& in verilog"""
+        if isinstance(op, BitVec):
+            return _bit(op.val != (1 << op.size) - 1)
+        return self._batch(op, "nand", self.nand)
+
+    def xnor(self, op: BitVec) -> BitVec:
+        """Inverted XOR reduction, ~^ in verilog"""
+        if isinstance(op, BitVec):
+            return _bit((op.val.bit_count() & 1) ^ 1)
+        return self._batch(op, "xnor", self.xnor)
+
+
+def _bit(test):
+    """Interned 1 bit result of a reduction"""
+    try:
+        return _BITS[test]
+    except TypeError:  # symbolic value while tracing
+        return FrozenBitVec(1, test)
+
+
+_REDUCER = Reducer()
+
+
+class FrozenBitVec(BitVec):
+    """
+    Immutable BitVec
+    Indexing, small part-selects and reductions return shared FrozenBitVec
+    constants instead of allocating a new vector each time. Use
+    x.thaw() or BitVec(x.size, x) for a mutable copy.
+    Frozen vectors are hashable, so they work as dict keys and set members.
+    The hash is that of get_val(), consistent with ==, which compares
+    values: FrozenBitVec(8, 5) and 5 are the same dict key.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, size=32, val=0, signed=False):
+        if isinstance(val, BitVec):
+            val = val.val
+        object.__setattr__(self, "val", val & ((1 << size) - 1))
+        object.__setattr__(self, "size", size)
+        object.__setattr__(self, "is_signed", signed)
+
+    def __setattr__(self, name, value):
+        raise TypeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise TypeError(f"{type(self).__name__} is immutable")
+
+    def __hash__(self):
+        return hash(self.get_val())
+
+    def freeze(self):
+        return self
+
+    def thaw(self):
+        """Mutable BitVec copy"""
+        return BitVec(self.size, self.val, self.is_signed)
+
+    def set_val(self, val):
+        raise TypeError(f"{type(self).__name__} is immutable")
+
+    def __setitem__(self, index, val):
+        raise TypeError(f"{type(self).__name__} is immutable")
+
+
+def _bitwise_operand(lhs):
+    """Right operand of &, | and ^ as the operators read it"""
+    if isinstance(lhs, int):
+        # an int is taken as BitVec.from_val would store it
+        return lhs if lhs >= 0 else lhs & ((1 << lhs.bit_length()) - 1)
+    return lhs.val
+
+
+class InPlaceBitVec(BitVec):
+    """
+    BitVec whose in-place operators (+=, -=, *=, **=, /=, //=, %=, &=, |=,
+    ^=, <<=, >>=) update the vector itself: the result is masked to the
+    vector size, signedness is kept, and the same object is returned, so
+    no vector is allocated and every reference to it sees the new value.
+    Values are those of the ordinary in-place operators.
+
+    Opt in per vector with InPlaceBitVec(size, val), bv(...).inplace(), or
+    for a whole module with: from bitvec.inplace import BitVec as bv
+    """
+
+    __slots__ = ()
+
+    def __iadd__(self, lhs):
+        self.val = (self.val + (lhs if isinstance(lhs, int) else lhs.val)) & (
+            (1 << self.size) - 1
+        )
+        return self
+
+    def __isub__(self, lhs):
+        self.val = (self.val - (lhs if isinstance(lhs, int) else lhs.val)) & (
+            (1 << self.size) - 1
+        )
+        return self
+
+    def __imul__(self, lhs):
+        self.val = (self.val * (lhs if isinstance(lhs, int) else lhs.val)) & (
+            (1 << self.size) - 1
+        )
+        return self
+
+    def __ipow__(self, lhs):
+        self.val = pow(self.val, lhs if isinstance(lhs, int) else lhs.val, 1 << self.size)
+        return self
+
+    def __itruediv__(self, lhs):
+        self.val = BitVec.__truediv__(self, lhs).val & ((1 << self.size) - 1)
+        return self
+
+    def __ifloordiv__(self, lhs):
+        self.val = BitVec.__floordiv__(self, lhs).val & ((1 << self.size) - 1)
+        return self
+
+    def __imod__(self, lhs):
+        self.val = BitVec.__mod__(self, lhs).val & ((1 << self.size) - 1)
+        return self
+
+    def __iand__(self, lhs):
+        self.val &= _bitwise_operand(lhs)
+        return self
+
+    def __ior__(self, lhs):
+        self.val = (self.val | _bitwise_operand(lhs)) & ((1 << self.size) - 1)
+        return self
+
+    def __ixor__(self, lhs):
+        self.val = (self.val ^ _bitwise_operand(lhs)) & ((1 << self.size) - 1)
+        return self
+
+    def __ilshift__(self, lhs):
+        self.val = (self.val << (lhs if isinstance(lhs, int) else lhs.val)) & (
+            (1 << self.size) - 1
+        )
+        return self
+
+    def __irshift__(self, lhs):
+        self.val >>= lhs if isinstance(lhs, int) else lhs.val
+        return self
+
+
+class BitVecView(InPlaceBitVec):
+    """
+    Window on bits [msb:lsb] of a parent vector, made by BitVec.view
+    No bits are copied: val is read from the parent on each access and every
+    write (set_val, part-select assignment, bv.assign, in-place operators)
+    goes straight to the parent's bits. Otherwise the view is an ordinary
+    InPlaceBitVec of size msb - lsb + 1.
+
+    a = bv(64)
+    hi = a.view(63, 32)
+    hi += 1                 #a[63:32] incremented, nothing else touched
+    hi.view(7, 0)[...] = 5  #same as a.view(39, 32); views of views are flattened
+
+    A view of a FrozenBitVec is read-only.
+    """
+
+    __slots__ = ("_parent", "_lsb")
+
+    def __init__(self, parent, msb, lsb, signed=False):
+        if not 0 <= lsb <= msb < parent.size:
+            raise IndexError(
+                f"View [{msb}:{lsb}] out of range or reversed; size of the vector is {parent.size}"
+            )
+        self.size = msb - lsb + 1
+        self.is_signed = signed
+        if isinstance(parent, BitVecView):
+            lsb += parent._lsb
+            parent = parent._parent
+        self._parent = parent
+        self._lsb = lsb
+
+    @property
+    def val(self):
+        return (self._parent.val >> self._lsb) & ((1 << self.size) - 1)
+
+    @val.setter
+    def val(self, val):
+        parent, lsb, mask = self._parent, self._lsb, (1 << self.size) - 1
+        parent.val = (parent.val & ~(mask << lsb)) | ((val & mask) << lsb)
+
+    @property
+    def parent(self):
+        """The vector holding the bits, never itself a view"""
+        return self._parent
+
+    @property
+    def lsb(self):
+        """Position of the view's bit 0 in the parent"""
+        return self._lsb
+
+    def __reduce__(self):
+        msb = self._lsb + self.size - 1
+        return (type(self), (self._parent, msb, self._lsb, self.is_signed))
+
+    def inplace(self, enable=True):
+        if not enable:
+            raise TypeError("A BitVecView always writes through; copy it with BitVec(v.size, v)")
+        return self
+
+
+def _switch_backend(vec, backend):
+    """Turn a BitVec under construction into the class of `backend`"""
+    if backend not in ("int", "words"):
+        raise ValueError(f"Unknown backend {backend!r}; expected 'int' or 'words'")
+    if type(vec) not in (BitVec, WordBitVec):
+        raise TypeError(f"{type(vec).__name__} has no {backend!r} backend")
+    vec.__class__ = WordBitVec if backend == "words" else BitVec
+
+
+# active profile(), memoize() and overflow() blocks, innermost last. Each one
+# wraps the methods as it finds them, so they must stop in reverse order.
+_patchers = []
+
+
+def _start_patching(tool):
+    _patchers.append(tool)
+
+
+def _stop_patching(tool):
+    """Called by tool.stop() before it restores anything; refuses out of order stops"""
+    if not any(t is tool for t in _patchers):
+        return
+    if _patchers[-1] is not tool:
+        raise RuntimeError(
+            f"Cannot stop {type(tool).__name__} while {type(_patchers[-1]).__name__}, "
+            "started after it, is active; stop that one first"
+        )
+    _patchers.pop()
+
+
+# storage slot of BitVec.val, holding the word array of a WordBitVec
+_VAL_SLOT = BitVec.__dict__["val"]
+
+
+def _to_int(words):
+    if sys.byteorder != "little":
+        words = array("Q", words)
+        words.byteswap()
+    return int.from_bytes(words, "little")
+
+
+def _to_words(val, nwords):
+    words = array("Q", val.to_bytes(nwords * 8, "little"))
+    if sys.byteorder != "little":
+        words.byteswap()
+    return words
+
+
+class WordBitVec(BitVec):
+    """
+    BitVec backed by a mutable array of 64 bit words, for very large vectors
+    Made with BitVec(size, val, signed, backend="words") or to_backend("words").
+
+    Bit reads and writes and part-selects touch only the words they cover,
+    so a[i] = 1 on a 100M bit vector is O(1) instead of rebuilding the
+    integer. &, |, ^, ~ and shifts return words backend vectors; every other
+    operation reads val, which assembles the integer from the words in one
+    pass, and returns an int backend vector as usual.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, size=32, val=0, signed=False, backend=None):
+        if backend is not None and backend != "words":
+            _switch_backend(self, backend)
+            self.__init__(size, val, signed)
+            return
+        if isinstance(val, WordBitVec):
+            words = array("Q", _VAL_SLOT.__get__(val))
+            if val.size > size:
+                # drop the words and bits above size
+                del words[(size + 63) // 64 :]
+                if size & 63:
+                    words[-1] &= (1 << (size & 63)) - 1
+            words.frombytes(bytes(8 * ((size + 63) // 64 - len(words))))
+        else:
+            if isinstance(val, BitVec):
+                val = val.val
+            words = _to_words(val & ((1 << size) - 1), (size + 63) // 64)
+        _VAL_SLOT.__set__(self, words)
+        object.__setattr__(self, "_rank", None)
+        self.size = size
+        self.is_signed = signed
+
+    @property
+    def backend(self):
+        return "words"
+
+    @property
+    def words(self):
+        """
+        The word array, bit i of the vector is bit i % 64 of words[i // 64]
+        Writing to it directly does not invalidate a cached rank_index().
+        """
+        return _VAL_SLOT.__get__(self)
+
+    @property
+    def val(self):
+        return _to_int(_VAL_SLOT.__get__(self))
+
+    @val.setter
+    def val(self, val):
+        size = self.size
+        _VAL_SLOT.__set__(self, _to_words(val & ((1 << size) - 1), (size + 63) // 64))
+        object.__setattr__(self, "_rank", None)
+
+    def rank_index(self):
+        """
+        Returns the RankIndex of the vector, rebuilt only after a write
+        Writes through __setitem__ and val drop the cached index, so a
+        query never assembles val to compare it.
+        """
+        index = getattr(self, "_rank", None)
+        if index is None or index.size != self.size:
+            index = RankIndex(self.size, self.val)
+            object.__setattr__(self, "_rank", index)
+        return index
+
+    def __reduce__(self):
+        return (type(self), (self.size, self.val, self.is_signed))
+
+    def _window(self, lsb, width):
+        """Bits lsb.. of the value, read from the words covering lsb..lsb+width-1"""
+        words = _VAL_SLOT.__get__(self)
+        return _to_int(words[lsb >> 6 : (lsb + width + 63) >> 6]) >> (lsb & 63)
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            if index > self.size - 1:
+                raise ValueError(f"index {index} > size-1 {self.size-1}")
+            if index < 0:
+                if index < -self.size:
+                    raise ValueError(f"index {index} < -size {-self.size}")
+                index += self.size
+            return _BITS[(_VAL_SLOT.__get__(self)[index >> 6] >> (index & 63)) & 1]
+        elif isinstance(index, slice):
+            lsb, width, step, reverse = _decode_slice(self.size, index)
+            span = (width - 1) * step + 1
+            window = self._window(lsb, span) & ((1 << span) - 1)
+            val = window if step == 1 else _gather_bits(window, width, step)
+            if reverse:
+                val = _reverse_bits(val, width)
+            return BitVec(width, val)
+        raise IndexError(f"Index of type {type(index)} not expected")
+
+    def __setitem__(self, index, val):
+        if isinstance(index, int):
+            if index > (self.size - 1) or index < -self.size:
+                raise IndexError(
+                    f"Index {index} out of range; size of the vector is {self.size}"
+                )
+            elif index < 0:
+                index += self.size
+            if isinstance(val, BitVec):
+                val = val.val
+            elif not isinstance(val, int):
+                raise TypeError(f"Expected RHS to be either BitVec or int; got {type(val)}")
+            words, k, bit = _VAL_SLOT.__get__(self), index >> 6, 1 << (index & 63)
+            words[k] = (words[k] | bit) if val & 1 else (words[k] & ~bit)
+            object.__setattr__(self, "_rank", None)
+        elif isinstance(index, slice):
+            if index.step is not None:
+                raise IndexError("Step is not supported in BitVector set")
+            if isinstance(val, int):
+                val = val & ((1 << max(val.bit_length(), 1)) - 1)
+            elif isinstance(val, BitVec):
+                val = val.val
+            else:
+                raise TypeError(f"Expected RHS to be either BitVec or int; got {type(val)}")
+            lsb, width, _, reverse = _decode_slice(self.size, index)
+            val &= (1 << width) - 1
+            if reverse:
+                val = _reverse_bits(val, width)
+            words = _VAL_SLOT.__get__(self)
+            # a slice reaching past the MSB only writes the words the vector has
+            lo = min(lsb >> 6, len(words))
+            hi = min((lsb + width + 63) >> 6, len(words))
+            shift = lsb & 63
+            old = _to_int(words[lo:hi])
+            field = ((1 << width) - 1) << shift
+            new = (old & ~field) | (val << shift)
+            new &= (1 << (min(self.size, hi * 64) - lo * 64)) - 1
+            words[lo:hi] = _to_words(new, hi - lo)
+            object.__setattr__(self, "_rank", None)
+        else:
+            BitVec.__setitem__(self, index, val)
+
+    def _result(self, res):
+        """res as a words backend vector"""
+        return WordBitVec(res.size, res.val, res.is_signed)
+
+    def __and__(self, lhs):
+        return self._result(BitVec.__and__(self, lhs))
+
+    def __rand__(self, lhs):
+        return self._result(BitVec.__rand__(self, lhs))
+
+    def __iand__(self, lhs):
+        return self._result(BitVec.__iand__(self, lhs))
+
+    def __or__(self, lhs):
+        return self._result(BitVec.__or__(self, lhs))
+
+    def __ror__(self, lhs):
+        return self._result(BitVec.__ror__(self, lhs))
+
+    def __ior__(self, lhs):
+        return self._result(BitVec.__ior__(self, lhs))
+
+    def __xor__(self, lhs):
+        return self._result(BitVec.__xor__(self, lhs))
+
+    def __rxor__(self, lhs):
+        return self._result(BitVec.__rxor__(self, lhs))
+
+    def __ixor__(self, lhs):
+        return self._result(BitVec.__ixor__(self, lhs))
+
+    def __invert__(self):
+        return self._result(BitVec.__invert__(self))
+
+    def __lshift__(self, lhs):
+        return self._result(BitVec.__lshift__(self, lhs))
+
+    def __ilshift__(self, lhs):
+        return self._result(BitVec.__ilshift__(self, lhs))
+
+    def __rshift__(self, lhs):
+        return self._result(BitVec.__rshift__(self, lhs))
+
+    def __irshift__(self, lhs):
+        return self._result(BitVec.__irshift__(self, lhs))
+
+
+# The two interned 1 bit values, returned by a[i] and the reductions
+_BITS = (FrozenBitVec(1, 0), FrozenBitVec(1, 1))
+
+
+from .batch import BitVecArray  # noqa: E402
+from .rank import RankIndex  # noqa: E402
+from .layout import BitStruct  # noqa: E402
+from .fixed import SBitVec, fixed_type  # noqa: E402
+from .trace import TracingError, compile  # noqa: E402
+from .instrument import profile  # noqa: E402
+from .memo import memoize  # noqa: E402
+from .arith import overflow, wrapping  # noqa: E402
@@ -0,0 +1,222 @@
+"""
+Fixed-width arithmetic modes
+
+By default + and - return max(size) + 1 bits and * and ** return as many
+bits as the product needs, so `a = a + 1` in a loop grows the vector by a
+bit every iteration. Inside an overflow() block +, -, * and ** and their
+in-place forms keep the width of the left operand instead, and a result
+that does not fit is handled by the mode:
+
+    "wrap"      modulo 2^width, as hardware registers do (** uses pow(a, b, 2^width))
+    "saturate"  clamped to the smallest or largest value of the width
+    "raise"     OverflowError
+    "grow"      the default behaviour, nothing is changed
+
+import bitvec
+
+with bitvec.wrapping() as flags:       #same as bitvec.overflow("wrap")
+    a = bv(8, 250)
+    a = a + 10                         #==> bv(8, 4)
+flags.overflow                         #==> True, set by any result that did not fit
+flags.carry                            #carry (or borrow) out of the last + or -
+
+The result is signed as for the ordinary operators, so ** gives an
+unsigned vector, and the operands they accept are unchanged (an int
+exponent of ** is only taken by InPlaceBitVec's **=). Overflow is judged on
+the values as get_val() reads them, so a signed 8 bit result overflows
+outside -128..127 and an unsigned one outside 0..255. `overflow` stays set
+until clear(); `carry` is the unsigned carry out of the last addition, or
+the borrow of the last subtraction. In-place operators of an InPlaceBitVec
+still update the vector itself, a BitVec[n] operand gives a result of a
+specialized type, and all other results are plain BitVecs.
+Like bitvec.profile(), the operators are only patched while the block is
+active, only one mode can be active at a time, and it is not thread safe.
+Started by hand, an overflow mode has to stop before any profile() or
+memoize() started after it.
+"""
+
+from inspect import unwrap
+
+from . import BitVec, InPlaceBitVec, _start_patching, _stop_patching, fixed
+
+MODES = ("wrap", "saturate", "raise", "grow")
+# operator -> (operation, in-place)
+_OPERATORS = {
+    "__add__": ("add", False),
+    "__iadd__": ("add", True),
+    "__sub__": ("sub", False),
+    "__isub__": ("sub", True),
+    "__mul__": ("mul", False),
+    "__imul__": ("mul", True),
+    "__pow__": ("pow", False),
+    "__ipow__": ("pow", True),
+}
+
+# the one ** operator that accepts an int exponent
+_INT_POW = InPlaceBitVec.__dict__["__ipow__"]
+
+_active = None
+
+
+def _subclasses(cls):
+    yield cls
+    for sub in cls.__subclasses__():
+        yield from _subclasses(sub)
+
+
+class Overflow:
+    """Overflow mode and flags of one overflow() block, see the module docstring"""
+
+    def __init__(self, mode="wrap"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown overflow mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.overflow = False
+        self.carry = False
+        self._saved = []
+
+    def __repr__(self):
+        return f"Overflow({self.mode!r}, overflow={self.overflow}, carry={self.carry})"
+
+    def clear(self):
+        """Reset the flags"""
+        self.overflow = False
+        self.carry = False
+
+    def _power(self, base, exp, size):
+        """(base ** exp modulo 2^size, exact power or None when it is surely out of range)"""
+        if exp < 0:
+            raise ValueError(f"Negative exponent {exp}")
+        wrapped = pow(base, exp, 1 << size) if size else 0
+        bits = abs(base).bit_length()
+        if bits >= 2 and exp * (bits - 1) > size:
+            # |base ** exp| >= 2 ** (exp * (bits - 1)), more than any size bit value
+            return wrapped, None
+        # here base ** exp has at most 2 * size + 1 bits
+        return wrapped, base**exp
+
+    def _apply(self, vec, lhs, op, inplace):
+        size = vec.size
+        mask = (1 << size) - 1
+        if op == "pow":
+            # ** works on the unsigned bits and gives an unsigned vector;
+            # only InPlaceBitVec's **= keeps the signedness of the vector
+            signed = inplace and isinstance(vec, InPlaceBitVec) and vec.is_signed
+        elif isinstance(lhs, int):
+            signed = vec.is_signed
+            other = lhs
+        else:
+            signed = vec.is_signed | lhs.is_signed
+            other = lhs.get_val()
+        if signed and size:
+            lo, hi = -(1 << (size - 1)), (1 << (size - 1)) - 1
+        else:
+            lo, hi = 0, mask
+        a = vec.get_val() if signed else vec.val
+        if op == "add":
+            exact = a + other
+            self.carry = (vec.val + (other & mask)) >> size != 0
+        elif op == "sub":
+            exact = a - other
+            self.carry = vec.val < (other & mask)
+        elif op == "mul":
+            exact = a * other
+        else:
+            exp = lhs if isinstance(lhs, int) else lhs.val
+            wrapped, exact = self._power(a, exp, size)
+        if exact is not None and lo <= exact <= hi:
+            return self._result(vec, exact & mask, signed, inplace)
+        self.overflow = True
+        if self.mode == "raise":
+            shown = "" if exact is None else f" {exact}"
+            kind = "signed" if signed else "unsigned"
+            raise OverflowError(f"{op} result{shown} does not fit in {size} {kind} bits")
+        if self.mode == "saturate":
+            if exact is None:
+                # only an odd power of a negative base is negative
+                negative = a < 0 and exp & 1
+            else:
+                negative = exact < lo
+            val = (lo if negative else hi) & mask
+        else:
+            val = wrapped if op == "pow" else exact & mask
+        return self._result(vec, val, signed, inplace)
+
+    @staticmethod
+    def _result(vec, val, signed, inplace):
+        if inplace and isinstance(vec, InPlaceBitVec):
+            vec.val = val
+            return vec
+        if type(vec) in fixed._TYPES:
+            # keep the fast paths of BitVec[n]: same width, so a specialized result
+            return fixed.fixed_type(vec.size, signed)(val)
+        return BitVec(vec.size, val, signed)
+
+    def _wrap(self, func, op, inplace):
+        apply = self._apply
+        # only InPlaceBitVec's **= takes an int exponent outside of a block
+        int_operand = op != "pow" or unwrap(func) is _INT_POW
+
+        def wrapper(vec, lhs):
+            if not isinstance(lhs, BitVec) and not (int_operand and isinstance(lhs, int)):
+                return func(vec, lhs)
+            return apply(vec, lhs, op, inplace)
+
+        wrapper.__name__ = func.__name__
+        wrapper.__qualname__ = func.__qualname__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def start(self):
+        """Patch the arithmetic operators of BitVec and its subclasses"""
+        global _active
+        if _active is not None:
+            raise RuntimeError("A bitvec overflow mode is already active")
+        if self.mode != "grow":
+            for cls in _subclasses(BitVec):
+                self._patch(cls)
+            # specialized types made inside the block, e.g. the bv[33] of bv[32] + bv[32]
+            fixed._NEW_TYPE_HOOKS.append(self._patch)
+        _start_patching(self)
+        _active = self
+        return self
+
+    def _patch(self, cls):
+        for name, (op, inplace) in _OPERATORS.items():
+            func = cls.__dict__.get(name)
+            if func is not None:
+                self._saved.append((cls, name, func))
+                setattr(cls, name, self._wrap(func, op, inplace))
+
+    def stop(self):
+        """Put the original operators back"""
+        global _active
+        _stop_patching(self)
+        if self._patch in fixed._NEW_TYPE_HOOKS:
+            fixed._NEW_TYPE_HOOKS.remove(self._patch)
+        for cls, name, func in reversed(self._saved):
+            setattr(cls, name, func)
+        self._saved.clear()
+        if _active is self:
+            _active = None
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def overflow(mode="wrap"):
+    """
+    Fixed-width arithmetic in "wrap", "saturate", "raise" or "grow" mode, for
+    use in a with block or with start()/stop(); see bitvec.arith
+    """
+    return Overflow(mode)
+
+
+def wrapping():
+    """overflow("wrap"): results keep the width of the left operand, modulo 2^width"""
+    return Overflow("wrap")
@@ -0,0 +1,674 @@
+"""
+Provides BitVecArray: a batch of same width BitVec values
+
+Elements are packed side by side into 64 bit lanes of one Python integer
+(widths over 64 bits take several lanes), so that bitwise operators, shifts,
+add/sub, comparisons, slicing and concatenation run as a handful of big
+integer operations over the whole batch instead of one BitVec per element.
+"""
+
+import sys
+from array import array
+from functools import lru_cache
+
+from . import BitVec, _decode_slice
+
+LANE = 64
+
+
+def _mask(size):
+    return (1 << size) - 1
+
+
+def _stride(size):
+    """Bits reserved per element: whole 64 bit lanes, at least one"""
+    return LANE * max(1, -(-size // LANE))
+
+
+@lru_cache(maxsize=32)
+def _rep(value, stride, count):
+    """`value` copied into every one of `count` lanes of `stride` bits"""
+    return int.from_bytes(value.to_bytes(stride // 8, "little") * count, "little")
+
+
+def _restride(packed, count, old, new):
+    """Move every element from `old` to `new` bit lanes; truncates when shrinking"""
+    if old == new or count == 0:
+        return packed
+    ob, nb = old // 8, new // 8
+    if new < old:
+        packed &= _rep(_mask(new), old, count)
+    src = packed.to_bytes(ob * count, "little")
+    dst = bytearray(nb * count)
+    for k in range(min(ob, nb)):
+        dst[k::nb] = src[k::ob]
+    return int.from_bytes(dst, "little")
+
+
+def _pack(values, stride):
+    """Pack non-negative ints, each below 2**stride"""
+    if stride == LANE:
+        words = array("Q", values)
+        if sys.byteorder != "little":
+            words.byteswap()
+        return int.from_bytes(words.tobytes(), "little")
+    nbytes = stride // 8
+    return int.from_bytes(b"".join(v.to_bytes(nbytes, "little") for v in values), "little")
+
+
+def _unpack(packed, count, stride):
+    nbytes = stride // 8
+    raw = packed.to_bytes(nbytes * count, "little")
+    if stride == LANE:
+        words = array("Q")
+        words.frombytes(raw)
+        if sys.byteorder != "little":
+            words.byteswap()
+        return words.tolist()
+    return [
+        int.from_bytes(raw[i : i + nbytes], "little")
+        for i in range(0, nbytes * count, nbytes)
+    ]
+
+
+def _as_array(vectors):
+    """A BitVecArray as is, or BitVecs of one size and signedness as a BitVecArray"""
+    if isinstance(vectors, BitVecArray):
+        return vectors
+    vectors = list(vectors)
+    kinds = {(v.size, v.is_signed) for v in vectors}
+    if len(kinds) > 1:
+        raise ValueError(f"Vectors of one size and signedness expected; got {sorted(kinds)}")
+    size, signed = kinds.pop() if kinds else (1, False)
+    return BitVecArray(size, vectors, signed)
+
+
+class BitVecArray:
+    """
+    Batch of `count` bitvectors of the same size and signedness.
+    Example usage:
+    from bitvec import BitVec as bv, BitVecArray as bva
+
+    a = bva(16, [0x1234, 0xff00, 7])
+    b = bva(16, [1, 2, 3])
+
+    a ^ b        #element-wise, same result as bv(16, x) ^ bv(16, y) per element
+    a[7:0]       #low byte of every element
+    a @ b        #32 bit concatenation of every pair
+    a + 1        #scalars (int or BitVec) broadcast over the batch
+    a.get_val()  #list of integer values
+
+    Operators follow the widths and signedness rules of BitVec element by
+    element. Bitwise operators, shifts, add/sub, comparisons, slicing and
+    concatenation are evaluated on the packed lanes for the whole batch at
+    once; *, **, /, // and % fall back to the scalar operator per element.
+    Comparisons return a 1 bit array with one result per element.
+
+    Element access with at(i) is meant for occasional use, iterate or use
+    tolist()/get_val() to walk the whole batch.
+    """
+
+    size: int
+    count: int
+    is_signed: bool
+    stride: int
+    packed: int
+
+    def __init__(self, size=32, values=(), signed=False):
+        mask = _mask(size)
+        values = [
+            (v.val if isinstance(v, BitVec) else v) & mask for v in values
+        ]
+        self.size = size
+        self.count = len(values)
+        self.is_signed = signed
+        self.stride = _stride(size)
+        self.packed = _pack(values, self.stride)
+
+    @classmethod
+    def _new(cls, size, count, signed, packed, stride=None):
+        """Wrap already packed lanes; lanes wider than needed are narrowed"""
+        arr = cls.__new__(cls)
+        arr.size = size
+        arr.count = count
+        arr.is_signed = signed
+        arr.stride = _stride(size)
+        if stride is not None and stride != arr.stride:
+            packed = _restride(packed, count, stride, arr.stride)
+        arr.packed = packed
+        return arr
+
+    @classmethod
+    def zeros(cls, size, count, signed=False):
+        """Batch of `count` zero vectors"""
+        return cls._new(size, count, signed, 0)
+
+    @classmethod
+    def from_bitvecs(cls, vectors, size=None, signed=None):
+        """
+        Build from a sequence of BitVec
+        Size and signedness default to the widest element and the first element
+        """
+        vectors = list(vectors)
+        if size is None:
+            size = max((v.size for v in vectors), default=1)
+        if signed is None:
+            signed = vectors[0].is_signed if vectors else False
+        return cls(size, vectors, signed)
+
+    @classmethod
+    def from_bytes(cls, size, data, signed=False):
+        """
+        Build from little endian records of stride//8 bytes each,
+        the layout produced by to_bytes
+        """
+        stride = _stride(size)
+        count = len(data) // (stride // 8)
+        packed = int.from_bytes(data, "little") & _rep(_mask(size), stride, count)
+        return cls._new(size, count, signed, packed)
+
+    def to_bytes(self):
+        """Little endian records of stride//8 bytes, one per element"""
+        return self.packed.to_bytes(self.stride // 8 * self.count, "little")
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for v in _unpack(self.packed, self.count, self.stride):
+            yield BitVec(self.size, v, self.is_signed)
+
+    def tolist(self):
+        """Elements as a list of BitVec"""
+        return list(self)
+
+    def at(self, i):
+        """Element i as a BitVec"""
+        if not -self.count <= i < self.count:
+            raise IndexError(f"Element {i} out of range; count is {self.count}")
+        i %= self.count
+        return BitVec(self.size, self.packed >> (i * self.stride), self.is_signed)
+
+    def get_val(self):
+        """List of integer values, signed arrays interpreted as 2's complement"""
+        vals = _unpack(self.packed, self.count, self.stride)
+        if self.is_signed and self.size:
+            sign = 1 << (self.size - 1)
+            return [(v ^ sign) - sign for v in vals]
+        return vals
+
+    def __repr__(self):
+        sign = ", signed=True" if self.is_signed else ""
+        return f"BitVecArray({self.size}, {self.get_val()}{sign})"
+
+    def shift_elements(self, k, fill=0):
+        """
+        Elements moved k places towards the end (k > 0) or the start (k < 0);
+        the places left empty take the value fill
+        """
+        n, stride = self.count, self.stride
+        fill = (fill.val if isinstance(fill, BitVec) else fill) & _mask(self.size)
+        k = max(-n, min(k, n))
+        if k >= 0:
+            packed = ((self.packed << (k * stride)) & _mask(n * stride)) | _rep(fill, stride, k)
+        else:
+            k = -k
+            packed = (self.packed >> (k * stride)) | (_rep(fill, stride, k) << ((n - k) * stride))
+        return BitVecArray._new(self.size, n, self.is_signed, packed)
+
+    # lane helpers
+    def _at(self, stride):
+        """Packed lanes moved to `stride` bits per element"""
+        return _restride(self.packed, self.count, self.stride, stride)
+
+    def _fill(self, value, stride=None):
+        return _rep(value, self.stride if stride is None else stride, self.count)
+
+    def _coerce(self, other):
+        """Right operand as an array of the same count; scalars are broadcast"""
+        if isinstance(other, BitVecArray):
+            if other.count != self.count:
+                raise ValueError(
+                    f"Element count mismatch: {self.count} and {other.count}"
+                )
+            return other
+        if isinstance(other, int):
+            other = BitVec(other.bit_length(), other)
+        if isinstance(other, BitVec):
+            stride = _stride(other.size)
+            val = other.val & _mask(other.size)
+            return BitVecArray._new(
+                other.size, self.count, other.is_signed, _rep(val, stride, self.count)
+            )
+        raise TypeError(f"Expected BitVecArray, BitVec or int; got {type(other)}")
+
+    def _map(self, other, op):
+        """
+        Element-wise fallback through the scalar operator
+        The batch has one size, that of the widest element result, so
+        element i may be wider than op(self[i], other) itself.
+        """
+        if isinstance(other, BitVecArray):
+            rhs = self._coerce(other)
+        else:
+            rhs = [other] * self.count
+        res = [op(a, b) for a, b in zip(self, rhs)]
+        if not res:
+            return BitVecArray(self.size, (), self.is_signed)
+        return BitVecArray.from_bitvecs(res)
+
+    # add method
+    def __add__(self, lhs):
+        n = self.count
+        if isinstance(lhs, int):
+            size = max(self.size, lhs.bit_length()) + 1
+            stride = _stride(size + 1)
+            packed = (self._at(stride) + _rep(lhs & _mask(size), stride, n)) & _rep(
+                _mask(size), stride, n
+            )
+            return BitVecArray._new(size, n, self.is_signed, packed, stride)
+        lhs = self._coerce(lhs)
+        size = max(self.size, lhs.size) + 1
+        stride = _stride(size)
+        packed = self._at(stride) + lhs._at(stride)
+        return BitVecArray._new(
+            size, n, self.is_signed | lhs.is_signed, packed, stride
+        )
+
+    # inplace add method
+    def __iadd__(self, lhs):
+        n, size = self.count, self.size
+        if isinstance(lhs, int):
+            signed = self.is_signed
+            addend = _rep(lhs & _mask(size), _stride(size + 1), n)
+        else:
+            lhs = self._coerce(lhs)
+            signed = self.is_signed | lhs.is_signed
+            addend = lhs._at(_stride(size + 1)) & _rep(_mask(size), _stride(size + 1), n)
+        stride = _stride(size + 1)
+        packed = (self._at(stride) + addend) & _rep(_mask(size), stride, n)
+        return BitVecArray._new(size, n, signed, packed, stride)
+
+    # sub method
+    def __sub__(self, lhs):
+        n = self.count
+        if isinstance(lhs, int):
+            size = max(self.size, lhs.bit_length()) + 1
+            stride = _stride(size + 1)
+            packed = (self._at(stride) + _rep(-lhs & _mask(size), stride, n)) & _rep(
+                _mask(size), stride, n
+            )
+            return BitVecArray._new(size, n, self.is_signed, packed, stride)
+        lhs = self._coerce(lhs)
+        size = max(self.size, lhs.size) + 1
+        stride = _stride(size + 1)
+        packed = ((self._at(stride) | _rep(1 << size, stride, n)) - lhs._at(stride)) & _rep(
+            _mask(size), stride, n
+        )
+        return BitVecArray._new(
+            size, n, self.is_signed | lhs.is_signed, packed, stride
+        )
+
+    # inplace sub method
+    def __isub__(self, lhs):
+        n, size = self.count, self.size
+        stride = _stride(size + 1)
+        mask = _rep(_mask(size), stride, n)
+        if isinstance(lhs, int):
+            signed = self.is_signed
+            packed = (self._at(stride) + _rep(-lhs & _mask(size), stride, n)) & mask
+        else:
+            lhs = self._coerce(lhs)
+            signed = self.is_signed | lhs.is_signed
+            packed = (
+                (self._at(stride) | _rep(1 << size, stride, n)) - (lhs._at(stride) & mask)
+            ) & mask
+        return BitVecArray._new(size, n, signed, packed, stride)
+
+    # element-wise fallbacks; result widths depend on values, so the widest
+    # element result is used for the whole batch
+    def __mul__(self, lhs):
+        """Element-wise product, widened to the widest element product"""
+        return self._map(lhs, BitVec.__mul__)
+
+    def __imul__(self, lhs):
+        return self._map(lhs, BitVec.__imul__)
+
+    def __pow__(self, lhs):
+        """Element-wise power, widened to the widest element result"""
+        return self._map(lhs, BitVec.__pow__)
+
+    def __ipow__(self, lhs):
+        return self._map(lhs, BitVec.__ipow__)
+
+    def __truediv__(self, lhs):
+        """Element-wise quotient, widened to the widest element quotient"""
+        return self._map(lhs, BitVec.__truediv__)
+
+    def __floordiv__(self, lhs):
+        """Element-wise quotient, widened to the widest element quotient"""
+        return self._map(lhs, BitVec.__floordiv__)
+
+    def __mod__(self, lhs):
+        """Element-wise remainder, widened to the widest element remainder"""
+        return self._map(lhs, BitVec.__mod__)
+
+    # shifts; an array of shift amounts falls back to element-wise shifts
+    def _shift_amount(self, lhs):
+        amount = lhs.val if isinstance(lhs, BitVec) else lhs
+        if amount < 0:
+            raise ValueError("negative shift count")
+        return amount
+
+    def _shl(self, amount):
+        if amount >= self.size:
+            return 0
+        return (self.packed & self._fill(_mask(self.size - amount))) << amount
+
+    def _shr(self, amount):
+        if amount >= self.size:
+            return 0
+        return (self.packed & self._fill(_mask(self.size) ^ _mask(amount))) >> amount
+
+    # left shift method
+    def __lshift__(self, lhs):
+        if isinstance(lhs, BitVecArray):
+            return self._map(lhs, BitVec.__lshift__)
+        packed = self._shl(self._shift_amount(lhs))
+        return BitVecArray._new(self.size, self.count, False, packed)
+
+    __ilshift__ = __lshift__
+
+    # right shift method
+    def __rshift__(self, lhs):
+        if isinstance(lhs, BitVecArray):
+            return self._map(lhs, BitVec.__rshift__)
+        packed = self._shr(self._shift_amount(lhs))
+        return BitVecArray._new(self.size, self.count, False, packed)
+
+    __irshift__ = __rshift__
+
+    def clshift(self, lhs):
+        """
+        circular left shift method
+        """
+        if isinstance(lhs, BitVecArray):
+            return self._map(lhs, BitVec.clshift)
+        amount = self._shift_amount(lhs) % self.size
+        packed = self._shl(amount) | self._shr(self.size - amount)
+        return BitVecArray._new(self.size, self.count, False, packed)
+
+    def crshift(self, lhs):
+        """
+        circular right shift method
+        """
+        if isinstance(lhs, BitVecArray):
+            return self._map(lhs, BitVec.crshift)
+        amount = self._shift_amount(lhs) % self.size
+        packed = self._shr(amount) | self._shl(self.size - amount)
+        return BitVecArray._new(self.size, self.count, False, packed)
+
+    # bitwise operators
+    def _bitwise(self, lhs, op, keep_size=False):
+        lhs = self._coerce(lhs)
+        stride = max(self.stride, lhs.stride)
+        packed = op(self._at(stride), lhs._at(stride))
+        if keep_size:
+            size = self.size
+            packed &= _rep(_mask(size), stride, self.count)
+        else:
+            size = max(self.size, lhs.size)
+        return BitVecArray._new(
+            size, self.count, self.is_signed | lhs.is_signed, packed, stride
+        )
+
+    def __and__(self, lhs):
+        return self._bitwise(lhs, int.__and__)
+
+    def __iand__(self, lhs):
+        return self._bitwise(lhs, int.__and__, keep_size=True)
+
+    def __or__(self, lhs):
+        return self._bitwise(lhs, int.__or__)
+
+    def __ior__(self, lhs):
+        return self._bitwise(lhs, int.__or__, keep_size=True)
+
+    def __xor__(self, lhs):
+        return self._bitwise(lhs, int.__xor__)
+
+    def __ixor__(self, lhs):
+        return self._bitwise(lhs, int.__xor__, keep_size=True)
+
+    __rand__ = __and__
+    __ror__ = __or__
+    __rxor__ = __xor__
+
+    # invert method
+    def __invert__(self):
+        packed = self.packed ^ self._fill(_mask(self.size))
+        return BitVecArray._new(self.size, self.count, self.is_signed, packed)
+
+    # comparisons, evaluated on values biased into [0, 2**width)
+    def _biased(self, width, stride):
+        """Lanes holding get_val() + 2**(width-1); needs size < width"""
+        packed = self._at(stride)
+        if self.is_signed and self.size:
+            sign = 1 << (self.size - 1)
+            return (packed ^ _rep(sign, stride, self.count)) + _rep(
+                (1 << (width - 1)) - sign, stride, self.count
+            )
+        return packed | _rep(1 << (width - 1), stride, self.count)
+
+    def _compare(self, lhs, swap, op):
+        n = self.count
+        if isinstance(lhs, int):
+            width = max(self.size, lhs.bit_length() + 1) + 1
+            stride = _stride(width + 1)
+            other = _rep(lhs + (1 << (width - 1)), stride, n)
+        else:
+            lhs = self._coerce(lhs)
+            width = max(self.size, lhs.size) + 1
+            stride = _stride(width + 1)
+            other = lhs._biased(width, stride)
+        mine = self._biased(width, stride)
+        if swap:
+            mine, other = other, mine
+        ones = _rep(1, stride, n)
+        if op == "ge":
+            bits = (((mine | _rep(1 << width, stride, n)) - other) >> width) & ones
+        else:
+            bits = (((mine ^ other) + _rep(_mask(width), stride, n)) >> width) & ones
+        return bits, ones, stride
+
+    def _flags(self, bits, stride):
+        return BitVecArray._new(1, self.count, False, bits, stride)
+
+    # equal to
+    def __eq__(self, lhs):
+        bits, ones, stride = self._compare(lhs, False, "ne")
+        return self._flags(bits ^ ones, stride)
+
+    # not equal to
+    def __ne__(self, lhs):
+        bits, _, stride = self._compare(lhs, False, "ne")
+        return self._flags(bits, stride)
+
+    # less than
+    def __lt__(self, lhs):
+        bits, ones, stride = self._compare(lhs, False, "ge")
+        return self._flags(bits ^ ones, stride)
+
+    # less than or equal
+    def __le__(self, lhs):
+        bits, _, stride = self._compare(lhs, True, "ge")
+        return self._flags(bits, stride)
+
+    # greater than
+    def __gt__(self, lhs):
+        bits, ones, stride = self._compare(lhs, True, "ge")
+        return self._flags(bits ^ ones, stride)
+
+    # greater than equal
+    def __ge__(self, lhs):
+        bits, _, stride = self._compare(lhs, False, "ge")
+        return self._flags(bits, stride)
+
+    # reductions, one result per element
+    def reduce_or(self):
+        """1 bit array of OR reductions"""
+        return self != 0
+
+    def reduce_and(self):
+        """1 bit array of AND reductions"""
+        return ~self == 0
+
+    def reduce_xor(self):
+        """1 bit array of XOR reductions (parity)"""
+        return self.popcount()[0]
+
+    def reduce_nor(self):
+        """1 bit array of inverted OR reductions"""
+        return self == 0
+
+    def reduce_nand(self):
+        """1 bit array of inverted AND reductions"""
+        return ~self != 0
+
+    def reduce_xnor(self):
+        """1 bit array of inverted XOR reductions"""
+        return ~self.reduce_xor()
+
+    def get_parity(self):
+        """Returns parity of every element"""
+        return self.reduce_xor()
+
+    def popcount(self):
+        """
+        Number of set bits of every element, as an array of size.bit_length() bits
+        Counted per 64 bit word with the usual SWAR steps, then summed per lane
+        """
+        n, stride = self.count, self.stride
+        words = stride // LANE * n
+        x = self.packed
+        x -= (x >> 1) & _rep(0x5555555555555555, LANE, words)
+        m2 = _rep(0x3333333333333333, LANE, words)
+        x = (x & m2) + ((x >> 2) & m2)
+        x = (x + (x >> 4)) & _rep(0x0F0F0F0F0F0F0F0F, LANE, words)
+        x += x >> 8
+        x += x >> 16
+        x += x >> 32
+        # count of every 64 bit word is now in its low byte
+        x &= _rep(0xFF, LANE, words)
+        counts = x & _rep(0xFF, stride, n)
+        for k in range(1, stride // LANE):
+            counts += (x >> (k * LANE)) & _rep(_mask(LANE), stride, n)
+        return BitVecArray._new(self.size.bit_length(), n, False, counts, stride)
+
+    # indexing
+    def _gather(self, positions, stride=None):
+        """
+        Lanes whose bit j is bit positions[j] of every element
+        Positions past the element size read as zero
+        """
+        stride = self.stride if stride is None else stride
+        src = self._at(stride)
+        ones = _rep(1, stride, self.count)
+        lo = positions[0] if positions else 0
+        if positions == list(range(lo, lo + len(positions))):
+            width = max(0, min(len(positions), self.size - lo))
+            return (src >> lo) & _rep(_mask(width), stride, self.count)
+        packed = 0
+        for j, p in enumerate(positions):
+            if p < self.size:
+                packed |= ((src >> p) & ones) << j
+        return packed
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            if index > self.size - 1:
+                raise ValueError(f"index {index} > size-1 {self.size-1}")
+            if index < 0:
+                # counted from the MSB, as for BitVec
+                if index < -self.size:
+                    raise ValueError(f"index {index} < -size {-self.size}")
+                index += self.size
+            packed = (self.packed >> index) & self._fill(1)
+            return BitVecArray._new(1, self.count, False, packed, self.stride)
+        elif isinstance(index, slice):
+            lsb, width, step, reverse = _decode_slice(self.size, index)
+            positions = list(range(lsb, lsb + width * step, step))
+            if reverse:
+                positions.reverse()
+            stride = max(self.stride, _stride(width))
+            packed = self._gather(positions, stride)
+            return BitVecArray._new(width, self.count, False, packed, stride)
+        raise IndexError(f"Index of type {type(index)} not expected")
+
+    def __setitem__(self, index, val):
+        if isinstance(val, int):
+            val = BitVec.from_val(val)
+        val = self._coerce(val)
+        if isinstance(index, int):
+            if index > (self.size - 1) or index < -self.size:
+                raise IndexError(
+                    f"Index {index} out of range; size of the vector is {self.size}"
+                )
+            if index < 0:
+                index += self.size
+            self[index:index] = val[0]
+        elif isinstance(index, slice):
+            if index.step is not None:
+                raise IndexError("Step is not supported in BitVector set")
+            lsb, full, _, reverse = _decode_slice(self.size, index)
+            width = min(full, self.size - lsb)
+            if width <= 0:
+                return
+            if reverse:
+                field = val._gather(list(range(full - 1, full - 1 - width, -1)), self.stride)
+            else:
+                field = val._at(self.stride) & self._fill(_mask(width))
+            keep = _mask(self.size) ^ (_mask(width) << lsb)
+            self.packed = (self.packed & self._fill(keep)) | (field << lsb)
+        elif index is Ellipsis:
+            self.packed = val._at(self.stride) & self._fill(_mask(self.size))
+        else:
+            raise IndexError(f"Index of type {type(index)} not expected")
+
+    # concatenation and repetition
+    def __matmul__(self, lhs):
+        """
+        Use @ operator for repetition and concatenation, as in BitVec
+        """
+        n = self.count
+        if isinstance(lhs, int):
+            size = self.size * lhs
+            stride = _stride(size)
+            src = self._at(stride)
+            packed = 0
+            for _ in range(lhs):
+                packed = (packed << self.size) | src
+            return BitVecArray._new(size, n, False, packed, stride)
+        lhs = self._coerce(lhs)
+        size = self.size + lhs.size
+        stride = _stride(size)
+        packed = (self._at(stride) << lhs.size) | lhs._at(stride)
+        return BitVecArray._new(size, n, False, packed, stride)
+
+    def __rmatmul__(self, rhs):
+        return self @ rhs
+
+    @classmethod
+    def concat(cls, *args):
+        """Concatenate arrays element-wise; BitVec and int arguments are broadcast"""
+        count = next((a.count for a in args if isinstance(a, BitVecArray)), None)
+        if count is None:
+            raise TypeError("concat needs at least one BitVecArray argument; use BitVec.concat")
+        res = cls.zeros(0, count)
+        for v in args:
+            if isinstance(v, int):
+                v = BitVec.from_val(v)
+            res = res @ v
+        return res
+
+    C = concat
@@ -0,0 +1,330 @@
+"""
+Bit-sliced evaluation of bit-level BitVec functions over many vectors
+
+Code like example.crc_calc reads single bits and XORs them: one BitVec per
+bit, for every vector. Bit slicing turns the batch on its side instead: K
+vectors of W bits become W lane words of K bits, where bit j of word i is
+bit i of vector j. A single-bit operation is then one big-int operation
+that runs for all K vectors at once.
+
+bitslice_map(func, *arrays) traces func once per argument signature with
+the tracer of bitvec.compile, evaluates the traced graph bit by bit on lane
+words, and transposes the results back:
+
+from bitvec.bitslice import bitslice_map
+
+crcs = bitslice_map(example.crc_calc, example.CRC_IN, data)   #data: BitVecArray of 32 bit words
+crcs                                                           #BitVecArray, one CRC per word
+
+BitVecArray (or lists of BitVecs) arguments are sliced; BitVec arguments
+are broadcast to every instance, other arguments are passed as constants.
+The same restrictions as for bitvec.compile apply (straight-line code),
+and only &, |, ^, ~, shifts by constants, +, -, *, comparisons and
+popcount can be sliced; / , % and ** raise TracingError. The result has
+the structure func returns, with a BitVecArray for every BitVec.
+
+transpose64 is the transpose underneath: 64 x 64 bit blocks, all blocks of
+a packed int at once in 6 mask-and-shift steps.
+"""
+
+import sys
+import weakref
+from array import array
+from functools import lru_cache, reduce
+
+from . import BitVec
+from .batch import BitVecArray, _as_array, _mask, _rep, _restride
+from .trace import Sym, TracingError, _key, _leaves, _record
+
+_BLOCK_BYTES = 64 * 8
+
+
+@lru_cache(maxsize=8)
+def _transpose_masks(blocks):
+    """(j, mask) of the six swap steps for `blocks` 64 x 64 blocks"""
+    steps = []
+    for j in (32, 16, 8, 4, 2, 1):
+        cols = sum(1 << b for b in range(64) if not b & j)
+        block = sum(cols << (64 * k) for k in range(64) if not k & j)
+        steps.append((j, _rep(block, 64 * 64, blocks)))
+    return steps
+
+
+def transpose64(rows, blocks=1):
+    """
+    Transpose 64 x 64 bit matrices: row r of a block is bits 64r..64r+63 of
+    the block, blocks follow each other every 4096 bits. Bit c of row r
+    becomes bit r of row c in every one of the `blocks` blocks.
+    """
+    for j, mask in _transpose_masks(blocks):
+        # swap the j x j sub-blocks above and below the diagonal
+        t = ((rows >> j) ^ (rows >> (64 * j))) & mask
+        rows ^= (t << j) | (t << (64 * j))
+    return rows
+
+
+def _words(raw):
+    words = array("Q")
+    words.frombytes(raw)
+    if sys.byteorder != "little":
+        words.byteswap()
+    return words
+
+
+def _raw(words):
+    if sys.byteorder != "little":
+        words = array("Q", words)
+        words.byteswap()
+    return words.tobytes()
+
+
+def slice_bits(arr):
+    """Lane words of a BitVecArray: bit j of word i is bit i of element j"""
+    blocks = -(-arr.count // 64)
+    lanes = []
+    for low in range(0, arr.size, 64):
+        width = min(64, arr.size - low)
+        # bits low..low+63 of every element, one 64 bit row each
+        rows = transpose64(_restride(arr.packed >> low, arr.count, arr.stride, 64), blocks)
+        words = _words(rows.to_bytes(blocks * _BLOCK_BYTES, "little"))
+        lanes.extend(int.from_bytes(_raw(words[c::64]), "little") for c in range(width))
+    return lanes
+
+
+def unslice_bits(lanes, size, count, signed=False):
+    """BitVecArray of `count` elements from `size` lane words, the inverse of slice_bits"""
+    blocks = -(-count // 64)
+    nbytes = blocks * 8
+    parts = []
+    for low in range(0, size, 64):
+        width = min(64, size - low)
+        words = _words(bytes(blocks * _BLOCK_BYTES))
+        for c in range(width):
+            words[c::64] = _words(lanes[low + c].to_bytes(nbytes, "little"))
+        rows = transpose64(int.from_bytes(_raw(words), "little"), blocks)
+        parts.append(BitVecArray._new(width, count, False, rows, 64))
+    whole = reduce(lambda low, high: high @ low, parts) if parts else BitVecArray.zeros(size, count)
+    return BitVecArray._new(size, count, signed, whole.packed, whole.stride)
+
+
+# A sliced value is (bits, fill): lane words of bits 0..len(bits)-1, and the
+# lane word repeated by all higher bits (0, or ones where the value is negative)
+
+
+def _bit(v, i):
+    bits = v[0]
+    return bits[i] if i < len(bits) else v[1]
+
+
+def _norm(bits, fill):
+    while bits and bits[-1] == fill:
+        bits.pop()
+    return (bits, fill)
+
+
+def _const(c, ones):
+    if not isinstance(c, int):
+        raise TracingError(f"constant {c!r} cannot be bit-sliced")
+    n = c.bit_length() if c >= 0 else (~c).bit_length()
+    return _norm([ones if (c >> i) & 1 else 0 for i in range(n)], ones if c < 0 else 0)
+
+
+def _and(a, b):
+    n = max(len(a[0]), len(b[0]))
+    for v in (a, b):
+        if v[1] == 0:
+            n = min(n, len(v[0]))
+    return _norm([_bit(a, i) & _bit(b, i) for i in range(n)], a[1] & b[1])
+
+
+def _or(a, b):
+    n = max(len(a[0]), len(b[0]))
+    return _norm([_bit(a, i) | _bit(b, i) for i in range(n)], a[1] | b[1])
+
+
+def _xor(a, b):
+    n = max(len(a[0]), len(b[0]))
+    return _norm([_bit(a, i) ^ _bit(b, i) for i in range(n)], a[1] ^ b[1])
+
+
+def _not(a, ones):
+    return ([x ^ ones for x in a[0]], a[1] ^ ones)
+
+
+def _add(a, b, carry=0):
+    bits = []
+    for i in range(max(len(a[0]), len(b[0])) + 1):
+        x, y = _bit(a, i), _bit(b, i)
+        t = x ^ y
+        bits.append(t ^ carry)
+        carry = (x & y) | (carry & t)
+    # past the longer operand the carry no longer changes
+    return _norm(bits, a[1] ^ b[1] ^ carry)
+
+
+def _sub(a, b, ones):
+    return _add(a, _not(b, ones), ones)
+
+
+def _mul(a, b, ones):
+    if b[1]:
+        if a[1]:
+            raise TracingError("product of two possibly negative values cannot be bit-sliced")
+        a, b = b, a
+    total = ([], 0)
+    for i, w in enumerate(b[0]):
+        if w:
+            total = _add(total, ([0] * i + [x & w for x in a[0]], a[1] & w))
+    return total
+
+
+def _less(a, b, ones):
+    # sign of the exact difference
+    return _norm([_sub(a, b, ones)[1]], 0)
+
+
+def _bit_count(a):
+    if a[1]:
+        raise TracingError("popcount of a possibly negative value cannot be bit-sliced")
+    count = []
+    for x in a[0]:
+        for j, c in enumerate(count):
+            count[j], x = c ^ x, c & x
+        if x:
+            count.append(x)
+    return (count, 0)
+
+
+def _eval(op, args, ones):
+    a = args[0]
+    if op == "~":
+        return _not(a, ones)
+    if op == "neg":
+        return _sub(([], 0), a, ones)
+    if op == "bit_count":
+        return _bit_count(a)
+    b = args[1]
+    if op == "&":
+        return _and(a, b)
+    if op == "|":
+        return _or(a, b)
+    if op == "^":
+        return _xor(a, b)
+    if op == "+":
+        return _add(a, b)
+    if op == "-":
+        return _sub(a, b, ones)
+    if op == "*":
+        return _mul(a, b, ones)
+    if op == "<":
+        return _less(a, b, ones)
+    if op == ">":
+        return _less(b, a, ones)
+    if op == "<=":
+        return _norm([_bit(_less(b, a, ones), 0) ^ ones], 0)
+    if op == ">=":
+        return _norm([_bit(_less(a, b, ones), 0) ^ ones], 0)
+    if op in ("==", "!="):
+        diff = _xor(a, b)
+        ne = reduce(lambda x, y: x | y, diff[0], diff[1])
+        return _norm([ne if op == "!=" else ne ^ ones], 0)
+    raise TracingError(f"{op!r} cannot be bit-sliced")
+
+
+def _shift(op, a, n):
+    if n < 0:
+        raise ValueError("negative shift count")
+    if op == "<<":
+        return ([0] * n + a[0], a[1]) if a[0] or a[1] else a
+    return (a[0][n:], a[1])
+
+
+class _Plan:
+    """Traced graph of one function and argument signature, in evaluation order"""
+
+    def __init__(self, func, args, kwargs):
+        self.inputs, self.out = _record(func, args, kwargs)
+        order, seen = [], set()
+        stack = [(s, False) for s in _leaves(self.out)]
+        while stack:
+            sym, expanded = stack.pop()
+            if expanded:
+                order.append(sym)
+            elif id(sym) not in seen:
+                seen.add(id(sym))
+                stack.append((sym, True))
+                stack.extend((a, False) for a in sym.args if isinstance(a, Sym))
+        self.order = order
+
+    def run(self, lanes, ones):
+        """Values of all nodes, with the input Syms bound to lanes"""
+        values = {id(sym): (lanes[i], 0) for i, sym in enumerate(self.inputs)}
+        for sym in self.order:
+            if sym.op == "in":
+                continue
+            if sym.op in ("<<", ">>") and isinstance(sym.args[1], int):
+                values[id(sym)] = _shift(sym.op, values[id(sym.args[0])], sym.args[1])
+                continue
+            if sym.op in ("<<", ">>"):
+                raise TracingError("shifts by a traced amount cannot be bit-sliced")
+            args = [values[id(a)] if isinstance(a, Sym) else _const(a, ones) for a in sym.args]
+            values[id(sym)] = _eval(sym.op, args, ones)
+        return values
+
+    def result(self, out, values, count, ones):
+        if isinstance(out, BitVec):
+            v = values[id(out.val)] if isinstance(out.val, Sym) else _const(out.val, ones)
+            lanes = [_bit(v, i) for i in range(out.size)]
+            return unslice_bits(lanes, out.size, count, out.is_signed)
+        if isinstance(out, Sym):
+            raise TracingError("bit-sliced functions must return BitVecs")
+        if type(out) in (tuple, list):
+            return type(out)(self.result(v, values, count, ones) for v in out)
+        if type(out) is dict:
+            return {k: self.result(v, values, count, ones) for k, v in out.items()}
+        return out
+
+
+# func -> {argument signature: _Plan}
+_plans = weakref.WeakKeyDictionary()
+
+
+def bitslice_map(func, *args, **kwargs):
+    """
+    func applied to every instance of the BitVecArray arguments, evaluated
+    bit-sliced; see the module docstring
+    """
+    count = None
+    shapes, sliced = [], []
+    for arg in list(args) + list(kwargs.values()):
+        if isinstance(arg, BitVecArray) or (
+            isinstance(arg, list) and arg and all(isinstance(v, BitVec) for v in arg)
+        ):
+            arr = _as_array(arg)
+            if count is not None and arr.count != count:
+                raise ValueError(f"Arrays of {count} and {arr.count} elements")
+            count = arr.count
+            shapes.append(BitVec(arr.size, 0, arr.is_signed))
+            sliced.append(arr)
+        else:
+            shapes.append(arg)
+            sliced.append(arg)
+    if count is None:
+        raise ValueError("bitslice_map needs at least one BitVecArray argument")
+    n = len(args)
+    sargs, skwargs = shapes[:n], dict(zip(kwargs, shapes[n:]))
+    cache = _plans.setdefault(func, {})
+    key = _key(sargs, skwargs)
+    plan = cache.get(key)
+    if plan is None:
+        plan = cache[key] = _Plan(func, sargs, skwargs)
+    ones = _mask(count)
+    lanes = []
+    for arg in sliced:
+        if isinstance(arg, BitVecArray):
+            lanes.append(slice_bits(arg))
+        elif isinstance(arg, BitVec):
+            # broadcast: every instance sees the same value
+            lanes.append([ones if (arg.val >> i) & 1 else 0 for i in range(arg.size)])
+    values = plan.run(lanes, ones)
+    return plan.result(plan.out, values, count, ones)
@@ -0,0 +1,200 @@
+"""
+Provides a table driven CRC engine working on BitVec
+
+The engine follows the usual parameter model (width, poly, init, refin,
+refout, xorout) and processes up to `slices` bytes per step with one lookup
+table per byte position (slicing-by-8 by default).
+
+from bitvec import BitVec as bv
+from bitvec.crc import CRC, CRC32
+
+CRC32.compute(b"123456789")            #==> bv(32, 0xcbf43926)
+crc16 = CRC(16, 0x1021, init=0xffff)   #CRC-16/CCITT-FALSE
+
+s = CRC32.new()                        #incremental
+s.update(b"1234").update(b"56789")
+s.value()                              #==> bv(32, 0xcbf43926)
+
+BitVec data is taken as a serial bit stream in the order the engine shifts:
+LSB first for reflected engines (bytes little endian) and MSB first
+otherwise (bytes big endian). Sizes that are not a multiple of 8 are fine.
+
+step() is the bit-exact mode: it advances a raw CRC register over data the
+way a parallel CRC circuit does, with no init, reflection or xorout. The
+32 XOR equations of example.crc_calc are CRC32.step:
+CRC32.step(crc_in, data) == example.crc_calc(crc_in, data)
+"""
+
+from functools import lru_cache
+
+from . import BitVec, _reverse_bits
+
+
+def _feed_bits(reg, bits, nbits, width, poly, refin):
+    """Shift nbits of `bits` into the register one at a time"""
+    if refin:
+        rpoly = _reverse_bits(poly, width)
+        for i in range(nbits):
+            fb = (reg ^ (bits >> i)) & 1
+            reg = (reg >> 1) ^ (rpoly if fb else 0)
+    else:
+        top = width - 1
+        mask = (1 << width) - 1
+        for i in range(nbits - 1, -1, -1):
+            fb = ((reg >> top) ^ (bits >> i)) & 1
+            reg = ((reg << 1) & mask) ^ (poly if fb else 0)
+    return reg
+
+
+@lru_cache(maxsize=None)
+def _tables(width, poly, refin, slices):
+    """
+    tables[k][b]: register after feeding byte b followed by k zero bytes,
+    starting from a zero register
+    """
+    first = [_feed_bits(0, b, 8, width, poly, refin) for b in range(256)]
+    tables = [first]
+    for _ in range(1, slices):
+        prev = tables[-1]
+        # one more zero byte after the previous table entry
+        tables.append([_feed_bits(prev[b], 0, 8, width, poly, refin) for b in range(256)])
+    return tuple(tuple(t) for t in tables)
+
+
+class CRC:
+    """
+    CRC engine for any width and polynomial.
+    poly is given without its top bit, init and xorout as in the CRC
+    catalogues; refin/refout select reflected input and output.
+    """
+
+    width: int
+    poly: int
+    init: int
+    refin: bool
+    refout: bool
+    xorout: int
+    slices: int
+
+    def __init__(
+        self, width, poly, init=0, refin=False, refout=False, xorout=0, slices=8
+    ):
+        mask = (1 << width) - 1
+        self.width = width
+        self.poly = poly & mask
+        self.init = init & mask
+        self.refin = refin
+        self.refout = refout
+        self.xorout = xorout & mask
+        self.slices = slices
+        self._tables = _tables(width, self.poly, refin, slices)
+
+    def __repr__(self):
+        return (
+            f"CRC(width={self.width}, poly={self.poly:#x}, init={self.init:#x}, "
+            f"refin={self.refin}, refout={self.refout}, xorout={self.xorout:#x})"
+        )
+
+    def _initial(self):
+        return _reverse_bits(self.init, self.width) if self.refin else self.init
+
+    def _final(self, reg):
+        if self.refin != self.refout:
+            reg = _reverse_bits(reg, self.width)
+        return reg ^ self.xorout
+
+    def _update_bytes(self, reg, data):
+        width, tables, step = self.width, self._tables, self.slices
+        mask = (1 << width) - 1
+        for off in range(0, len(data), step):
+            chunk = data[off : off + step]
+            n = len(chunk)
+            nbits = 8 * n
+            if self.refin:
+                v = (reg ^ int.from_bytes(chunk, "little")) & ((1 << nbits) - 1)
+                reg >>= nbits
+                for j in range(n):
+                    reg ^= tables[n - 1 - j][(v >> (8 * j)) & 0xFF]
+            else:
+                if width >= nbits:
+                    v = (reg >> (width - nbits)) ^ int.from_bytes(chunk, "big")
+                    reg = (reg << nbits) & mask
+                else:
+                    v = (reg << (nbits - width)) ^ int.from_bytes(chunk, "big")
+                    reg = 0
+                for k in range(n):
+                    reg ^= tables[k][(v >> (8 * k)) & 0xFF]
+        return reg
+
+    def _update(self, reg, data):
+        """Advance the raw register over bytes-like data or a BitVec"""
+        if not isinstance(data, BitVec):
+            return self._update_bytes(reg, data)
+        nbytes, extra = divmod(data.size, 8)
+        val = data.val
+        if self.refin:
+            # LSB first: whole bytes from the low end, then the top bits
+            reg = self._update_bytes(reg, (val & ((1 << (8 * nbytes)) - 1)).to_bytes(nbytes, "little"))
+            return _feed_bits(reg, val >> (8 * nbytes), extra, self.width, self.poly, True)
+        # MSB first: whole bytes from the high end, then the low bits
+        reg = self._update_bytes(reg, (val >> extra).to_bytes(nbytes, "big"))
+        return _feed_bits(reg, val, extra, self.width, self.poly, False)
+
+    def compute(self, data):
+        """CRC of a complete message (bytes-like or BitVec) as a BitVec"""
+        return BitVec(self.width, self._final(self._update(self._initial(), data)))
+
+    def new(self):
+        """Start an incremental computation"""
+        return CRCStream(self)
+
+    def step(self, crc, data):
+        """
+        Bit-exact register update: returns the raw register after shifting
+        data into the raw register crc, without init, reflection or xorout
+        """
+        reg = crc.val if isinstance(crc, BitVec) else crc
+        return BitVec(self.width, self._update(reg & ((1 << self.width) - 1), data))
+
+
+class CRCStream:
+    """
+    Running CRC computation, created by CRC.new()
+    update() may be called any number of times before value()
+    """
+
+    engine: CRC
+    reg: int
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.reg = engine._initial()
+
+    def update(self, data):
+        """Add bytes-like data or a BitVec to the message; returns self"""
+        self.reg = self.engine._update(self.reg, data)
+        return self
+
+    def value(self):
+        """CRC of everything passed to update so far"""
+        return BitVec(self.engine.width, self.engine._final(self.reg))
+
+    def reset(self):
+        """Start over with an empty message"""
+        self.reg = self.engine._initial()
+
+
+# Common parameter sets
+CRC32 = CRC(32, 0x04C11DB7, init=0xFFFFFFFF, refin=True, refout=True, xorout=0xFFFFFFFF)
+CRC32C = CRC(32, 0x1EDC6F41, init=0xFFFFFFFF, refin=True, refout=True, xorout=0xFFFFFFFF)
+CRC16_CCITT_FALSE = CRC(16, 0x1021, init=0xFFFF)
+CRC16_ARC = CRC(16, 0x8005, refin=True, refout=True)
+CRC8_SMBUS = CRC(8, 0x07)
+CRC64_XZ = CRC(
+    64,
+    0x42F0E1EBA9EA3693,
+    init=0xFFFFFFFFFFFFFFFF,
+    refin=True,
+    refout=True,
+    xorout=0xFFFFFFFFFFFFFFFF,
+)
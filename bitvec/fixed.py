@@ -0,0 +1,324 @@
+"""
+Provides width-specialized BitVec types
+
+BitVec[32] (or BitVec.type(32)) and SBitVec[64] (or BitVec.type(64,
+signed=True)) are cached subclasses of BitVec with the size and signedness
+built in. Their mask, sign bit and range are computed once, and the common
+operators take a fast path when the other operand is of the same type or a
+small non-negative int: no width computation, no isinstance chain, no
+generic constructor. Results are the same as for plain vectors, and are
+themselves specialized when the width is known up front (a + b of two
+BitVec[32] is a BitVec[33]). Other operands fall back to the generic
+operators, so specialized and plain vectors mix freely.
+
+from bitvec import BitVec as bv, SBitVec
+
+U32 = bv[32]
+a = U32(0xFFFFFFFF)           #the size is part of the type
+a += 1                        #==> U32(0), same as bv(32, 0xFFFFFFFF) += 1
+a + U32(1)                    #==> bv[33](1)
+SBitVec[8](-3).get_val()      #==> -3
+U32.mask, U32.min, U32.max    #0xffffffff, 0, 4294967295
+"""
+
+from functools import lru_cache
+
+from . import _BITS, BitVec, FrozenBitVec
+
+
+class SBitVec(BitVec):
+    """
+    Signed BitVec: SBitVec(12, -1) is bv(12, -1, signed=True)
+    SBitVec[n] is the specialized signed type of n bits.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, size=32, val=0, signed=True):
+        BitVec.__init__(self, size, val, signed)
+
+    @classmethod
+    def unsigned(cls, size=32, val=0):
+        """
+        Create unsigned BitVec, a plain BitVec
+        """
+        return BitVec(size, val, False)
+
+    @classmethod
+    def from_val(cls, val, signed=True):
+        """
+        Deduces size from the value, a plain BitVec if not signed
+        """
+        if not signed:
+            return BitVec.from_val(val)
+        return super().from_val(val, True)
+
+    def __class_getitem__(cls, size):
+        return fixed_type(size, True)
+
+
+# every specialized type created so far, and callables run on each new one;
+# bitvec.profile() and bitvec.overflow() use them to patch types made while active
+_TYPES = set()
+_NEW_TYPE_HOOKS = []
+
+
+def _fixed_value(size, signed, val):
+    """Unpickle helper"""
+    return fixed_type(size, signed)(val)
+
+
+def fixed_type(size, signed=False):
+    """The specialized BitVec subclass for size and signedness, created once"""
+    return _fixed_type(size, bool(signed))
+
+
+@lru_cache(maxsize=None)
+def _fixed_type(size, signed):
+    if size < 1:
+        raise ValueError(f"Specialized types need a size of at least 1; got {size}")
+    base = SBitVec if signed else BitVec
+    new = object.__new__
+    mask = (1 << size) - 1
+    wmask = (1 << (size + 1)) - 1
+    # XOR with off maps 2's complement values onto an unsigned order
+    off = 1 << (size - 1) if signed else 0
+    # the class body defines a `signed` method, which hides the argument
+    type_signed = signed
+    wide = None
+    logical = None
+
+    def wide_type():
+        nonlocal wide
+        if wide is None:
+            wide = fixed_type(size + 1, signed)
+        return wide
+
+    def shift_type():
+        # shifts give unsigned vectors of the same size, as in BitVec
+        nonlocal logical
+        if logical is None:
+            logical = fixed_type(size, False)
+        return logical
+
+    class Fixed(base):
+        __slots__ = ()
+
+        def __init__(self, val=0):
+            if isinstance(val, BitVec):
+                val = val.val
+            self.val = val & mask
+
+        def __reduce__(self):
+            return (_fixed_value, (size, signed, self.val))
+
+        # the BitVec constructors call cls(size, val, signed); here the size
+        # defaults to the one of the type and the result is specialized too
+        @classmethod
+        def from_val(cls, val, signed=type_signed):
+            return fixed_type(size, signed)(val)
+
+        @classmethod
+        def signed(cls, size=size, val=0):
+            return fixed_type(size, True)(val)
+
+        @classmethod
+        def unsigned(cls, size=size, val=0):
+            return fixed_type(size, False)(val)
+
+        @classmethod
+        def u2s(cls, ubv):
+            return fixed_type(ubv.size, True)(ubv.get_val())
+
+        def inplace(self, enable=True):
+            raise TypeError(f"{type(self).__name__} has a fixed class; use InPlaceBitVec")
+
+        def get_val(self):
+            return (self.val ^ off) - off
+
+        __int__ = get_val
+
+        def __getitem__(self, index):
+            if type(index) is int and 0 <= index < size:
+                try:
+                    return _BITS[(self.val >> index) & 1]
+                except TypeError:  # symbolic value while tracing, see bitvec.trace
+                    return FrozenBitVec(1, (self.val >> index) & 1)
+            return BitVec.__getitem__(self, index)
+
+        def __add__(self, lhs):
+            if type(lhs) is Fixed:
+                v = new(wide or wide_type())
+                v.val = self.val + lhs.val
+                return v
+            if type(lhs) is int and 0 <= lhs <= mask:
+                v = new(wide or wide_type())
+                v.val = self.val + lhs
+                return v
+            return BitVec.__add__(self, lhs)
+
+        def __sub__(self, lhs):
+            if type(lhs) is Fixed:
+                v = new(wide or wide_type())
+                v.val = (self.val - lhs.val) & wmask
+                return v
+            if type(lhs) is int and 0 <= lhs <= mask:
+                v = new(wide or wide_type())
+                v.val = (self.val - lhs) & wmask
+                return v
+            return BitVec.__sub__(self, lhs)
+
+        def __iadd__(self, lhs):
+            if type(lhs) is Fixed:
+                v = new(Fixed)
+                v.val = (self.val + lhs.val) & mask
+                return v
+            if type(lhs) is int:
+                v = new(Fixed)
+                v.val = (self.val + lhs) & mask
+                return v
+            return BitVec.__iadd__(self, lhs)
+
+        def __isub__(self, lhs):
+            if type(lhs) is Fixed:
+                v = new(Fixed)
+                v.val = (self.val - lhs.val) & mask
+                return v
+            if type(lhs) is int:
+                v = new(Fixed)
+                v.val = (self.val - lhs) & mask
+                return v
+            return BitVec.__isub__(self, lhs)
+
+        def __imul__(self, lhs):
+            if type(lhs) is Fixed:
+                v = new(Fixed)
+                v.val = (self.val * lhs.val) & mask
+                return v
+            if type(lhs) is int:
+                v = new(Fixed)
+                v.val = (self.val * lhs) & mask
+                return v
+            return BitVec.__imul__(self, lhs)
+
+        def __and__(self, lhs):
+            if type(lhs) is Fixed or (type(lhs) is int and 0 <= lhs <= mask):
+                v = new(Fixed)
+                v.val = self.val & (lhs if type(lhs) is int else lhs.val)
+                return v
+            return BitVec.__and__(self, lhs)
+
+        def __or__(self, lhs):
+            if type(lhs) is Fixed or (type(lhs) is int and 0 <= lhs <= mask):
+                v = new(Fixed)
+                v.val = self.val | (lhs if type(lhs) is int else lhs.val)
+                return v
+            return BitVec.__or__(self, lhs)
+
+        def __xor__(self, lhs):
+            if type(lhs) is Fixed or (type(lhs) is int and 0 <= lhs <= mask):
+                v = new(Fixed)
+                v.val = self.val ^ (lhs if type(lhs) is int else lhs.val)
+                return v
+            return BitVec.__xor__(self, lhs)
+
+        __rand__ = __and__
+        __ror__ = __or__
+        __rxor__ = __xor__
+
+        def __iand__(self, lhs):
+            if type(lhs) is Fixed or (type(lhs) is int and lhs >= 0):
+                v = new(Fixed)
+                v.val = self.val & (lhs if type(lhs) is int else lhs.val)
+                return v
+            return BitVec.__iand__(self, lhs)
+
+        def __ior__(self, lhs):
+            if type(lhs) is Fixed or (type(lhs) is int and lhs >= 0):
+                v = new(Fixed)
+                v.val = (self.val | (lhs if type(lhs) is int else lhs.val)) & mask
+                return v
+            return BitVec.__ior__(self, lhs)
+
+        def __ixor__(self, lhs):
+            if type(lhs) is Fixed or (type(lhs) is int and lhs >= 0):
+                v = new(Fixed)
+                v.val = (self.val ^ (lhs if type(lhs) is int else lhs.val)) & mask
+                return v
+            return BitVec.__ixor__(self, lhs)
+
+        def __invert__(self):
+            v = new(Fixed)
+            v.val = self.val ^ mask
+            return v
+
+        def __lshift__(self, lhs):
+            if type(lhs) is int and lhs >= 0:
+                v = new(logical or shift_type())
+                v.val = (self.val << lhs) & mask
+                return v
+            return BitVec.__lshift__(self, lhs)
+
+        def __rshift__(self, lhs):
+            if type(lhs) is int and lhs >= 0:
+                v = new(logical or shift_type())
+                v.val = self.val >> lhs
+                return v
+            return BitVec.__rshift__(self, lhs)
+
+        __ilshift__ = __lshift__
+        __irshift__ = __rshift__
+
+        def __eq__(self, lhs):
+            if type(lhs) is Fixed:
+                return self.val == lhs.val
+            if type(lhs) is int:
+                return (self.val ^ off) - off == lhs
+            return BitVec.__eq__(self, lhs)
+
+        def __ne__(self, lhs):
+            if type(lhs) is Fixed:
+                return self.val != lhs.val
+            if type(lhs) is int:
+                return (self.val ^ off) - off != lhs
+            return BitVec.__ne__(self, lhs)
+
+        def __lt__(self, lhs):
+            if type(lhs) is Fixed:
+                return (self.val ^ off) < (lhs.val ^ off)
+            if type(lhs) is int:
+                return (self.val ^ off) - off < lhs
+            return BitVec.__lt__(self, lhs)
+
+        def __le__(self, lhs):
+            if type(lhs) is Fixed:
+                return (self.val ^ off) <= (lhs.val ^ off)
+            if type(lhs) is int:
+                return (self.val ^ off) - off <= lhs
+            return BitVec.__le__(self, lhs)
+
+        def __gt__(self, lhs):
+            if type(lhs) is Fixed:
+                return (self.val ^ off) > (lhs.val ^ off)
+            if type(lhs) is int:
+                return (self.val ^ off) - off > lhs
+            return BitVec.__gt__(self, lhs)
+
+        def __ge__(self, lhs):
+            if type(lhs) is Fixed:
+                return (self.val ^ off) >= (lhs.val ^ off)
+            if type(lhs) is int:
+                return (self.val ^ off) - off >= lhs
+            return BitVec.__ge__(self, lhs)
+
+    Fixed.size = size
+    Fixed.is_signed = signed
+    Fixed.mask = mask
+    Fixed.sign_bit = 1 << (size - 1)
+    Fixed.min = -(1 << (size - 1)) if signed else 0
+    Fixed.max = (1 << (size - 1)) - 1 if signed else mask
+    Fixed.__name__ = Fixed.__qualname__ = f"{'SBitVec' if signed else 'BitVec'}[{size}]"
+    _TYPES.add(Fixed)
+    for hook in list(_NEW_TYPE_HOOKS):
+        hook(Fixed)
+    return Fixed
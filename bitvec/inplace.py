@@ -0,0 +1,19 @@
+"""
+BitVec with in-place operators that update the vector itself
+
+A module opts in to in-place +=, -=, &=, ... for the vectors it creates by
+importing BitVec from here instead of from bitvec:
+
+from bitvec.inplace import BitVec as bv
+
+acc = bv(32)
+alias = acc
+for x in data:
+    acc += x        #no allocation; alias sees every update
+
+See bitvec.InPlaceBitVec.
+"""
+
+from . import InPlaceBitVec as BitVec
+
+__all__ = ["BitVec"]
@@ -0,0 +1,227 @@
+"""
+Opt-in instrumentation of the BitVec operations
+
+profile() patches every method and operator of the BitVec classes, Reducer
+and BitVecArray with a counting wrapper while it is active and puts the
+original functions back afterwards, so there is no cost at all when it is
+off. Specialized types such as bv[32] are patched with their base class,
+also those first used while the profile is active.
+
+import bitvec
+
+with bitvec.profile() as prof:
+    for _ in range(100):
+        example.crc_calc(example.CRC_IN, data)
+print(prof.report())            #calls, total and own time per operation
+prof.stats["BitVec.__xor__"]    #OpStats(calls=..., total=..., own=...)
+prof.created                    #Counter of BitVec constructions per call site
+
+`total` is the time inside the operation including the operations it
+calls, `own` excludes them. Constructions are counted once per new vector
+and attributed to the first caller outside the bitvec package, so `a + b`
+in user code counts against that line; the results the operators of
+specialized types build without __init__ are counted as well.
+profile(callback=f) also calls
+f(name, seconds) after every operation. start() and stop() do the same as
+the with block. Only one profile can be active at a time and it is not
+thread safe.
+
+profile(), memoize() and overflow() each wrap the methods as they find
+them, so they can be active together only when they stop in reverse order
+of starting, as nested with blocks do. Stopping an outer one first raises
+RuntimeError and leaves every patch in place.
+"""
+
+import os
+import sys
+from collections import Counter, namedtuple
+from time import perf_counter
+
+from . import BitVec, BitVecView, FrozenBitVec, InPlaceBitVec, Reducer, WordBitVec
+from . import _start_patching, _stop_patching, fixed
+from .batch import BitVecArray
+from .fixed import SBitVec
+
+# the specialized types of BitVec[n] and SBitVec[n] are patched with their base
+CLASSES = (BitVec, SBitVec, InPlaceBitVec, FrozenBitVec, WordBitVec, BitVecView, Reducer, BitVecArray)
+# patching these would change how the instances themselves work
+_SKIP = {"__setattr__", "__delattr__", "__getattribute__", "__getattr__", "__new__"}
+_PACKAGE = os.path.dirname(os.path.abspath(__file__))
+
+OpStats = namedtuple("OpStats", "calls total own")
+
+_active = None
+
+
+# co_filename -> whether the code belongs to the bitvec package
+_in_package = {}
+# (code, instruction offset) -> call site
+_sites = {}
+
+
+def _call_site():
+    """(file, line, function) of the first frame outside the bitvec package"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        inside = _in_package.get(path)
+        if inside is None:
+            inside = _in_package[path] = os.path.dirname(os.path.abspath(path)) == _PACKAGE
+        if not inside:
+            break
+        frame = frame.f_back
+    if frame is None:
+        return ("?", 0, "?")
+    # f_lineno scans the line table, which is slow for long functions
+    key = (frame.f_code, frame.f_lasti)
+    site = _sites.get(key)
+    if site is None:
+        code = frame.f_code
+        site = _sites[key] = (code.co_filename, frame.f_lineno, code.co_name)
+    return site
+
+
+class Profile:
+    """Counters of one profiling session, see the module docstring"""
+
+    def __init__(self, callback=None, classes=CLASSES):
+        self.callback = callback
+        self.classes = classes
+        self._calls = Counter()
+        self._total = Counter()
+        self._own = Counter()
+        self.created = Counter()
+        self._saved = []
+        # time spent in callees, one entry per operation in progress
+        self._child = []
+        self._constructing = set()
+        # number of constructions counted so far, as a cell the wrappers share
+        self._tally = [0]
+
+    @property
+    def stats(self):
+        """name -> OpStats(calls, total seconds, own seconds)"""
+        return {
+            name: OpStats(n, self._total[name], self._own[name]) for name, n in self._calls.items()
+        }
+
+    def _wrap(self, name, func, init, fresh=False):
+        calls, total, own, child = self._calls, self._total, self._own, self._child
+        constructing, created, tally = self._constructing, self.created, self._tally
+        types = fixed._TYPES
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            if init:
+                # backend switches run a second __init__ on the same vector
+                new = id(args[0]) not in constructing
+                if new:
+                    constructing.add(id(args[0]))
+                    created[_call_site()] += 1
+                    tally[0] += 1
+            elif fresh:
+                before = tally[0]
+            child.append(0.0)
+            try:
+                result = func(*args, **kwargs)
+                if fresh and tally[0] == before and type(result) in types:
+                    # the fast paths of the specialized types skip __init__
+                    if all(result is not arg for arg in args):
+                        created[_call_site()] += 1
+                        tally[0] += 1
+                return result
+            finally:
+                elapsed = perf_counter() - start
+                inner = child.pop()
+                if child:
+                    child[-1] += elapsed
+                calls[name] += 1
+                total[name] += elapsed
+                own[name] += elapsed - inner
+                if init and new:
+                    constructing.discard(id(args[0]))
+                if self.callback is not None:
+                    self.callback(name, elapsed)
+
+        wrapper.__name__ = func.__name__
+        wrapper.__qualname__ = func.__qualname__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def start(self):
+        """Patch the classes; the counters keep adding up over restarts"""
+        global _active
+        if _active is not None:
+            raise RuntimeError("A bitvec profile is already active")
+        for cls in self.classes:
+            self._patch(cls)
+        for cls in list(fixed._TYPES):
+            self._patch_fixed(cls)
+        fixed._NEW_TYPE_HOOKS.append(self._patch_fixed)
+        _start_patching(self)
+        _active = self
+        return self
+
+    def _patch(self, cls, fresh=False):
+        for attr, value in list(vars(cls).items()):
+            if attr in _SKIP:
+                continue
+            name = f"{cls.__name__}.{attr}"
+            if isinstance(value, classmethod):
+                patched = classmethod(self._wrap(name, value.__func__, False))
+            elif callable(value) and not isinstance(value, (staticmethod, type)):
+                init = attr == "__init__" and issubclass(cls, BitVec)
+                patched = self._wrap(name, value, init, fresh and not init)
+            else:
+                continue
+            self._saved.append((cls, attr, value))
+            setattr(cls, attr, patched)
+
+    def _patch_fixed(self, cls):
+        """Patch a specialized type when its base class is profiled"""
+        if cls.__bases__[0] in self.classes:
+            self._patch(cls, fresh=True)
+
+    def stop(self):
+        """Put the original methods back"""
+        global _active
+        _stop_patching(self)
+        if self._patch_fixed in fixed._NEW_TYPE_HOOKS:
+            fixed._NEW_TYPE_HOOKS.remove(self._patch_fixed)
+        for cls, attr, value in reversed(self._saved):
+            setattr(cls, attr, value)
+        self._saved.clear()
+        _sites.clear()
+        if _active is self:
+            _active = None
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def report(self, sort="own", limit=30):
+        """Table of the operations sorted by "own", "total" or "calls", and the top call sites"""
+        key = {"own": 2, "total": 1, "calls": 0}[sort]
+        rows = sorted(self.stats.items(), key=lambda kv: kv[1][key], reverse=True)
+        lines = [f"{'operation':<32}{'calls':>10}{'total ms':>12}{'own ms':>12}{'us/call':>10}"]
+        for name, (calls, total, own) in rows[:limit]:
+            lines.append(
+                f"{name:<32}{calls:>10}{total * 1e3:>12.3f}{own * 1e3:>12.3f}"
+                f"{total / calls * 1e6:>10.2f}"
+            )
+        lines.append(f"vectors created: {sum(self.created.values())}")
+        for (path, line, func), n in self.created.most_common(limit):
+            lines.append(f"  {os.path.basename(path)}:{line} {func:<28}{n:>10}")
+        return "\n".join(lines)
+
+
+def profile(callback=None, classes=CLASSES):
+    """
+    Profile of the BitVec operations, for use in a with block or with
+    start()/stop(); see bitvec.instrument
+    """
+    return Profile(callback, classes)
@@ -0,0 +1,149 @@
+"""
+Provides BitStruct: named bit fields of a fixed size word
+
+A layout is declared once and compiled into a table of (shift, mask)
+parts per field; unpack and pack then walk that table in a single pass.
+
+from bitvec import BitVec as bv, BitStruct
+
+Data = BitStruct(32, seqn=(31, 4), addr=(3, 0))
+seqn, addr = Data.unpack(bv(32, 0x123))     #seqn = bv(28, 0x12), addr = bv(4, 0x3)
+Data.pack(seqn=0x12, addr=3)                #==> bv(32, 0x123)
+
+A field is a bit index, an (msb, lsb) range or a list of those for fields
+spread over the word; the parts of a list are concatenated as in bv.C,
+the first part giving the high bits of the field. (lsb, msb) ranges are
+reversed, as in part-selects.
+
+Frame = BitStruct(64, crc=[(7, 0), (23, 16), (39, 32), (55, 48)],
+                      data=[(15, 8), (31, 24), (47, 40), (63, 56)])
+"""
+
+from collections import namedtuple
+
+from . import BitVec, _decode_slice, _reverse_bits
+from .batch import BitVecArray
+
+
+def _parse(name, spec):
+    """Parts of a field spec as a list of (msb, lsb)"""
+    if isinstance(spec, int):
+        return [(spec, spec)]
+    if isinstance(spec, tuple) and len(spec) == 2 and all(isinstance(i, int) for i in spec):
+        return [spec]
+    if isinstance(spec, list) and spec:
+        return [p for part in spec for p in _parse(name, part)]
+    raise TypeError(f"Field {name!r}: expected a bit index, an (msb, lsb) tuple or a list of those")
+
+
+class BitStruct:
+    """
+    Layout of named fields in a `size` bit word.
+    Fields are given as keyword arguments (or a dict, for names that clash
+    with the arguments), in order; see the module docstring for the specs.
+
+    unpack returns a Record (a namedtuple with one BitVec per field) and
+    pack builds the word from field values. Both accept BitVecArray values
+    and then work on the whole batch; unpack_all and pack_all map over lists.
+    """
+
+    size: int
+    fields: dict
+
+    def __init__(self, size, fields=None, **kwfields):
+        layout = dict(fields or {}, **kwfields)
+        if not layout:
+            raise ValueError("A BitStruct needs at least one field")
+        self.size = size
+        self.fields = {}
+        self._parts = []
+        self._slices = []
+        used = 0
+        for name, spec in layout.items():
+            parts = _parse(name, spec)
+            table, width = [], 0
+            # the last part holds the low bits of the field
+            for msb, lsb in reversed(parts):
+                lo, w, _, reverse = _decode_slice(size, slice(msb, lsb))
+                if lo < 0 or lo + w > size:
+                    raise ValueError(f"Field {name!r}: bits {msb}:{lsb} outside a {size} bit word")
+                mask = (1 << w) - 1
+                if used & (mask << lo):
+                    raise ValueError(f"Field {name!r}: bits {msb}:{lsb} overlap another field")
+                used |= mask << lo
+                table.append((lo, mask, w, width, reverse))
+                width += w
+            self.fields[name] = width
+            self._parts.append((name, width, tuple(table)))
+            self._slices.append([slice(msb, lsb) for msb, lsb in parts])
+        self.Record = namedtuple("Record", layout)
+        self._index = {name: i for i, name in enumerate(layout)}
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={w}" for k, w in self.fields.items())
+        return f"BitStruct({self.size}, {fields})"
+
+    def unpack(self, word):
+        """All fields of word (BitVec, int or BitVecArray) as a Record"""
+        if isinstance(word, BitVecArray):
+            return self.Record(
+                *(BitVecArray.concat(*(word[s] for s in slices)) for slices in self._slices)
+            )
+        val = word.val if isinstance(word, BitVec) else word
+        out = []
+        for _, width, table in self._parts:
+            v = 0
+            for lo, mask, w, pos, reverse in table:
+                bits = (val >> lo) & mask
+                if reverse:
+                    bits = _reverse_bits(bits, w)
+                v |= bits << pos
+            out.append(BitVec(width, v))
+        return self.Record(*out)
+
+    def pack(self, **values):
+        """
+        Word with the given field values (BitVec or int; missing fields are 0)
+        If any value is a BitVecArray the result is a BitVecArray, other
+        values are broadcast
+        """
+        if any(isinstance(v, BitVecArray) for v in values.values()):
+            return self._pack_array(values)
+        word = 0
+        for name, value in values.items():
+            if name not in self._index:
+                raise TypeError(f"{name!r} is not a field of {self!r}")
+            v = value.val if isinstance(value, BitVec) else value
+            for lo, mask, w, pos, reverse in self._parts[self._index[name]][2]:
+                bits = (v >> pos) & mask
+                if reverse:
+                    bits = _reverse_bits(bits, w)
+                word |= bits << lo
+        return BitVec(self.size, word)
+
+    def _pack_array(self, values):
+        count = next(len(v) for v in values.values() if isinstance(v, BitVecArray))
+        out = BitVecArray.zeros(self.size, count)
+        for name, value in values.items():
+            if name not in self._index:
+                raise TypeError(f"{name!r} is not a field of {self!r}")
+            i = self._index[name]
+            if isinstance(value, BitVec):
+                value = value.val
+            # parts in field order, the field's high bits first; scalars are broadcast
+            for s, (_, _, w, pos, _) in zip(self._slices[i], reversed(self._parts[i][2])):
+                if isinstance(value, BitVecArray):
+                    out[s] = value[pos + w - 1 : pos]
+                else:
+                    out[s] = BitVec(w, value >> pos)
+        return out
+
+    def unpack_all(self, words):
+        """unpack over a list of words"""
+        return [self.unpack(w) for w in words]
+
+    def pack_all(self, records):
+        """pack over a list of Records or field dicts"""
+        return [
+            self.pack(**(r._asdict() if isinstance(r, self.Record) else r)) for r in records
+        ]
@@ -0,0 +1,232 @@
+"""
+Provides LinearMap: affine maps over GF(2) between bitvectors
+
+Scramblers, CRC register updates and LFSR steps are XOR networks: every
+output bit is the XOR of some input bits, possibly inverted. Such a map is
+y = M x ^ offset for a bit matrix M, and is stored here as the image of
+every input bit (the columns of M). Evaluation XORs one precomputed table
+entry per input byte, so a 32 bit map costs four lookups whatever the
+number of XOR gates it replaces.
+
+from bitvec import BitVec as bv
+from bitvec.linear import LinearMap
+import example
+
+crc = LinearMap.from_function(example.crc_calc, 32, 32)  #probes unit vectors
+crc(example.CRC_IN, bv(32, 5))                           #==> example.crc_calc(CRC_IN, bv(32, 5))
+
+step = LinearMap.from_function(lambda s: (s >> 1) ^ (0xEDB88320 if s[0] == 1 else 0), 32)
+jump = step ** 1000                                      #1000 steps in one map
+step.inverse()                                           #one step back
+
+Multiple arguments are concatenated as in bv.C, the first argument in the
+high bits. Batches (BitVecArray arguments) are evaluated on the packed
+lanes, one multiply-accumulate over the whole batch per input bit.
+"""
+
+import random
+
+from . import BitVec
+from .batch import BitVecArray, _rep, _stride
+
+
+def _transpose(vectors, width):
+    """Bit matrix transpose: bit j of result[i] is bit i of vectors[j]"""
+    out = [0] * width
+    for j, v in enumerate(vectors):
+        while v:
+            low = v & -v
+            out[low.bit_length() - 1] |= 1 << j
+            v ^= low
+    return out
+
+
+class LinearMap:
+    """
+    Affine map over GF(2) from in_size bit vectors to out_size bit vectors.
+    columns[j] is the image of input bit j without the offset; offset is
+    the image of zero (0 for a linear map).
+    """
+
+    in_size: int
+    out_size: int
+    columns: tuple
+    offset: int
+
+    def __init__(self, in_size, out_size, columns, offset=0):
+        mask = (1 << out_size) - 1
+        columns = tuple((c.val if isinstance(c, BitVec) else c) & mask for c in columns)
+        if len(columns) != in_size:
+            raise ValueError(f"Expected {in_size} columns; got {len(columns)}")
+        self.in_size = in_size
+        self.out_size = out_size
+        self.columns = columns
+        self.offset = (offset.val if isinstance(offset, BitVec) else offset) & mask
+        self._tables = None
+
+    @classmethod
+    def from_matrix(cls, rows, in_size, offset=0):
+        """
+        Build from the rows of the bit matrix: bit j of rows[i] set means
+        input bit j feeds output bit i. Rows may be ints, BitVecs or
+        sequences of 0/1 indexed by input bit.
+        """
+        ints = []
+        for row in rows:
+            if isinstance(row, BitVec):
+                row = row.val
+            elif not isinstance(row, int):
+                row = sum((b & 1) << j for j, b in enumerate(row))
+            ints.append(row & ((1 << in_size) - 1))
+        return cls(in_size, len(ints), _transpose(ints, in_size), offset)
+
+    @classmethod
+    def from_function(cls, func, *sizes, checks=16, rng=None):
+        """
+        Build from func, which takes vectors of the given sizes and returns
+        a BitVec, by evaluating it on zero and on every unit vector. `checks`
+        random inputs are then compared with func; ValueError is raised when
+        func is not affine over GF(2). The inputs come from rng (a
+        random.Random), by default a fresh Random(0), so the global random
+        state is left alone and the check is the same on every run.
+        """
+        if not sizes:
+            raise ValueError("Expected the size of every argument of func")
+
+        def call(x):
+            args, shift = [], sum(sizes)
+            for size in sizes:
+                shift -= size
+                args.append(BitVec(size, x >> shift))
+            out = func(*args)
+            if not isinstance(out, BitVec):
+                raise TypeError(f"Expected func to return BitVec; got {type(out)}")
+            return out
+
+        zero = call(0)
+        in_size = sum(sizes)
+        columns = [call(1 << j).val ^ zero.val for j in range(in_size)]
+        lmap = cls(in_size, zero.size, columns, zero.val)
+        if rng is None:
+            rng = random.Random(0)
+        for _ in range(checks):
+            x = rng.getrandbits(in_size)
+            if call(x).val != lmap.apply(x):
+                raise ValueError(f"{getattr(func, '__name__', func)} is not affine over GF(2)")
+        return lmap
+
+    @classmethod
+    def identity(cls, size):
+        """Map returning its input"""
+        return cls(size, size, [1 << j for j in range(size)])
+
+    def rows(self):
+        """Rows of the bit matrix as ints, see from_matrix"""
+        return _transpose(self.columns, self.out_size)
+
+    def __repr__(self):
+        return f"LinearMap({self.in_size} -> {self.out_size} bits, offset={self.offset:#x})"
+
+    def __eq__(self, other):
+        if not isinstance(other, LinearMap):
+            return NotImplemented
+        return (self.in_size, self.out_size, self.columns, self.offset) == (
+            other.in_size,
+            other.out_size,
+            other.columns,
+            other.offset,
+        )
+
+    def _byte_tables(self):
+        """tables[k][b]: XOR of the columns of the bits set in byte k"""
+        if self._tables is None:
+            tables = []
+            for k in range(0, self.in_size, 8):
+                cols = self.columns[k : k + 8]
+                table = [0] * (1 << len(cols))
+                for b in range(1, len(table)):
+                    low = b & -b
+                    table[b] = table[b ^ low] ^ cols[low.bit_length() - 1]
+                tables.append(table + [0] * (256 - len(table)))
+            self._tables = tables
+        return self._tables
+
+    def apply(self, x):
+        """Image of the integer x, as an integer"""
+        tables = self._byte_tables()
+        y = self.offset
+        for table, b in zip(tables, (x & ((1 << self.in_size) - 1)).to_bytes(len(tables), "little")):
+            y ^= table[b]
+        return y
+
+    def _apply_batch(self, arr):
+        n = arr.count
+        stride = max(arr.stride, _stride(self.out_size))
+        src = arr._at(stride)
+        ones = _rep(1, stride, n)
+        out = _rep(self.offset, stride, n)
+        for j, col in enumerate(self.columns[: arr.size]):
+            if col:
+                out ^= ((src >> j) & ones) * col
+        return BitVecArray._new(self.out_size, n, False, out, stride)
+
+    def __call__(self, *args):
+        """
+        Apply to a BitVec, an int or a BitVecArray. Several arguments are
+        concatenated first, the first one in the high bits.
+        """
+        if any(isinstance(a, BitVecArray) for a in args):
+            x = args[0] if len(args) == 1 else BitVecArray.concat(*args)
+            return self._apply_batch(x)
+        if len(args) == 1:
+            x = args[0]
+        else:
+            x = BitVec.concat(*args)
+        x = x.val if isinstance(x, BitVec) else x
+        return BitVec(self.out_size, self.apply(x))
+
+    def compose(self, other):
+        """Map applying other first, then self"""
+        if other.out_size != self.in_size:
+            raise ValueError(
+                f"Cannot compose: inner map gives {other.out_size} bits, outer takes {self.in_size}"
+            )
+        columns = [self.apply(c) ^ self.offset for c in other.columns]
+        return LinearMap(other.in_size, self.out_size, columns, self.apply(other.offset))
+
+    __mul__ = compose
+
+    def inverse(self):
+        """Inverse map; ValueError if the map is not a bijection"""
+        n = self.in_size
+        if self.out_size != n:
+            raise ValueError("Only square maps can be inverted")
+        # Gauss-Jordan on [M | I], one int per row
+        rows = [r | (1 << (n + i)) for i, r in enumerate(self.rows())]
+        for col in range(n):
+            pivot = next((r for r in range(col, n) if (rows[r] >> col) & 1), None)
+            if pivot is None:
+                raise ValueError("LinearMap is not invertible")
+            rows[col], rows[pivot] = rows[pivot], rows[col]
+            for r in range(n):
+                if r != col and (rows[r] >> col) & 1:
+                    rows[r] ^= rows[col]
+        inv = LinearMap.from_matrix([r >> n for r in rows], n)
+        # x = M^-1 (y ^ offset)
+        return LinearMap(n, n, inv.columns, inv.apply(self.offset))
+
+    def power(self, k):
+        """Map applied k times; negative k uses the inverse"""
+        if self.out_size != self.in_size:
+            raise ValueError("Only square maps have powers")
+        base = self if k >= 0 else self.inverse()
+        result = LinearMap.identity(self.in_size)
+        k = abs(k)
+        while k:
+            if k & 1:
+                result = base.compose(result)
+            base = base.compose(base)
+            k >>= 1
+        return result
+
+    __pow__ = power
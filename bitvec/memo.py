@@ -0,0 +1,180 @@
+"""
+Opt-in LRU cache for the results of costly BitVec operations
+
+memoize() patches *, **, /, //, % and pattern_match of BitVec with a
+wrapper that looks the operands up in a bounded LRU cache while it is
+active, and puts the original functions back afterwards. Only operations
+with an operand of at least `min_bits` bits are cached: for narrow vectors
+building the key costs more than the operation.
+
+import bitvec
+
+with bitvec.memoize(maxsize=1024, min_bits=256) as cache:
+    for frame in frames:
+        frame % poly                 #computed once per distinct frame value
+print(cache.info())                  #CacheInfo(hits=..., misses=..., maxsize=1024, currsize=...)
+cache.clear()                        #drop every entry, cache.invalidate("__mod__") one operation
+
+Keys hold the operand values, not the vectors, so a cached result never
+goes stale when a vector changes; invalidation only frees memory. Each hit
+returns a new vector of the type the operation returned, so results can be
+modified freely. Only one cache
+can be active at a time and it is not thread safe. It nests with
+profile() and overflow() blocks in the order described in bitvec.instrument.
+"""
+
+from collections import OrderedDict, namedtuple
+
+from . import BitVec, _iter_set_bits, _start_patching, _stop_patching, fixed
+
+OPERATIONS = ("__mul__", "__pow__", "__truediv__", "__floordiv__", "__mod__", "pattern_match")
+
+CacheInfo = namedtuple("CacheInfo", "hits misses maxsize currsize")
+
+_active = None
+
+
+def _operand(x):
+    """Key part of an operand; None for operands that are not cached"""
+    if isinstance(x, BitVec):
+        # the type too: operations on subclasses may return other types
+        return (x.size, x.val, x.is_signed, type(x))
+    if isinstance(x, int):
+        return x
+    return None
+
+
+class OpCache:
+    """LRU cache of operation results, see the module docstring"""
+
+    def __init__(self, maxsize=1024, min_bits=256, operations=OPERATIONS):
+        if maxsize < 1:
+            raise ValueError(f"Cache size must be at least 1; got {maxsize}")
+        self.maxsize = maxsize
+        self.min_bits = min_bits
+        self.operations = operations
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._saved = []
+
+    def info(self):
+        """CacheInfo(hits, misses, maxsize, currsize)"""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self):
+        """Drop every entry and reset the statistics"""
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def invalidate(self, operation=None):
+        """Drop the entries of one operation (e.g. "__mod__"), or all of them"""
+        if operation is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == operation]:
+            del self._entries[key]
+
+    def _lookup(self, key):
+        entries = self._entries
+        result = entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def _store(self, key, result):
+        entries = self._entries
+        entries[key] = result
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def _wrap_operator(self, name, func):
+        min_bits = self.min_bits
+        cache = self
+
+        def wrapper(self_, lhs):
+            other = _operand(lhs)
+            if other is None:
+                return func(self_, lhs)
+            width = other[0] if type(other) is tuple else other.bit_length()
+            if self_.size < min_bits and width < min_bits:
+                return func(self_, lhs)
+            key = (name, self_.size, self_.val, self_.is_signed, type(self_), other)
+            found = cache._lookup(key)
+            if found is None:
+                res = func(self_, lhs)
+                found = (res.size, res.val, res.is_signed, type(res))
+                cache._store(key, found)
+            size, val, signed, cls = found
+            if cls in fixed._TYPES:
+                return cls(val)
+            return cls(size, val, signed)
+
+        return wrapper
+
+    def _wrap_pattern_match(self, func):
+        min_bits = self.min_bits
+        cache = self
+
+        def wrapper(self_, pattern=None, mask=None, as_mask=False):
+            if self_.size < min_bits:
+                return func(self_, pattern, mask, as_mask)
+            key = ("pattern_match", self_.size, self_.val, _operand(pattern), _operand(mask))
+            hits = cache._lookup(key)
+            if hits is None:
+                hits = func(self_, pattern, mask, True).val
+                cache._store(key, hits)
+            if as_mask:
+                return BitVec(self_.size, hits)
+            return _iter_set_bits(hits)
+
+        return wrapper
+
+    def start(self):
+        """Patch BitVec; entries and statistics are kept over restarts"""
+        global _active
+        if _active is not None:
+            raise RuntimeError("A bitvec cache is already active")
+        for name in self.operations:
+            func = BitVec.__dict__[name]
+            if name == "pattern_match":
+                patched = self._wrap_pattern_match(func)
+            else:
+                patched = self._wrap_operator(name, func)
+            patched.__name__ = func.__name__
+            patched.__qualname__ = func.__qualname__
+            patched.__doc__ = func.__doc__
+            patched.__wrapped__ = func
+            self._saved.append((name, func))
+            setattr(BitVec, name, patched)
+        _start_patching(self)
+        _active = self
+        return self
+
+    def stop(self):
+        """Put the original methods back"""
+        global _active
+        _stop_patching(self)
+        for name, func in reversed(self._saved):
+            setattr(BitVec, name, func)
+        self._saved.clear()
+        if _active is self:
+            _active = None
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def memoize(maxsize=1024, min_bits=256, operations=OPERATIONS):
+    """
+    LRU cache of BitVec operation results, for use in a with block or with
+    start()/stop(); see bitvec.memo
+    """
+    return OpCache(maxsize, min_bits, operations)
@@ -0,0 +1,84 @@
+"""
+Process pool map over batches of BitVec values
+
+map(func, vectors) calls func on every vector in worker processes and
+returns the results in order. The vectors are not pickled one by one: they
+are written once into a shared memory block as fixed width little endian
+records (ceil(size/8) bytes each, as in bitvec.records), and a task only
+names a range of records. The worker reads its range from the block with
+one int.from_bytes and splits it into BitVecs through a BitVecArray; only
+func, the range and the results go through pickle.
+
+from bitvec import parallel
+
+def check(frame):                        #module level, so the workers can import it
+    return example.crc_calc(example.CRC_IN, frame[31:0]) == 0
+
+results = parallel.map(check, frames, workers=8)             #list of BitVecs, in order
+results = parallel.map(check, record_file.array(), chunk=8192)   #or a BitVecArray
+
+with ProcessPoolExecutor(8) as pool:     #reuse one pool for many calls
+    for batch in record_file.chunks():
+        parallel.map(check, batch, executor=pool)
+
+All vectors must have the same size and signedness. chunk is the number
+of vectors per task; by default every worker gets about four tasks. With
+workers=1 and no executor func runs in this process.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .batch import BitVecArray, _as_array, _restride
+from .records import _record_bytes
+
+
+def _run_chunk(func, name, size, signed, start, stop):
+    """Worker side: records start..stop-1 of the shared block, func applied to each"""
+    nb = _record_bytes(size)
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        with shm.buf[start * nb : stop * nb] as view:
+            packed = int.from_bytes(view, "little")
+    finally:
+        shm.close()
+    return [func(v) for v in BitVecArray._new(size, stop - start, signed, packed, nb * 8)]
+
+
+def map(func, vectors, workers=None, chunk=None, executor=None):
+    """
+    [func(v) for v in vectors], computed in a process pool of `workers`
+    processes (default os.cpu_count()) or on `executor`; see bitvec.parallel
+    """
+    arr = _as_array(vectors)
+    count = arr.count
+    if not count:
+        return []
+    if executor is None and workers == 1:
+        return [func(v) for v in arr]
+    workers = workers or os.cpu_count() or 1
+    if chunk is None:
+        chunk = max(1, -(-count // (4 * workers)))
+    nb = _record_bytes(arr.size)
+    data = _restride(arr.packed, count, arr.stride, nb * 8).to_bytes(nb * count, "little")
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        shm.buf[: len(data)] = data
+        del data
+        pool = executor if executor is not None else ProcessPoolExecutor(workers)
+        try:
+            futures = [
+                pool.submit(_run_chunk, func, shm.name, arr.size, arr.is_signed, i, min(i + chunk, count))
+                for i in range(0, count, chunk)
+            ]
+            results = []
+            for future in futures:
+                results.extend(future.result())
+        finally:
+            if executor is None:
+                pool.shutdown()
+    finally:
+        shm.close()
+        shm.unlink()
+    return results
@@ -0,0 +1,157 @@
+"""
+Provides BitVecRandom: seeded, constrained random batches of BitVec values
+
+Every method returns a BitVecArray of n values drawn in one call, with no
+per-element rejection loop:
+
+    uniform     getrandbits over the whole batch and one mask; bits can
+                be fixed with mask/value
+    between     lo..hi inclusive: each lane multiplies 64 extra random bits
+                by the span and keeps the high part, all lanes at once
+                (the bias is below 2**-64)
+    onehot      one set bit at a uniform position
+    popcount    k set bits at distinct uniform positions (an index into the
+                table of all such values for small sizes)
+    choice      values picked with optional weights
+    dist        SystemVerilog style dist: (lo, hi, weight) ranges
+
+from bitvec.rand import BitVecRandom
+
+rnd = BitVecRandom(seed=1)                 #same seed, same values
+rnd.uniform(32, 1000)                      #BitVecArray of 1000 random 32 bit values
+rnd.uniform(32, 1000, mask=0xFF, value=0x5A)   #low byte fixed to 0x5A
+rnd.between(16, 1000, -100, 100, signed=True)
+rnd.onehot(16, 1000)
+rnd.popcount(64, 1000, k=3)
+rnd.choice(8, 1000, [0, 0xFF, 0x55], weights=[1, 1, 8])
+rnd.dist(12, 1000, [(0, 0, 1), (1, 99, 5), (4000, 4095, 2)])
+rnd.uniform(32, 1000).tolist()             #list of BitVec
+"""
+
+import random
+from functools import lru_cache
+from itertools import combinations, repeat
+from math import comb
+from operator import lshift
+
+from .batch import LANE, BitVecArray, _mask, _pack, _rep, _stride, _unpack
+
+# extra random bits per lane in between(): the bias of a value is span / 2**64 at most
+_EXTRA = 64
+# popcount() draws from a table of all the values when there are at most this many
+_TABLE_MAX = 1 << 16
+
+
+@lru_cache(maxsize=16)
+def _popcount_table(size, k):
+    return [sum(1 << p for p in bits) for bits in combinations(range(size), k)]
+
+
+def _range_values(size, signed):
+    if signed and size:
+        return -(1 << (size - 1)), (1 << (size - 1)) - 1
+    return 0, _mask(size)
+
+
+class BitVecRandom:
+    """
+    Random batches of constrained BitVec values, see the module docstring.
+    seed is passed to random.Random; rng= uses an existing random.Random.
+    """
+
+    def __init__(self, seed=None, rng=None):
+        self.rng = rng if rng is not None else random.Random(seed)
+
+    def seed(self, seed):
+        self.rng.seed(seed)
+
+    def _array(self, size, n, signed, packed, stride=None):
+        return BitVecArray._new(size, n, signed, packed, stride)
+
+    def uniform(self, size, n, signed=False, mask=0, value=0):
+        """n uniform values; the bits set in mask are taken from value instead"""
+        stride = _stride(size)
+        keep = _mask(size) & ~mask
+        packed = self.rng.getrandbits(stride * n) & _rep(keep, stride, n) if n else 0
+        if mask:
+            packed |= _rep(value & mask & _mask(size), stride, n)
+        return self._array(size, n, signed, packed)
+
+    def _between(self, n, span, width=0):
+        """Packed lanes of n values in 0..span-1, and the lane stride (over width bits)"""
+        bits = span.bit_length()
+        draw = bits + _EXTRA
+        stride = LANE * -(-max(draw + bits, width) // LANE)
+        lanes = self.rng.getrandbits(stride * n) & _rep(_mask(draw), stride, n)
+        # every lane: (random * span) >> draw, a product below 2**(draw + bits)
+        packed = ((lanes * span) >> draw) & _rep(_mask(bits), stride, n)
+        return packed, stride
+
+    def between(self, size, n, lo, hi, signed=False):
+        """n values uniform in lo..hi (inclusive), read as get_val() reads them"""
+        low, high = _range_values(size, signed)
+        if not low <= lo <= hi <= high:
+            kind = "signed" if signed else "unsigned"
+            raise ValueError(f"Range {lo}..{hi} outside of {size} bit {kind} values")
+        if not n:
+            return self._array(size, 0, signed, 0)
+        # lanes have room for the carry of adding lo, which the mask drops again
+        packed, stride = self._between(n, hi - lo + 1, size + 1)
+        packed = (packed + _rep(lo & _mask(size), stride, n)) & _rep(_mask(size), stride, n)
+        return self._array(size, n, signed, packed, stride)
+
+    def _positions(self, size, n):
+        """n uniform bit positions 0..size-1"""
+        packed, stride = self._between(n, size)
+        return _unpack(packed, n, stride)
+
+    def onehot(self, size, n, signed=False):
+        """n values with exactly one set bit"""
+        values = map(lshift, repeat(1, n), self._positions(size, n))
+        return self._array(size, n, signed, _pack(values, _stride(size)))
+
+    def popcount(self, size, n, k, signed=False):
+        """n values with exactly k set bits"""
+        if not 0 <= k <= size:
+            raise ValueError(f"Cannot set {k} bits of {size}")
+        if k == 1:
+            return self.onehot(size, n, signed)
+        if comb(size, k) <= _TABLE_MAX:
+            table = _popcount_table(size, k)
+            packed, stride = self._between(n, len(table))
+            values = map(table.__getitem__, _unpack(packed, n, stride))
+            return self._array(size, n, signed, _pack(values, _stride(size)))
+        # set the smaller of the k bits and the size - k clear bits
+        flip = k > size // 2
+        picks = size - k if flip else k
+        sample = self.rng.sample
+        positions = range(size)
+        values = [sum(map(lshift, repeat(1, picks), sample(positions, picks))) for _ in range(n)]
+        packed = _pack(values, _stride(size))
+        if flip:
+            packed ^= _rep(_mask(size), _stride(size), n)
+        return self._array(size, n, signed, packed)
+
+    def choice(self, size, n, values, weights=None, signed=False):
+        """n picks from values (ints or BitVecs), with optional relative weights"""
+        mask = _mask(size)
+        values = [(v if isinstance(v, int) else v.val) & mask for v in values]
+        picked = self.rng.choices(values, weights, k=n)
+        return self._array(size, n, signed, _pack(picked, _stride(size)))
+
+    def dist(self, size, n, ranges, signed=False):
+        """
+        n values from weighted (lo, hi, weight) ranges: a range is picked by
+        weight, then a value uniform in it. SystemVerilog's x dist {lo:hi :/ w}
+        """
+        buckets = self.rng.choices(range(len(ranges)), [w for _, _, w in ranges], k=n)
+        counts = [0] * len(ranges)
+        for b in buckets:
+            counts[b] += 1
+        drawn = [
+            iter(self.between(size, c, lo, hi, signed).get_val()) if c else None
+            for (lo, hi, _), c in zip(ranges, counts)
+        ]
+        mask = _mask(size)
+        values = [next(drawn[b]) & mask for b in buckets]
+        return self._array(size, n, signed, _pack(values, _stride(size)))
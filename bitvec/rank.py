@@ -0,0 +1,132 @@
+"""
+Provides RankIndex: succinct rank/select support for wide BitVec values
+
+Space, for a vector of n bits:
+ - the value as 64 bit words:                   n/8 bytes
+ - one 64 bit count per 65536 bit superblock:   n/8192 bytes (0.1%)
+ - one 16 bit count per 512 bit block:          n/256 bytes (3.1%)
+so about 3.2% on top of a word copy of the value.
+
+rank1 is two table reads plus at most 8 word popcounts. select1 binary
+searches the superblock then the block table and scans at most 8 words.
+"""
+
+import sys
+from array import array
+from bisect import bisect_right
+
+WORD = 64
+BLOCK = 512
+SUPERBLOCK = 65536
+_WORDS_PER_BLOCK = BLOCK // WORD
+_BLOCKS_PER_SUPER = SUPERBLOCK // BLOCK
+
+
+def _select_in_word(word, k):
+    """Index of the k-th (0 based) set bit of a 64 bit word"""
+    for _ in range(k):
+        word &= word - 1
+    return (word & -word).bit_length() - 1
+
+
+class RankIndex:
+    """
+    Rank/select tables over a snapshot of a BitVec value.
+    Normally used through BitVec.rank1/select1/rank0/select0, which build the
+    index on first use and rebuild it only after the value has changed.
+    """
+
+    size: int
+    val: int
+    ones: int
+    words: array
+    super_rank: array
+    block_rank: array
+
+    def __init__(self, size, val):
+        self.size = size
+        self.val = val
+        nwords = max(1, -(-size // WORD))
+        words = array("Q", val.to_bytes(nwords * 8, "little"))
+        if sys.byteorder != "little":
+            words.byteswap()
+        self.words = words
+
+        nblocks = -(-nwords // _WORDS_PER_BLOCK)
+        super_rank = array("Q", [0] * -(-nblocks // _BLOCKS_PER_SUPER))
+        block_rank = array("H", [0] * nblocks)
+        total = 0
+        for b in range(nblocks):
+            if b % _BLOCKS_PER_SUPER == 0:
+                super_rank[b // _BLOCKS_PER_SUPER] = total
+            block_rank[b] = total - super_rank[b // _BLOCKS_PER_SUPER]
+            for w in words[b * _WORDS_PER_BLOCK : (b + 1) * _WORDS_PER_BLOCK]:
+                total += w.bit_count()
+        self.ones = total
+        self.super_rank = super_rank
+        self.block_rank = block_rank
+
+    def nbytes(self):
+        """Bytes held by the index, including the word copy of the value"""
+        return sum(t.itemsize * len(t) for t in (self.words, self.super_rank, self.block_rank))
+
+    def rank1(self, i):
+        """Number of set bits below index i"""
+        if i <= 0:
+            return 0
+        if i >= self.size:
+            return self.ones
+        b = i // BLOCK
+        w = i // WORD
+        words = self.words
+        count = self.super_rank[i // SUPERBLOCK] + self.block_rank[b]
+        for j in range(b * _WORDS_PER_BLOCK, w):
+            count += words[j].bit_count()
+        return count + (words[w] & ((1 << (i % WORD)) - 1)).bit_count()
+
+    def rank0(self, i):
+        """Number of reset bits below index i"""
+        i = max(0, min(i, self.size))
+        return i - self.rank1(i)
+
+    def select1(self, k):
+        """Index of the k-th (0 based) set bit"""
+        if not 0 <= k < self.ones:
+            raise IndexError(f"select1({k}) out of range; {self.ones} bits set")
+        s = bisect_right(self.super_rank, k) - 1
+        k -= self.super_rank[s]
+        lo = s * _BLOCKS_PER_SUPER
+        hi = min(lo + _BLOCKS_PER_SUPER, len(self.block_rank))
+        b = bisect_right(self.block_rank, k, lo, hi) - 1
+        k -= self.block_rank[b]
+        for w in range(b * _WORDS_PER_BLOCK, (b + 1) * _WORDS_PER_BLOCK):
+            count = self.words[w].bit_count()
+            if k < count:
+                return w * WORD + _select_in_word(self.words[w], k)
+            k -= count
+        raise AssertionError("rank tables out of sync with the value")
+
+    def select0(self, k):
+        """Index of the k-th (0 based) reset bit"""
+        zeros = self.size - self.ones
+        if not 0 <= k < zeros:
+            raise IndexError(f"select0({k}) out of range; {zeros} bits reset")
+        # binary search over rank0, then finish inside the block
+        lo, hi = 0, len(self.block_rank) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if mid * BLOCK - self._block_ones(mid) <= k:
+                lo = mid
+            else:
+                hi = mid - 1
+        k -= lo * BLOCK - self._block_ones(lo)
+        for w in range(lo * _WORDS_PER_BLOCK, (lo + 1) * _WORDS_PER_BLOCK):
+            inv = ~self.words[w] & ((1 << WORD) - 1)
+            count = inv.bit_count()
+            if k < count:
+                return w * WORD + _select_in_word(inv, k)
+            k -= count
+        raise AssertionError("rank tables out of sync with the value")
+
+    def _block_ones(self, b):
+        return self.super_rank[b // _BLOCKS_PER_SUPER] + self.block_rank[b]
@@ -0,0 +1,218 @@
+"""
+Provides fixed width record files of BitVec values
+
+A record file is a 24 byte header followed by `count` records of
+ceil(size/8) bytes each, little endian:
+
+    offset  0: magic b"BITVEC" and format version (2 bytes)
+    offset  8: size in bits (uint32)
+    offset 12: flags (uint32), bit 0 set for signed vectors
+    offset 16: count (uint64)
+
+Record i sits at a fixed offset, so RecordFile reads it straight from the
+mapped file with no parsing; batches are read as one int.from_bytes.
+
+from bitvec.records import RecordFile, RecordWriter
+
+with RecordWriter("frames.bv", 64) as w:     #appends if the file exists
+    w.write(bv(64, 0x2d1434351b4da2f9))
+    w.write_all(frames)                      #BitVecArray, BitVecs or ints
+
+with RecordFile("frames.bv") as f:
+    f[0]                                     #==> bv(64, 0x2d1434351b4da2f9)
+    f[10:20]                                 #BitVecArray of records 10..19
+    for batch in f.chunks(65536):            #BitVecArray batches
+        ...
+"""
+
+import mmap
+import os
+import struct
+
+from . import BitVec
+from .batch import BitVecArray, _mask, _rep, _restride
+
+MAGIC = b"BITVEC\x00\x01"
+_HEADER = struct.Struct("<8sIIQ")
+HEADER_SIZE = _HEADER.size
+_COUNT_OFFSET = 16
+_SIGNED = 1
+
+
+def _record_bytes(size):
+    return max(1, -(-size // 8))
+
+
+def _read_header(fh, path):
+    raw = fh.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{path}: too short for a record file header")
+    magic, size, flags, count = _HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a record file (magic {magic!r})")
+    return size, bool(flags & _SIGNED), count
+
+
+class RecordFile:
+    """
+    Read-only, memory mapped record file.
+    f[i] is record i as a BitVec (negative i counts from the end), f[i:j]
+    a BitVecArray; chunks() and iteration walk the file without loading it.
+    Records appended after opening are not seen; open the file again.
+    """
+
+    size: int
+    is_signed: bool
+    count: int
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as fh:
+            self.size, self.is_signed, count = _read_header(fh, path)
+            self._nbytes = _record_bytes(self.size)
+            # records past the header count are an unfinished write
+            length = os.fstat(fh.fileno()).st_size
+            self.count = min(count, (length - HEADER_SIZE) // self._nbytes)
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __repr__(self):
+        sign = ", signed" if self.is_signed else ""
+        return f"RecordFile({self.path!r}, {self.count} x {self.size} bits{sign})"
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def value(self, i):
+        """Record i as a non-negative integer"""
+        if not -self.count <= i < self.count:
+            raise IndexError(f"Record {i} out of range; count is {self.count}")
+        off = HEADER_SIZE + (i % self.count) * self._nbytes
+        return int.from_bytes(self._mm[off : off + self._nbytes], "little") & _mask(self.size)
+
+    def array(self, start=0, stop=None):
+        """Records start..stop-1 as a BitVecArray"""
+        start, stop, _ = slice(start, stop).indices(self.count)
+        count = max(0, stop - start)
+        nb = self._nbytes
+        raw = self._mm[HEADER_SIZE + start * nb : HEADER_SIZE + stop * nb] if count else b""
+        packed = int.from_bytes(raw, "little") & _rep(_mask(self.size), nb * 8, count)
+        return BitVecArray._new(self.size, count, self.is_signed, packed, nb * 8)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                start, stop, step = index.indices(self.count)
+                return BitVecArray(
+                    self.size, [self.value(i) for i in range(start, stop, step)], self.is_signed
+                )
+            return self.array(index.start, index.stop)
+        return BitVec(self.size, self.value(index), self.is_signed)
+
+    def chunks(self, n=65536, start=0, stop=None):
+        """Yield the records as BitVecArray batches of up to n records"""
+        start, stop, _ = slice(start, stop).indices(self.count)
+        for i in range(start, stop, n):
+            yield self.array(i, min(i + n, stop))
+
+    def __iter__(self):
+        for batch in self.chunks():
+            yield from batch
+
+
+class RecordWriter:
+    """
+    Append-mode writer for record files of `size` bit vectors.
+    A new file is created with its header; an existing one must have the
+    same size and signedness and is appended to. Records are buffered and
+    written `buffer` bytes at a time; flush() and close() write the rest
+    and update the count in the header.
+    """
+
+    size: int
+    is_signed: bool
+    count: int
+
+    def __init__(self, path, size, signed=False, buffer=1 << 20):
+        if size < 1:
+            raise ValueError("Record size must be at least 1 bit")
+        self.path = path
+        self.size = size
+        self.is_signed = signed
+        self._nbytes = _record_bytes(size)
+        self._limit = buffer
+        self._buf = bytearray()
+        if os.path.exists(path) and os.path.getsize(path):
+            self._fh = open(path, "r+b")
+            fsize, fsigned, count = _read_header(self._fh, path)
+            if (fsize, fsigned) != (size, signed):
+                self._fh.close()
+                raise ValueError(
+                    f"{path}: holds {fsize} bit {'signed' if fsigned else 'unsigned'} records"
+                )
+            # drop any partial records left by an unfinished write
+            self._fh.truncate(HEADER_SIZE + count * self._nbytes)
+        else:
+            self._fh = open(path, "w+b")
+            count = 0
+            self._fh.write(_HEADER.pack(MAGIC, size, _SIGNED if signed else 0, 0))
+        self._fh.seek(HEADER_SIZE + count * self._nbytes)
+        self.count = count
+
+    def __repr__(self):
+        return f"RecordWriter({self.path!r}, {self.size}, count={self.count})"
+
+    def write(self, value):
+        """Append one BitVec or int"""
+        v = value.val if isinstance(value, BitVec) else value
+        self._buf += (v & _mask(self.size)).to_bytes(self._nbytes, "little")
+        self.count += 1
+        if len(self._buf) >= self._limit:
+            self._write_buffer()
+
+    def write_all(self, values):
+        """Append a BitVecArray (as one block) or an iterable of BitVecs/ints"""
+        if isinstance(values, BitVecArray):
+            if values.size > self.size:
+                values = values[self.size - 1 : 0]
+            nb = self._nbytes
+            packed = _restride(values.packed, values.count, values.stride, nb * 8)
+            self._buf += packed.to_bytes(nb * values.count, "little")
+            self.count += values.count
+            if len(self._buf) >= self._limit:
+                self._write_buffer()
+            return
+        for v in values:
+            self.write(v)
+
+    def _write_buffer(self):
+        self._fh.write(self._buf)
+        self._buf.clear()
+
+    def flush(self):
+        """Write buffered records and the record count to the file"""
+        self._write_buffer()
+        end = self._fh.tell()
+        self._fh.seek(_COUNT_OFFSET)
+        self._fh.write(struct.pack("<Q", self.count))
+        self._fh.seek(end)
+        self._fh.flush()
+
+    def close(self):
+        if not self._fh.closed:
+            self.flush()
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
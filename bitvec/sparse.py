@@ -0,0 +1,322 @@
+"""
+Provides SparseBitVec: a compressed bit vector for wide, sparse vectors
+
+The vector is cut into 65536 bit chunks and only the chunks with set bits
+are kept, each in the smallest of three containers (as in Roaring bitmaps):
+
+    array:  sorted 16 bit positions of the set bits,    2 bytes per set bit
+    bitmap: the 65536 bits as an int,                   8192 bytes
+    runs:   (start, length - 1) of every run of ones,   4 bytes per run
+
+The choice only depends on the set bits, so equal vectors have the same
+containers. &, |, ^ and andnot work chunk by chunk on the containers;
+popcount adds up the cardinality kept with every container.
+
+from bitvec import BitVec as bv
+from bitvec.sparse import SparseBitVec
+
+a = SparseBitVec(10_000_000, [5, 70000, 9_999_999])
+b = SparseBitVec.from_bitvec(bv(10_000_000, (1 << 1000) - 1))  #one run
+(a | b).popcount()                                             #==> 1002
+a.get_all_set_bits()                                           #==> [5, 70000, 9999999]
+a.to_bitvec()                                                  #dense BitVec again
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+from . import BitVec, _iter_set_bits
+
+CHUNK_BITS = 16
+CHUNK = 1 << CHUNK_BITS
+# containers are (kind, data, cardinality)
+ARRAY, BITMAP, RUNS = "array", "bitmap", "runs"
+ARRAY_MAX = 4096
+_BITMAP_BYTES = CHUNK // 8
+
+
+def _container_bytes(kind, data):
+    if kind == ARRAY:
+        return 2 * len(data)
+    if kind == RUNS:
+        return 4 * len(data[0])
+    return _BITMAP_BYTES
+
+
+def _set_bits(x, count):
+    """Set bit positions of a chunk x with `count` set bits"""
+    if count > 8:
+        return _iter_set_bits(x)
+    # a few bits: peeling them off beats walking all 1024 words
+    out = []
+    while x:
+        low = x & -x
+        out.append(low.bit_length() - 1)
+        x ^= low
+    return out
+
+
+def _from_int(x):
+    """Smallest container holding the set bits of a chunk x; None if x is 0"""
+    card = x.bit_count()
+    if not card:
+        return None
+    starts = x & ~(x << 1)
+    nruns = starts.bit_count()
+    if 4 * nruns < min(2 * card, _BITMAP_BYTES):
+        ends = x & ~(x >> 1)
+        first = array("H", _set_bits(starts, nruns))
+        lengths = array("H", (e - s for s, e in zip(first, _set_bits(ends, nruns))))
+        return (RUNS, (first, lengths), card)
+    if card <= ARRAY_MAX:
+        return (ARRAY, array("H", _set_bits(x, card)), card)
+    return (BITMAP, x, card)
+
+
+def _from_sorted(positions):
+    """Smallest container for sorted, distinct chunk positions; None if empty"""
+    card = len(positions)
+    if not card:
+        return None
+    nruns = 1 + sum(1 for p, q in zip(positions, positions[1:]) if q != p + 1)
+    if 4 * nruns < min(2 * card, _BITMAP_BYTES) or card > ARRAY_MAX:
+        return _from_int(_array_int(positions))
+    return (ARRAY, array("H", positions), card)
+
+
+def _array_int(positions):
+    buf = bytearray(_BITMAP_BYTES)
+    for p in positions:
+        buf[p >> 3] |= 1 << (p & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _as_int(container):
+    kind, data, _ = container
+    if kind == BITMAP:
+        return data
+    if kind == ARRAY:
+        return _array_int(data)
+    x = 0
+    for start, length in zip(*data):
+        x |= ((2 << length) - 1) << start
+    return x
+
+
+def _positions(container):
+    kind, data, _ = container
+    if kind == ARRAY:
+        return data
+    if kind == BITMAP:
+        return _iter_set_bits(data)
+    return (p for start, length in zip(*data) for p in range(start, start + length + 1))
+
+
+def _test(container, low):
+    kind, data, _ = container
+    if kind == ARRAY:
+        i = bisect_left(data, low)
+        return i < len(data) and data[i] == low
+    if kind == BITMAP:
+        return (data >> low) & 1 == 1
+    starts, lengths = data
+    i = bisect_right(starts, low) - 1
+    return i >= 0 and low <= starts[i] + lengths[i]
+
+
+def _combine(a, b, op):
+    """Container of a op b for two containers of the same chunk"""
+    if op in ("and", "or") and CHUNK in (a[2], b[2]):
+        # a chunk of all ones, as found inside long runs
+        full, other = (a, b) if a[2] == CHUNK else (b, a)
+        return other if op == "and" else full
+    if a[0] == ARRAY and b[0] == ARRAY:
+        x, y = set(a[1]), set(b[1])
+        if op == "and":
+            res = x & y
+        elif op == "or":
+            res = x | y
+        elif op == "xor":
+            res = x ^ y
+        else:
+            res = x - y
+        return _from_sorted(sorted(res))
+    if op == "and" and {a[0], b[0]} == {ARRAY, RUNS}:
+        arr, runs = (a, b) if a[0] == ARRAY else (b, a)
+        return _from_sorted([p for p in arr[1] if _test(runs, p)])
+    x, y = _as_int(a), _as_int(b)
+    if op == "and":
+        return _from_int(x & y)
+    if op == "or":
+        return _from_int(x | y)
+    if op == "xor":
+        return _from_int(x ^ y)
+    return _from_int(x & ~y)
+
+
+class SparseBitVec:
+    """
+    Compressed `size` bit vector, see the module docstring.
+    Build it from set bit positions or with from_bitvec; to_bitvec gives the
+    dense BitVec back. v[i] reads a bit and v[i] = 0/1 writes one.
+    BitVec operands of &, |, ^ and andnot are converted first; the result
+    size is the larger size, as for BitVec.
+    """
+
+    size: int
+
+    def __init__(self, size, positions=()):
+        self.size = size
+        self._chunks = {}
+        by_chunk = {}
+        for p in positions:
+            if not 0 <= p < size:
+                raise IndexError(f"Bit {p} out of range; size of the vector is {size}")
+            by_chunk.setdefault(p >> CHUNK_BITS, set()).add(p & (CHUNK - 1))
+        for key in sorted(by_chunk):
+            self._chunks[key] = _from_sorted(sorted(by_chunk[key]))
+
+    @classmethod
+    def _new(cls, size, chunks):
+        vec = cls.__new__(cls)
+        vec.size = size
+        vec._chunks = chunks
+        return vec
+
+    @classmethod
+    def from_bitvec(cls, vec):
+        """Compress a BitVec (or a non-negative int, sized by its bit length)"""
+        if isinstance(vec, BitVec):
+            size, val = vec.size, vec.val
+        else:
+            size, val = max(vec.bit_length(), 1), vec
+        raw = val.to_bytes(-(-size // 8), "little")
+        chunks = {}
+        for key, off in enumerate(range(0, len(raw), _BITMAP_BYTES)):
+            x = int.from_bytes(raw[off : off + _BITMAP_BYTES], "little")
+            if x:
+                chunks[key] = _from_int(x)
+        return cls._new(size, chunks)
+
+    def to_bitvec(self):
+        """Dense BitVec of the same size"""
+        buf = bytearray(-(-self.size // 8))
+        for key, container in self._chunks.items():
+            off = key * _BITMAP_BYTES
+            chunk = _as_int(container).to_bytes(_BITMAP_BYTES, "little")
+            buf[off : off + _BITMAP_BYTES] = chunk[: len(buf) - off]
+        return BitVec(self.size, int.from_bytes(buf, "little"))
+
+    def __repr__(self):
+        return (
+            f"SparseBitVec({self.size}, {self.popcount()} set bits in "
+            f"{len(self._chunks)} containers, {self.nbytes()} bytes)"
+        )
+
+    def containers(self):
+        """(chunk index, kind, cardinality) of every stored chunk, in order"""
+        return [(key, c[0], c[2]) for key, c in sorted(self._chunks.items())]
+
+    def nbytes(self):
+        """Bytes of container data, as counted when choosing containers"""
+        return sum(_container_bytes(kind, data) for kind, data, _ in self._chunks.values())
+
+    def popcount(self):
+        """Number of set bits"""
+        return sum(c[2] for c in self._chunks.values())
+
+    def iter_set_bits(self):
+        """Yield the indices of the set bits in increasing order"""
+        for key in sorted(self._chunks):
+            base = key << CHUNK_BITS
+            for p in _positions(self._chunks[key]):
+                yield base + p
+
+    def get_all_set_bits(self):
+        """Returns list of indices of set bits"""
+        return list(self.iter_set_bits())
+
+    def _index(self, index):
+        if not isinstance(index, int):
+            raise IndexError(f"Index of type {type(index)} not expected")
+        if index >= self.size or index < -self.size:
+            raise IndexError(f"Index {index} out of range; size of the vector is {self.size}")
+        return index % self.size
+
+    def __getitem__(self, index):
+        index = self._index(index)
+        container = self._chunks.get(index >> CHUNK_BITS)
+        bit = container is not None and _test(container, index & (CHUNK - 1))
+        return BitVec(1, int(bit))
+
+    def __setitem__(self, index, val):
+        index = self._index(index)
+        bit = (val.val if isinstance(val, BitVec) else val) & 1
+        key, low = index >> CHUNK_BITS, index & (CHUNK - 1)
+        container = self._chunks.get(key)
+        if container is None:
+            if bit:
+                self._chunks[key] = (ARRAY, array("H", [low]), 1)
+            return
+        if _test(container, low) == bool(bit):
+            return
+        if container[0] == ARRAY:
+            positions = list(container[1])
+            if bit:
+                positions.insert(bisect_left(positions, low), low)
+            else:
+                positions.remove(low)
+            new = _from_sorted(positions)
+        else:
+            new = _from_int(_as_int(container) ^ (1 << low))
+        if new is None:
+            del self._chunks[key]
+        else:
+            self._chunks[key] = new
+
+    def __eq__(self, other):
+        if not isinstance(other, SparseBitVec):
+            return NotImplemented
+        return self.size == other.size and self._chunks == other._chunks
+
+    def _binary(self, other, op):
+        if isinstance(other, (BitVec, int)):
+            other = SparseBitVec.from_bitvec(other)
+        elif not isinstance(other, SparseBitVec):
+            raise TypeError(f"Expected SparseBitVec, BitVec or int; got {type(other)}")
+        a, b = self._chunks, other._chunks
+        if op == "and":
+            keys = a.keys() & b.keys()
+        elif op == "andnot":
+            keys = a.keys()
+        else:
+            keys = a.keys() | b.keys()
+        chunks = {}
+        for key in sorted(keys):
+            ca, cb = a.get(key), b.get(key)
+            if cb is None:
+                c = ca
+            elif ca is None:
+                c = cb
+            else:
+                c = _combine(ca, cb, op)
+            if c is not None:
+                chunks[key] = c
+        return SparseBitVec._new(max(self.size, other.size), chunks)
+
+    def __and__(self, other):
+        return self._binary(other, "and")
+
+    def __or__(self, other):
+        return self._binary(other, "or")
+
+    def __xor__(self, other):
+        return self._binary(other, "xor")
+
+    def andnot(self, other):
+        """Bits set in self and not in other, self & ~other"""
+        return self._binary(other, "andnot")
+
+    __rand__ = __and__
+    __ror__ = __or__
+    __rxor__ = __xor__
@@ -0,0 +1,101 @@
+"""
+Reading and writing batches of BitVec values on asyncio streams
+
+Values travel as fixed width little endian records of ceil(size/8) bytes,
+the layout of bitvec.records. read_arrays() reads whatever the stream has
+buffered, up to `count` records at a time, and turns every read into one
+BitVecArray with a single int.from_bytes, so there is no per-record work
+in the event loop.
+
+from bitvec.stream import StreamStats, read_arrays, write_array
+
+stats = StreamStats()
+async for batch in read_arrays(reader, 64, count=4096, stats=stats):
+    ...                                  #BitVecArray of up to 4096 records
+stats.rate                               #records per second since the first read
+
+await write_array(writer, frames)        #BitVecArray, waits for the transport to drain
+"""
+
+import asyncio
+from time import perf_counter
+
+from .batch import BitVecArray, _mask, _rep, _restride
+from .records import _record_bytes
+
+
+class StreamStats:
+    """
+    Counters of one or more streams: records and batches read, records per
+    second and the depth of the queue results are published on (see observe)
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.batches = 0
+        self.start = None
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    def __repr__(self):
+        return (
+            f"StreamStats({self.records} records in {self.batches} batches, "
+            f"{self.rate:.0f}/s, queue {self.queue_depth} (max {self.max_queue_depth}))"
+        )
+
+    def add(self, records):
+        if self.start is None:
+            self.start = perf_counter()
+        self.records += records
+        self.batches += 1
+
+    def observe(self, queue):
+        """Record the current size of an asyncio.Queue"""
+        self.queue_depth = queue.qsize()
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    @property
+    def rate(self):
+        """Records per second since the first batch"""
+        if self.start is None:
+            return 0.0
+        elapsed = perf_counter() - self.start
+        return self.records / elapsed if elapsed > 0 else 0.0
+
+
+async def read_arrays(reader, size, count=4096, signed=False, stats=None):
+    """
+    Yield the records of an asyncio.StreamReader as BitVecArrays of up to
+    `count` elements until EOF. A partial record at EOF raises
+    asyncio.IncompleteReadError.
+    """
+    nb = _record_bytes(size)
+    limit = nb * count
+    odd = size % 8 != 0
+    buf = bytearray()
+    while True:
+        data = await reader.read(limit)
+        if not data:
+            break
+        buf += data
+        usable = len(buf) - len(buf) % nb
+        for off in range(0, usable, limit):
+            end = min(off + limit, usable)
+            n = (end - off) // nb
+            packed = int.from_bytes(buf[off:end], "little")
+            if odd:
+                packed &= _rep(_mask(size), nb * 8, n)
+            if stats is not None:
+                stats.add(n)
+            yield BitVecArray._new(size, n, signed, packed, nb * 8)
+        del buf[:usable]
+    if buf:
+        raise asyncio.IncompleteReadError(bytes(buf), nb)
+
+
+async def write_array(writer, arr):
+    """Write a BitVecArray as records to an asyncio.StreamWriter and drain it"""
+    nb = _record_bytes(arr.size)
+    packed = _restride(arr.packed, arr.count, arr.stride, nb * 8)
+    writer.write(packed.to_bytes(nb * arr.count, "little"))
+    await writer.drain()
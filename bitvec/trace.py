@@ -0,0 +1,467 @@
+"""
+Tracing compiler for BitVec functions
+
+@compile runs a function once with symbolic values in place of the `val` of
+its BitVec arguments. The BitVec operators do their usual width and sign
+bookkeeping and only the integer work on `val` is recorded. The recorded
+graph is simplified (constant folding, redundant mask removal, common
+subexpressions) and emitted as one straight-line Python function on ints,
+which is cached per argument signature: the type, size and signedness of
+every BitVec argument and the value of every other argument. Arguments and
+results keep their types (BitVec, SBitVec, InPlaceBitVec, FrozenBitVec and
+bv[n]); words backend vectors and views cannot be traced as arguments.
+
+import bitvec
+from bitvec import BitVec as bv
+
+@bitvec.compile
+def mix(a, b):
+    return (a[7:0] @ b[7:0]) ^ (a >> 3)
+
+mix(bv(16, 0x1234), bv(16, 0xabcd))    #traced on first call, then cached
+mix.source(bv(16), bv(16))             #generated code
+
+The traced function must be straight-line dataflow: branching on a traced
+value (if, while, and/or on a comparison), operators whose result width
+depends on the value (*, ** on BitVec, / and %) and reversed part-selects
+raise TracingError. Arguments must not be modified, and other globals
+that the function reads are compiled in as constants.
+
+With debug=True every call also runs the original function and raises
+TracingError when the two results differ (also under python -O).
+"""
+
+import functools
+import operator
+
+from . import BitVec, BitVecView, FrozenBitVec, InPlaceBitVec, WordBitVec, fixed
+
+# inline expressions nested deeper than this are stored in a local first
+_MAX_DEPTH = 32
+
+_BINARY = {
+    "&": operator.and_,
+    "|": operator.or_,
+    "^": operator.xor,
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "<<": operator.lshift,
+    ">>": operator.rshift,
+    "//": operator.floordiv,
+    "%": operator.mod,
+    "**": operator.pow,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_COMMUTATIVE = {"&", "|", "^", "+", "*", "==", "!="}
+_UNARY = {"~": "(~{})", "neg": "(-{})", "abs": "abs({})", "bit_count": "{}.bit_count()"}
+
+# graph of the function being traced, see _Trace
+_active = None
+
+
+class TracingError(TypeError):
+    """Raised when a function cannot be turned into straight-line code"""
+
+
+class _Trace:
+    """Interning table of the symbolic values created by one trace"""
+
+    def __init__(self):
+        self.table = {}
+        self.inputs = []
+
+
+def _cbits(c):
+    """Bit length of a constant, None when negative"""
+    return c.bit_length() if c >= 0 else None
+
+
+def _bits(op, a, b):
+    """Upper bound on the bit length of the result, None if it may be negative"""
+    ab = a.bits if isinstance(a, Sym) else _cbits(a)
+    bb = None if b is None else b.bits if isinstance(b, Sym) else _cbits(b)
+    if op == "&":
+        known = [x for x in (ab, bb) if x is not None]
+        return min(known) if known else None
+    if ab is None or (bb is None and b is not None):
+        return None
+    if op in ("|", "^"):
+        return max(ab, bb)
+    if op == "+":
+        return max(ab, bb) + 1
+    if op == "*":
+        return ab + bb
+    if op == "<<":
+        return ab + b if isinstance(b, int) else None
+    if op == ">>":
+        return max(ab - b, 0) if isinstance(b, int) else ab
+    if op == "//":
+        return ab
+    if op == "%":
+        return bb
+    if op in ("==", "!=", "<", "<=", ">", ">="):
+        return 1
+    if op == "bit_count":
+        return ab.bit_length()
+    return None
+
+
+def _simplify(op, a, b):
+    """Peephole rules; returns the simplified value or None"""
+    if isinstance(b, int):
+        if b == 0 and op in ("|", "^", "+", "-", "<<", ">>"):
+            return a
+        if op == "&":
+            if b == 0:
+                return 0
+            if a.bits is not None and b & ((1 << a.bits) - 1) == (1 << a.bits) - 1:
+                return a
+            if a.op == "&" and isinstance(a.args[1], int):
+                return _node("&", a.args[0], a.args[1] & b)
+        if op in ("<<", ">>") and a.op == op and isinstance(a.args[1], int):
+            return _node(op, a.args[0], a.args[1] + b)
+        if op == ">>" and a.bits is not None and b >= a.bits:
+            return 0
+        if op == "+" and a.op == "+" and isinstance(a.args[1], int):
+            return _node("+", a.args[0], a.args[1] + b)
+        if op == "+" and b == 1 and a.op == "+":
+            # x + ~y + 1, the subtraction of the BitVec operators
+            y = a.args[1]
+            if isinstance(y, Sym) and y.op == "~":
+                return _node("-", a.args[0], y.args[0])
+    elif b is a and op in ("&", "|"):
+        return a
+    elif b is a and op == "^":
+        return 0
+    return None
+
+
+def _node(op, a, b=None):
+    """Create (or reuse) the symbolic value of `op` applied to a and b"""
+    if _active is None:
+        raise TracingError("traced value used outside of @compile tracing")
+    if type(a) is bool:
+        a = int(a)
+    if type(b) is bool:
+        b = int(b)
+    if b is not None and isinstance(a, int):
+        if isinstance(b, int):
+            return _BINARY[op](a, b)
+        if op in _COMMUTATIVE:
+            a, b = b, a
+    if b is not None and isinstance(a, Sym):
+        simple = _simplify(op, a, b)
+        if simple is not None:
+            return simple
+    key = (op, id(a) if isinstance(a, Sym) else (a,), id(b) if isinstance(b, Sym) else (b,))
+    sym = _active.table.get(key)
+    if sym is None:
+        sym = Sym(op, (a,) if b is None else (a, b), _bits(op, a, b))
+        _active.table[key] = sym
+    return sym
+
+
+def _binary(op):
+    def method(self, other):
+        if isinstance(other, (int, Sym)):
+            return _node(op, self, other)
+        return NotImplemented
+
+    def reflected(self, other):
+        if isinstance(other, int):
+            return _node(op, other, self)
+        return NotImplemented
+
+    return method, reflected
+
+
+class Sym:
+    """
+    Symbolic integer standing for the `val` of a BitVec while tracing.
+    Integer operators record a node instead of computing a value.
+    """
+
+    __slots__ = ("op", "args", "bits")
+
+    op: str
+    args: tuple
+    bits: int
+
+    def __init__(self, op, args, bits):
+        self.op = op
+        self.args = args
+        self.bits = bits
+
+    def __repr__(self):
+        return f"Sym({self.op}, bits={self.bits})"
+
+    def __bool__(self):
+        raise TracingError(
+            "control flow depends on a traced value; only straight-line code can be compiled"
+        )
+
+    def __getattr__(self, name):
+        raise TracingError(f"{name!r} is not supported on traced values")
+
+    def bit_length(self):
+        raise TracingError("result width depends on a traced value")
+
+    def bit_count(self):
+        return _node("bit_count", self)
+
+    def __invert__(self):
+        return _node("~", self)
+
+    def __neg__(self):
+        return _node("neg", self)
+
+    def __abs__(self):
+        return _node("abs", self)
+
+    def __pos__(self):
+        return self
+
+    __and__, __rand__ = _binary("&")
+    __or__, __ror__ = _binary("|")
+    __xor__, __rxor__ = _binary("^")
+    __add__, __radd__ = _binary("+")
+    __sub__, __rsub__ = _binary("-")
+    __mul__, __rmul__ = _binary("*")
+    __lshift__, __rlshift__ = _binary("<<")
+    __rshift__, __rrshift__ = _binary(">>")
+    __floordiv__, __rfloordiv__ = _binary("//")
+    __mod__, __rmod__ = _binary("%")
+    __pow__, __rpow__ = _binary("**")
+    __eq__, _ = _binary("==")
+    __ne__, _ = _binary("!=")
+    __lt__, _ = _binary("<")
+    __le__, _ = _binary("<=")
+    __gt__, _ = _binary(">")
+    __ge__, _ = _binary(">=")
+    del _
+    __hash__ = None
+
+
+def _spec(arg):
+    """Cache key part of one argument"""
+    if isinstance(arg, BitVec):
+        return (type(arg), arg.size, arg.is_signed)
+    try:
+        hash(arg)
+    except TypeError:
+        raise TypeError(
+            f"arguments other than BitVec are compiled in as constants and must be hashable; got {type(arg)}"
+        ) from None
+    return (type(arg), arg)
+
+
+def _key(args, kwargs):
+    spec = tuple(_spec(a) for a in args)
+    if kwargs:
+        spec += tuple((k, _spec(v)) for k, v in sorted(kwargs.items()))
+    return spec
+
+
+class _Codegen:
+    """Emits the traced graph as the body of a Python function"""
+
+    def __init__(self):
+        self.lines = []
+        self.consts = []
+        self.exprs = {}
+        self.ntemps = 0
+
+    def const(self, value):
+        self.consts.append(value)
+        return f"_K[{len(self.consts) - 1}]"
+
+    def operand(self, value):
+        if isinstance(value, Sym):
+            return self.exprs[id(value)][0]
+        if isinstance(value, int) and type(value) is not bool:
+            return hex(value) if value >= 0 else f"(-{hex(-value)})"
+        return self.const(value)
+
+    def emit(self, roots):
+        """Generate code for every Sym reachable from roots"""
+        order, uses, seen = [], {}, set()
+        stack = [(r, False) for r in roots if isinstance(r, Sym)]
+        while stack:
+            sym, expanded = stack.pop()
+            if expanded:
+                order.append(sym)
+                continue
+            uses[id(sym)] = uses.get(id(sym), 0) + 1
+            if id(sym) in seen:
+                continue
+            seen.add(id(sym))
+            stack.append((sym, True))
+            stack.extend((a, False) for a in sym.args if isinstance(a, Sym))
+        for sym in order:
+            if sym.op == "in":
+                self.exprs[id(sym)] = (sym.args[0], 0)
+                continue
+            depth = 1 + max(
+                (self.exprs[id(a)][1] for a in sym.args if isinstance(a, Sym)), default=0
+            )
+            args = [self.operand(a) for a in sym.args]
+            if sym.op in _UNARY:
+                expr = _UNARY[sym.op].format(*args)
+            else:
+                expr = f"({args[0]} {sym.op} {args[1]})"
+            if uses[id(sym)] > 1 or depth > _MAX_DEPTH:
+                name = f"t{self.ntemps}"
+                self.ntemps += 1
+                self.lines.append(f"    {name} = {expr}")
+                expr, depth = name, 0
+            self.exprs[id(sym)] = (expr, depth)
+
+    def result(self, out):
+        """Expression rebuilding the traced return value"""
+        if isinstance(out, BitVec):
+            cls = type(out)
+            if cls in fixed._TYPES:
+                return f"{self.const(cls)}({self.operand(out.val)})"
+            if cls in (fixed.SBitVec, InPlaceBitVec, FrozenBitVec, WordBitVec):
+                return f"{self.const(cls)}({out.size}, {self.operand(out.val)}, {out.is_signed})"
+            return f"_BV({out.size}, {self.operand(out.val)}, {out.is_signed})"
+        if isinstance(out, Sym):
+            return self.operand(out)
+        if type(out) is tuple:
+            items = [self.result(v) for v in out]
+            return "(" + ", ".join(items) + ("," if len(items) == 1 else "") + ")"
+        if type(out) is list:
+            return "[" + ", ".join(self.result(v) for v in out) + "]"
+        if type(out) is dict:
+            return "{" + ", ".join(f"{self.const(k)}: {self.result(v)}" for k, v in out.items()) + "}"
+        return self.operand(out)
+
+
+def _leaves(out):
+    """Symbolic values in a returned structure"""
+    if isinstance(out, BitVec):
+        if isinstance(out.val, Sym):
+            yield out.val
+    elif isinstance(out, Sym):
+        yield out
+    elif type(out) in (tuple, list):
+        for v in out:
+            yield from _leaves(v)
+    elif type(out) is dict:
+        for v in out.values():
+            yield from _leaves(v)
+
+
+def _record(func, args, kwargs):
+    """
+    Run func once with symbolic values in place of the `val` of its BitVec
+    arguments; returns (the "in" Syms in argument order, the output)
+    """
+    global _active
+    trace = _Trace()
+
+    def symbolic(arg):
+        if not isinstance(arg, BitVec):
+            return arg
+        cls = type(arg)
+        if isinstance(arg, (WordBitVec, BitVecView)):
+            raise TracingError(f"{cls.__name__} arguments cannot be traced")
+        sym = Sym("in", (f"v{len(trace.inputs)}",), arg.size)
+        trace.inputs.append(sym)
+        # the constructors mask val, which the tracer folds away for a full mask
+        if cls in fixed._TYPES:
+            return cls(sym)
+        return cls(arg.size, sym, arg.is_signed)
+
+    outer, _active = _active, trace
+    try:
+        sargs = [symbolic(a) for a in args]
+        skwargs = {k: symbolic(v) for k, v in kwargs.items()}
+        out = func(*sargs, **skwargs)
+    finally:
+        _active = outer
+    for arg, sym in zip(
+        [a for a in sargs + list(skwargs.values()) if isinstance(a, BitVec)], trace.inputs
+    ):
+        if arg.val is not sym:
+            raise TracingError(f"{func.__name__} modifies its argument")
+    return trace.inputs, out
+
+
+def _name(func):
+    """Name of the generated function: that of func unless it is not an identifier (lambdas)"""
+    name = func.__name__
+    return name if name.isidentifier() else "_traced"
+
+
+def _trace(func, args, kwargs):
+    """Trace func for the signature of args; returns (source, namespace)"""
+    inputs, out = _record(func, args, kwargs)
+    refs = [f"args[{i}]" for i, a in enumerate(args) if isinstance(a, BitVec)]
+    refs += [f"kwargs[{k!r}]" for k, v in kwargs.items() if isinstance(v, BitVec)]
+    params = [f"    {sym.args[0]} = {ref}.val" for sym, ref in zip(inputs, refs)]
+    gen = _Codegen()
+    gen.emit(list(_leaves(out)))
+    ret = gen.result(out)
+    body = params + gen.lines + [f"    return {ret}"]
+    source = f"def {_name(func)}(args, kwargs):\n" + "\n".join(body) + "\n"
+    return source, {"_BV": BitVec, "_K": gen.consts}
+
+
+def _same(a, b):
+    if isinstance(a, BitVec) and isinstance(b, BitVec):
+        return type(a) is type(b) and (a.size, a.val, a.is_signed) == (b.size, b.val, b.is_signed)
+    if type(a) in (tuple, list) and type(a) is type(b):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if type(a) is dict and type(b) is dict:
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    return type(a) is type(b) and a == b
+
+
+def compile(func=None, *, debug=False):
+    """
+    Decorator compiling a BitVec function into straight-line integer code
+    Use as @compile or @compile(debug=True); see the module docstring
+    """
+    if func is None:
+        return functools.partial(compile, debug=debug)
+    cache = {}
+
+    def build(args, kwargs):
+        source, namespace = _trace(func, args, kwargs)
+        exec(source, namespace)
+        fn = namespace[_name(func)]
+        fn.source = source
+        return fn
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = _key(args, kwargs)
+        fn = cache.get(key)
+        if fn is None:
+            fn = cache[key] = build(args, kwargs)
+        out = fn(args, kwargs)
+        if debug:
+            expected = func(*args, **kwargs)
+            if not _same(out, expected):
+                raise TracingError(
+                    f"compiled {func.__name__} returned {out!r}, interpreted {expected!r}"
+                )
+        return out
+
+    def source(*args, **kwargs):
+        """Generated code for the signature of args"""
+        key = _key(args, kwargs)
+        if key not in cache:
+            cache[key] = build(args, kwargs)
+        return cache[key].source
+
+    wrapper.cache = cache
+    wrapper.source = source
+    return wrapper
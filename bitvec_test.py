@@ -61,3 +61,557 @@ print(a.get_val(), a.val)
 
 print((bv(8, -0xf, signed=True)/2).get_val())
 print(bv(8, 0b1101101).get_parity())
+
+# BitVecArray: element-wise results must match the scalar class
+import random
+from bitvec import BitVecArray as bva
+
+random.seed(0)
+for w1, w2, s1, s2 in [(16, 16, False, False), (64, 8, True, False), (100, 130, True, True)]:
+    xs = [bv(w1, random.getrandbits(w1), s1) for _ in range(5)]
+    ys = [bv(w2, random.getrandbits(w2), s2) for _ in range(5)]
+    a, b = bva(w1, xs, s1), bva(w2, ys, s2)
+    for op in ["__add__", "__sub__", "__and__", "__or__", "__xor__", "__iadd__", "__matmul__"]:
+        res = getattr(a, op)(b)
+        exp = [getattr(x, op)(y) for x, y in zip(xs, ys)]
+        assert [(r.size, r.get_val()) for r in res] == [(e.size, e.get_val()) for e in exp], op
+    for op in ["__eq__", "__lt__", "__ge__"]:
+        assert getattr(a, op)(b).get_val() == [int(getattr(x, op)(y)) for x, y in zip(xs, ys)], op
+    assert (a + 3).get_val() == [(x + 3).get_val() for x in xs]
+    assert (~a).get_val() == [(~x).get_val() for x in xs]
+    assert (a << 5).get_val() == [(x << 5).get_val() for x in xs]
+    assert a.clshift(3).get_val() == [x.clshift(3).get_val() for x in xs]
+    assert a[7:2].get_val() == [x[7:2].get_val() for x in xs]
+    assert a[2:7].get_val() == [x[2:7].get_val() for x in xs]
+    assert a.get_val() == [x.get_val() for x in xs]
+
+a = bva(8, [0xf8, 0x00, 0x0f])
+a[3:2] = 0b01
+print(f"BitVecArray set_item: a = {a}")
+assert a.get_val() == [0xf4, 0x04, 0x07]
+assert bva.C(a[3:0], bv(4, 0xa)).get_val() == [0x4a, 0x4a, 0x7a]
+assert a[-1].get_val() == [v[7].val for v in a] and a[-8].get_val() == a[0].get_val()
+for vec in (bv(8, 5), bv(8, 5, backend="words")):
+    assert vec[-8] == vec[0]
+    try:
+        vec[-9]
+        assert False, "index below -size must raise"
+    except ValueError:
+        pass
+# value-dependent widths: the batch takes the widest element result
+prod = bva(8, [1, 200]) * 3
+assert prod.size == 10 and prod.at(0) == 3 and prod.at(0)[1:0] == bv(8, 1) * 3
+try:
+    bva.C(bv(4, 1), 3)
+    assert False, "concat without an array must raise"
+except TypeError:
+    pass
+
+# Interned bits: single bits and reductions are shared immutable vectors
+a = bv(12, 0b101101110001)
+assert not hasattr(a, "__dict__")
+assert a[0] is a[4] and a[0] is bv.R() | a
+try:
+    a[0][0] = 0
+    assert False, "interned bits must be immutable"
+except TypeError:
+    pass
+# part-selects are fresh mutable vectors, also the narrow ones
+b = a[7:4]
+b[0] = 0
+bv.assign(b, b | 0b1000)
+b += 0
+print(f"modified a[7:4] = {b}; a[7:4] = {a[7:4]}")
+assert a[7:4] == 0b0111 and b == 0b1110 and a[7:4] is not a[7:4]
+w = bv(100, 0xF, backend="words")[3:0]
+w[3] = 0
+assert w == 0b0111
+
+# Reductions
+R = bv.R()
+assert R & bv(4, 0xf) == 1 and R & bv(4, 0xe) == 0
+assert R | bv(4, 0x0) == 0 and R.nor(bv(4, 0x0)) == 1
+assert R ^ bv(8, 0b1101101) == 1 and R.xnor(bv(8, 0b1101101)) == 0
+assert R.nand(bv(3, 0b111)) == 0
+assert bv(12, 0xabc).popcount() == 7
+print(f"R^[...] = {R ^ [bv(4, 0b1101), bv(4, 0b1001)]}")
+assert R ^ [bv(4, 0b1101), bv(4, 0b1001)] == [1, 0]
+arr = bva(70, [0, (1 << 70) - 1, 0b1011 << 60])
+assert (R | arr).get_val() == [0, 1, 1]
+assert (R & arr).get_val() == [0, 1, 0]
+assert (R ^ arr).get_val() == [0, 0, 1]
+assert arr.popcount().get_val() == [0, 70, 3]
+
+# Bit-parallel pattern match, don't-care mask and hit mask
+a = bv(12, 0b110111011101)
+assert list(a.pattern_match(bv(4, 0b1101))) == [3, 7, 11]
+assert list(a.pattern_match(bv(3, 0b101), mask=0b101)) == [2, 4, 6, 8, 10]
+hits = a.pattern_match(bv(4, 0b1101), as_mask=True)
+print(f"hit mask of 1101 in {a}: {hits}")
+assert hits == bv(12, 0b100010001000)
+
+# Rank/select
+a = bv(1000, (1 << 999) | (1 << 600) | 0b1011)
+assert a.get_all_set_bits() == [0, 1, 3, 600, 999]
+assert len(a.get_all_reset_bits()) == 995 and a.get_all_reset_bits()[:3] == [2, 4, 5]
+assert a.rank1(4) == 3 and a.rank1(1000) == 5 and a.rank0(10) == 7
+assert a.select1(3) == 600 and a.select0(0) == 2
+a[600] = 0
+print(f"after clearing bit 600: rank1(1000)={a.rank1(1000)}, select1(3)={a.select1(3)}")
+assert a.rank1(1000) == 4 and a.select1(3) == 999
+
+# Table driven CRC
+import example
+from bitvec import crc as bvcrc
+
+check = b"123456789"
+assert bvcrc.CRC32.compute(check) == 0xCBF43926
+assert bvcrc.CRC32C.compute(check) == 0xE3069283
+assert bvcrc.CRC16_CCITT_FALSE.compute(check) == 0x29B1
+assert bvcrc.CRC16_ARC.compute(check) == 0xBB3D
+assert bvcrc.CRC8_SMBUS.compute(check) == 0xF4
+assert bvcrc.CRC64_XZ.compute(check) == 0x995DC9BBDF1939FA
+assert bvcrc.CRC(5, 0x05, 0x1F, True, True, 0x1F).compute(check) == 0x19
+assert bvcrc.CRC(3, 0x3, xorout=0x7).compute(check) == 0x4
+s = bvcrc.CRC32.new().update(b"1234").update(bv(40, int.from_bytes(b"56789", "little")))
+print(f"CRC-32 of {check} in two updates: {s.value().hex()}")
+assert s.value() == 0xCBF43926
+for _ in range(200):
+    c, d = bv(32, random.getrandbits(32)), bv(32, random.getrandbits(32))
+    assert bvcrc.CRC32.step(c, d) == example.crc_calc(c, d)
+
+# Tracing compiler
+import bitvec
+
+
+@bitvec.compile(debug=True)
+def mix(a, b, k=2):
+    s = (a[7:0] @ b[3:0]) ^ (a >> k)
+    return s, a - b, bv.R() ^ a, a.clshift(3), a.get_val() < b.get_val()
+
+
+for _ in range(100):
+    mix(bv(12, random.getrandbits(12)), bv(8, random.getrandbits(8), True))
+    mix(bv(12, random.getrandbits(12)), bv(8, random.getrandbits(8)), k=5)
+assert len(mix.cache) == 2
+add_bit = bitvec.compile(lambda a, b: (a + b, a[0]), debug=True)
+U12, I12 = bv[12], bitvec.InPlaceBitVec
+assert [type(v) for v in add_bit(U12(5), U12(7))] == [bv[13], bitvec.FrozenBitVec]
+assert add_bit(U12(5), U12(7))[0] == 12 and type(add_bit(bv(12, 5), bv(12, 7))[0]) is bv
+assert type(add_bit(I12(12, 5), 1)[0]) is bv and len(add_bit.cache) == 3
+try:
+    add_bit(bv(12, 5, backend="words"), 1)
+    assert False, "words backend arguments must not be traced"
+except bitvec.TracingError:
+    pass
+crc_fast = bitvec.compile(example.crc_calc)
+for _ in range(100):
+    c, d = bv(32, random.getrandbits(32)), bv(32, random.getrandbits(32))
+    assert crc_fast(c, d) == example.crc_calc(c, d)
+print(f"compiled crc_calc: {len(crc_fast.source(c, d).splitlines())} lines")
+try:
+    bitvec.compile(lambda a: a if a == 1 else ~a)(bv(4, 1))
+    assert False, "branch on a traced value must not compile"
+except bitvec.TracingError:
+    pass
+key_box = [1]
+keyed = bitvec.compile(lambda a: a ^ key_box[0], debug=True)
+keyed(bv(4, 3))
+key_box[0] = 2  #compiled in as a constant, so the compiled result goes stale
+try:
+    keyed(bv(4, 3))
+    assert False, "debug mode must report a mismatch"
+except bitvec.TracingError:
+    pass
+
+# GF(2) linear maps
+from bitvec.linear import LinearMap
+
+state = random.getstate()
+crc_map = LinearMap.from_function(example.crc_calc, 32, 32)
+assert random.getstate() == state, "the affinity check must not draw from the global random"
+vals = [random.getrandbits(32) for _ in range(100)]
+for v in vals:
+    assert crc_map(example.CRC_IN, bv(32, v)) == example.crc_calc(example.CRC_IN, bv(32, v))
+batch = crc_map(example.CRC_IN, bva(32, vals))
+assert batch.get_val() == [example.crc_calc(example.CRC_IN, bv(32, v)).val for v in vals]
+scramble = LinearMap.from_function(lambda d: d ^ example.KEY, 32)
+assert scramble.inverse() == scramble and scramble.offset == example.KEY.val
+step = LinearMap.from_function(lambda s: (s >> 1) ^ (0xEDB88320 if s[0] == 1 else 0), 32)
+x = y = bv(32, 0x12345678)
+for _ in range(100):
+    y = step(y)
+assert (step**100)(x) == y and (step**-100)(y) == x
+m = LinearMap.from_matrix([[1, 1, 0], [0, 1, 1]], 3)
+print(f"{m}: {m(bv(3, 0b011))}")
+assert m(bv(3, 0b011)) == 0b10 and m.rows() == [0b011, 0b110]
+try:
+    LinearMap.from_function(lambda v: v + 1, 8)
+    assert False, "addition is not linear over GF(2)"
+except ValueError:
+    pass
+
+# Batched frame pipeline of example.py
+gen = example.data_generator(bv(4, 3))
+stream = [next(gen) for _ in range(40)]
+assert example.generate_frames(3, 0, 40).get_val() == [f.val for f in stream]
+values = [f.val for f in stream]
+values[5] ^= 1 << 40
+values = values[:20] + values[23:] + [example.generate_frames(2, 50, 1).get_val()[0]]
+checker = example.data_checker(bv(4, 3))
+next(checker)
+expected = []
+for v in values:
+    expected.append(checker.send(bv(64, v)))
+    next(checker)
+first = example.check_frames(bva(64, values[:4]), 3)
+second = example.check_frames(bva(64, values[4:]), 3, first["last_seqn"])
+for res, part in ((first, expected[:4]), (second, expected[4:])):
+    for i, out in enumerate(part):
+        got = {k: res[k].at(i).get_val() for k in out}
+        assert got == {k: int(v) for k, v in out.items()}, (i, got, out)
+print(f"check_frames: good={second['good']} drops={second['drops']} "
+      f"crc_errors={second['crc_errors']} addr_errors={second['addr_errors']}")
+assert (second["drops"], second["crc_errors"], second["addr_errors"]) == (2, 1, 1)
+
+# In-place operators
+from bitvec import InPlaceBitVec
+from bitvec.inplace import BitVec as ibv
+
+acc = ibv(8, 250)
+alias = acc
+acc += 10
+acc -= bv(8, 1)
+acc ^= 0xF0
+assert acc is alias and type(acc) is InPlaceBitVec and acc.size == 8
+print(f"in-place accumulator: {acc}")
+assert acc == ((250 + 10 - 1) & 0xFF) ^ 0xF0
+c, s = bv(4).inplace(), bv(4).inplace()
+parts = (c, s)
+c += 3
+s -= 1
+assert parts[0] == 3 and parts[1] == 0xF
+a = bv(8, 100)
+a /= 7
+assert a == 14 and a.size == 8
+a = bv(8, -9, signed=True).inplace()
+a //= 2
+assert a.get_val() == -5 and a.is_signed
+
+# BitStruct layouts
+from bitvec import BitStruct
+
+frame = bv(64, 0x2D1434351B4DA2F9)
+crc, data = example.FRAME.unpack(frame)
+assert crc == bv.C(frame[7:0], frame[23:16], frame[39:32], frame[55:48])
+assert data == bv.C(frame[15:8], frame[31:24], frame[47:40], frame[63:56])
+assert example.FRAME.pack(crc=crc, data=data) == frame
+Mixed = BitStruct(16, a=[0, (5, 3), (8, 10)], b=(15, 12), c=(1, 2))
+x = bv(16, 0b1011000101111011)
+rec = Mixed.unpack(x)
+print(f"{Mixed}: {rec}")
+assert rec.a == bv.C(x[0], x[5:3], x[8:10]) and rec.b == x[15:12] and rec.c == x[1:2]
+assert Mixed.pack(**rec._asdict()) == x & ~bv(16, 0b0000100011000000)
+words = [random.getrandbits(64) for _ in range(20)]
+cols = example.FRAME.unpack(bva(64, words))
+assert cols.crc.get_val() == [r.crc.val for r in example.FRAME.unpack_all(words)]
+assert example.FRAME.pack(crc=cols.crc, data=cols.data).get_val() == words
+assert [w.val for w in example.FRAME.pack_all(example.FRAME.unpack_all(words))] == words
+hi, lo = bv(4), bv(20)
+bv.assign((hi, lo), bv(24, 0xABCDEF))
+assert hi == 0xA and lo == 0xBCDEF
+
+# Write-through views
+from bitvec import BitVecView
+
+reg = bv(64, 0x1122334455667788)
+hi = reg.view(63, 32)
+hi += 1
+assert isinstance(hi, BitVecView) and reg == 0x1122334555667788
+low = hi.view(7, 0)
+assert low.parent is reg and low.lsb == 32
+low[...] = 0xFF
+print(f"view write-through: {reg.hex()}")
+assert reg == 0x112233FF55667788 and hi == 0x112233FF
+bv.assign((reg.view(3, 0), reg.view(7, 4)), bv(8, 0xAB))
+assert reg[7:0] == 0xBA and type(hi + 1) is bv
+try:
+    reg.view(3, 4)
+    raise AssertionError("reversed view accepted")
+except IndexError:
+    pass
+
+# Record files
+import os
+import tempfile
+
+from bitvec.records import RecordFile, RecordWriter
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "frames.bv")
+    batch = example.generate_frames(1, 0, 50)
+    with RecordWriter(path, 64) as w:
+        w.write(bv(64, 0x2D1434351B4DA2F9))
+        w.write_all(batch)
+    with RecordWriter(path, 64) as w:  # appends
+        w.write_all([3, bv(64, 4)])
+    with RecordFile(path) as f:
+        print(f"record file: {f}")
+        assert len(f) == 53 and os.path.getsize(path) == 24 + 53 * 8
+        assert f[0] == 0x2D1434351B4DA2F9 and f[-1] == 4
+        assert f[1:51].get_val() == batch.get_val()
+        assert [b.count for b in f.chunks(20)] == [20, 20, 13]
+    path = os.path.join(tmp, "small.bv")
+    with RecordWriter(path, 12, signed=True) as w:
+        w.write_all(bva(12, [-1, 5, -2048], signed=True))
+    with RecordFile(path) as f:
+        assert [v.get_val() for v in f] == [-1, 5, -2048] and os.path.getsize(path) == 24 + 3 * 2
+
+# Words backend
+from bitvec import WordBitVec
+
+big = bv(1000, (1 << 999) | 0xABCD, backend="words")
+assert isinstance(big, WordBitVec) and big.backend == "words" and len(big.words) == 16
+big[500] = 1
+big[130:120] = 0x7FF
+ref = bv(1000, (1 << 999) | (1 << 500) | (0x7FF << 120) | 0xABCD)
+print(f"words backend: {big[15:0].hex()} popcount {big.popcount()}")
+assert big == ref and big[500] == 1 and big[131:119] == 0b0111111111110
+assert type(big ^ ref) is WordBitVec and (big ^ ref) == 0 and type(big + 1) is bv
+assert big.to_backend("int") == ref and type(ref.to_backend("words")) is WordBitVec
+for size in (64, 70, 128):
+    w, i = bv(size, 0, backend="words"), bv(size, 0)
+    for msb, lsb, v in ((70, 60, 0x7FF), (size + 8, size - 2, -1), (size + 9, size + 1, 5)):
+        w[msb:lsb] = v
+        i[msb:lsb] = v
+        assert w == i and len(w.words) == (size + 63) // 64
+ranked = bv(5000, (1 << 4999) | 0xFF, backend="words")
+assert ranked.rank1(5000) == 9 and ranked.rank_index() is ranked.rank_index()
+ranked[4000] = 1
+ranked[7:0] = 0
+assert ranked.rank1(5000) == 2 and ranked.select1(0) == 4000
+
+# Sparse vectors
+from bitvec.sparse import SparseBitVec
+
+dense = bv(300000, (((1 << 70000) - 1) << 100000) | (1 << 5) | (1 << 299999) | (0xF0F0 << 200000))
+sp = SparseBitVec.from_bitvec(dense)
+print(f"sparse: {sp}")
+assert [kind for _, kind, _ in sp.containers()] == ["array", "runs", "runs", "runs", "array"]
+assert sp.popcount() == dense.popcount() and sp.to_bitvec() == dense
+assert sp.get_all_set_bits() == dense.get_all_set_bits()
+other = SparseBitVec(300000, [5, 6, 100001, 200004, 299999])
+for op in ("__and__", "__or__", "__xor__"):
+    assert getattr(sp, op)(other).to_bitvec() == getattr(dense, op)(other.to_bitvec())
+assert sp.andnot(other).to_bitvec() == dense & ~other.to_bitvec()
+assert sp[100000] == 1 and sp[99999] == 0
+sp[99999] = 1
+sp[5] = 0
+assert sp == SparseBitVec.from_bitvec(dense ^ ((1 << 99999) | (1 << 5)))
+
+# Instrumentation
+xor_before = bv.__xor__
+seen = []
+with bitvec.profile(callback=lambda name, secs: seen.append(name)) as prof:
+    example.crc_calc(example.CRC_IN, bv(32, 7))
+    bv.R() | bv(4, 2)
+assert bv.__xor__ is xor_before
+stats = prof.stats
+print(f"profile: {stats['BitVec.__xor__'].calls} xors, {sum(prof.created.values())} vectors")
+assert stats["BitVec.__setitem__"].calls == 32 and stats["Reducer.__or__"].calls == 1
+assert len(seen) == sum(s.calls for s in stats.values())
+assert all(s.own <= s.total for s in stats.values())
+(site, line, func), count = prof.created.most_common(1)[0]
+assert site.endswith("example.py") and func == "crc_calc"
+assert "BitVec.__xor__" in prof.report(sort="calls", limit=3)
+
+# Width-specialized types
+import pickle
+
+from bitvec import SBitVec
+
+U32, S8 = bv[32], SBitVec[8]
+assert U32 is bv.type(32) and S8 is bv.type(8, signed=True) and U32.mask == 0xFFFFFFFF
+assert (S8.min, S8.max, S8.sign_bit) == (-128, 127, 0x80)
+u = U32(0xFFFFFFFF)
+u += 1
+print(f"specialized: {U32.__name__} {u.hex()}, {S8.__name__} {S8(-3).get_val()}")
+assert type(u) is U32 and u == 0 and u == bv(32, 0)
+assert type(U32(5) + U32(7)) is bv[33] and U32(5) + U32(7) == 12
+assert U32(3) - U32(5) == bv(32, 3) - bv(32, 5) and bv(32, 5) + U32(3) == 8
+assert S8(-3) < S8(2) and S8(-3) == -3 and (S8(-3) >> 1) == bv(8, 0xFD) >> 1
+assert type(SBitVec.unsigned(8, 200)) is bv and not SBitVec.unsigned(8, 200).is_signed
+assert type(SBitVec.from_val(100)) is SBitVec and SBitVec.from_val(100).is_signed
+assert type(SBitVec.from_val(5, signed=False)) is bv and SBitVec.from_val(5, False) == 5
+assert SBitVec(12, -1).get_val() == -1 and pickle.loads(pickle.dumps(S8(-3))) == S8(-3)
+assert type(U32.from_val(5)) is U32 and U32.from_val(5) == 5 and S8.from_val(-3) == -3
+assert type(U32.signed(32, 5)) is SBitVec[32] and U32.signed(val=-1).get_val() == -1
+assert type(U32.unsigned(16, 3)) is bv[16] and U32.u2s(bv(8, 0xFF)) == SBitVec[8](-1)
+u, w = U32(3), bv[48](1)
+with bitvec.profile() as prof:
+    U32(3) + U32(4)
+    bv[48](1) ^ bv[48](2)
+    u + u, w ^ 2, u[0]
+assert sum(prof.created.values()) == 8
+assert {"BitVec[32].__add__", "BitVec[48].__xor__"} <= set(prof.stats)
+assert not hasattr(bv[48].__xor__, "__wrapped__")
+
+# Hashable frozen vectors and the operation cache
+key = bv(8, 0xFF, True).freeze()
+assert type(key) is bitvec.FrozenBitVec and key == -1 and hash(key) == hash(-1)
+assert {key: "x"}[bitvec.FrozenBitVec(16, -1, True)] == "x" and type(key.thaw()) is bv
+wide, poly = bv(4096, (1 << 4095) | 12345), bv(33, 0x104C11DB7)
+plain = wide % poly
+with bitvec.memoize(maxsize=2, min_bits=256) as cache:
+    for _ in range(3):
+        assert wide % poly == plain and (wide * poly).val == wide.val * poly.val
+    assert list(wide.pattern_match(bv(2, 3))) == list(wide.pattern_match(bv(2, 3)))
+    print(f"op cache: {cache.info()}")
+    assert cache.info() == (5, 3, 2, 2)
+    cache.invalidate("pattern_match")
+    assert cache.info().currsize == 1
+assert bv.__mod__.__name__ == "__mod__" and not hasattr(bv.__mod__, "__wrapped__")
+W = bv[300]
+with bitvec.wrapping(), bitvec.memoize(min_bits=256) as cache:
+    for _ in range(2):
+        assert type(W(7) * W(6)) is W and W(7) * W(6) == 42 and type(bv(300, 7) * 6) is bv
+    assert cache.info()[:2] == (4, 2)
+
+# Overflow modes
+with bitvec.wrapping() as flags:
+    a = bv(8, 250)
+    for _ in range(10):
+        a = a + 1
+    print(f"wrapping: {a.size} bits {a.get_val()}, overflow {flags.overflow}")
+    assert a.size == 8 and a == 4 and flags.overflow
+    flags.clear()
+    a = a - 5
+    assert a == 255 and flags.carry and flags.overflow
+    assert (bv(64, 3) ** bv(32, 1000)).val == pow(3, 1000, 1 << 64)
+with bitvec.overflow("saturate"):
+    assert bv(8, 200) + 100 == 255 and bv(8, -100, True) * 2 == -128
+with bitvec.overflow("raise"):
+    try:
+        bv(4, 15) * 2
+        assert False
+    except OverflowError:
+        pass
+with bitvec.wrapping():
+    square = bv(8, 3, True) ** bv(8, 2)
+    assert square == 9 and not square.is_signed and not (bv(8, 3, True) ** bv(8, 2)).is_signed
+    grown = bv[8](250)
+    grown += 10
+    assert type(grown) is bv[8] and grown == 4 and type(bv[8](250) - bv[8](251)) is bv[8]
+    try:
+        bv(8, 3) ** 2
+        assert False, "an int exponent is refused as outside of the block"
+    except AttributeError:
+        pass
+    cube = bitvec.InPlaceBitVec(8, 3, True)
+    cube **= 3
+    assert cube == 27 and cube.is_signed
+with bitvec.wrapping():
+    assert U32(0xFFFFFFFF) + U32(1) == 0 and (bv[56](1 << 55) + bv[56](1 << 55)).size == 56
+assert (bv(8, 250) + 10).size == 9 and (bv[56](1 << 55) + bv[56](1 << 55)).size == 57
+add_before, mod_before = bv.__add__, bv.__mod__
+with bitvec.memoize(), bitvec.profile() as prof, bitvec.wrapping():
+    assert bv(8, 250) + 10 == 4
+assert prof.stats and bv.__add__ is add_before and bv.__mod__ is mod_before
+prof, mode = bitvec.profile().start(), bitvec.overflow("saturate").start()
+try:
+    prof.stop()
+    assert False, "stopping the outer patch first must be refused"
+except RuntimeError:
+    pass
+assert bv(8, 200) + 100 == 255
+mode.stop()
+prof.stop()
+assert bv.__add__ is add_before and (bv(8, 200) + 100).size == 9
+
+# Parallel map over shared memory
+from bitvec import parallel
+
+frames = [bv(40, 0x123456789 * i, True) for i in range(50)]
+counts = parallel.map(bv.popcount, frames, workers=2, chunk=16)
+print(f"parallel map: {len(counts)} results, first {counts[:4]}")
+assert counts == [f.popcount() for f in frames]
+assert parallel.map(bv.get_val, bva(12, [-1, 5], signed=True), workers=2) == [-1, 5]
+assert pickle.loads(pickle.dumps(frames[1])).is_signed and len(pickle.dumps(bv(32, 5))) < 48
+
+# Async stream checking
+import asyncio
+
+from bitvec.stream import StreamStats, write_array
+
+
+async def stream_sources(addrs, n):
+    queue = asyncio.Queue(maxsize=2)
+    stats = StreamStats()
+    server = await asyncio.start_server(
+        example.checker_handler(queue, batch=256, stats=stats), "127.0.0.1", 0
+    )
+    port = server.sockets[0].getsockname()[1]
+
+    async def source(addr):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(bytes([addr]))
+        await write_array(writer, example.generate_frames(addr, 0, n))
+        writer.close()
+        await writer.wait_closed()
+
+    good = dict.fromkeys(addrs, 0)
+    await asyncio.gather(*(source(a) for a in addrs))
+    while sum(good.values()) < n * len(addrs):
+        addr, result = await queue.get()
+        assert result["drops"] == result["crc_errors"] == 0
+        good[addr] += result["good"]
+    server.close()
+    await server.wait_closed()
+    return good, stats
+
+
+good, stats = asyncio.run(stream_sources([1, 2, 3], 1000))
+print(f"stream checker: {good}, {stats.batches} batches, max queue {stats.max_queue_depth}")
+assert good == {1: 1000, 2: 1000, 3: 1000} and stats.records == 3000
+assert stats.max_queue_depth <= 2
+
+# Constrained random batches
+from bitvec.rand import BitVecRandom
+
+rnd = BitVecRandom(seed=7)
+stim = rnd.between(16, 2000, -300, 300, signed=True)
+print(f"random: {stim.get_val()[:4]} ...")
+assert stim.get_val() == BitVecRandom(seed=7).between(16, 2000, -300, 300, signed=True).get_val()
+assert all(-300 <= v <= 300 for v in stim.get_val()) and len(set(stim.get_val())) > 500
+assert all(v.val & 0xF0 == 0xA0 for v in rnd.uniform(12, 100, mask=0xF0, value=0xA5))
+assert all(v.val.bit_count() == 1 for v in rnd.onehot(20, 100))
+assert all(v.popcount() == 5 for v in rnd.popcount(40, 100, 5).tolist())
+assert set(rnd.choice(8, 200, [3, 9], weights=[1, 3]).get_val()) == {3, 9}
+assert all(v < 4 or v >= 250 for v in rnd.dist(8, 200, [(0, 3, 1), (250, 255, 1)]).get_val())
+
+# Bit-sliced evaluation
+from bitvec.bitslice import bitslice_map, slice_bits, transpose64, unslice_bits
+
+frames = BitVecRandom(seed=3).uniform(32, 1000)
+crcs = bitslice_map(example.crc_calc, example.CRC_IN, frames)
+print(f"bitslice crc: {crcs.get_val()[:3]} ...")
+assert crcs.get_val() == [example.crc_calc(example.CRC_IN, v).get_val() for v in frames]
+rows = BitVecRandom(seed=4).uniform(64, 128).get_val()
+cols = transpose64(sum(v << (64 * i) for i, v in enumerate(rows)), 2)
+assert all((cols >> (64 * (64 * b + r)) >> c) & 1 == (rows[64 * b + c] >> r) & 1 for b in (0, 1) for r in range(64) for c in range(64))
+wide = bva(100, [3 << 97, 12345, 7], signed=True)
+assert unslice_bits(slice_bits(wide), 100, 3, True).get_val() == wide.get_val()
+
+
+def mixed(x, y):
+    return x + y, x - (y >> 2), bv(1, x < y), bv(4, (x ^ ~y).popcount())
+
+
+a, b = bva(8, range(0, 256, 3), signed=True), bva(8, range(86, 0, -1))
+out = bitslice_map(mixed, a, b)
+ordered = bitslice_map(lambda x, y: bv(1, x <= y) @ bv(1, x >= y), bva(8, [1, 2]), bva(8, [5, 6]))
+assert ordered.get_val() == [0b10, 0b10]
+for i, (x, y) in enumerate(zip(a, b)):
+    assert [(o.at(i).size, o.at(i).val, o.at(i).is_signed) for o in out] == [
+        (v.size, v.val, v.is_signed) for v in mixed(x, y)
+    ]
@@ -25,11 +25,23 @@ crc == crc' for validity
 
 '''
 
+from functools import lru_cache
+
+from bitvec import BitStruct
 from bitvec import BitVec as bv
+from bitvec import BitVecArray as bva
+from bitvec.linear import LinearMap
+from bitvec.stream import read_arrays
 
 KEY = bv(32, 0xa21b345c) #this data is used to "scramble" the data fields
 CRC_IN = bv(32, 0x1234abcd)
 
+#data_out: crc and scrambled data bytes interleaved
+FRAME = BitStruct(64, crc =[(7 , 0), (23, 16), (39, 32), (55, 48)],
+                      data=[(15, 8), (31, 24), (47, 40), (63, 56)])
+#unscrambled data field
+DATA = BitStruct(32, seqn=(31, 4), addr=(3, 0))
+
 def crc_calc(crc_in, data):
     '''Calculates 32b CRC'''
     crc = bv(32, 0x0)
@@ -81,10 +93,7 @@ def data_generator(src_addr):
         data = (cnt @ src_addr) ^ KEY
         crc = crc_calc(CRC_IN, data)
         cnt[::] += 1
-        data_out = bv.C(data[7 :0 ], crc[7 :0 ],
-                        data[15:8 ], crc[15:8 ],
-                        data[23:16], crc[23:16],
-                        data[31:24], crc[31:24])
+        data_out = FRAME.pack(crc=crc, data=data)
 
         yield data_out
 
@@ -102,14 +111,12 @@ def data_checker(src_addr):
     is_first_data = True
     while True:
         data = yield
-        crc        = bv.C( data[7:0 ], data[23:16], data[39:32], data[55:48])
-        data_field = bv.C( data[15:8], data[31:24], data[47:40], data[63:56])
+        crc, data_field = FRAME.unpack(data)
         #check if crc is valid
         crc_c = crc_calc(CRC_IN, data_field)
 
         data_unscr = data_field ^ KEY
-        data_addr = data_unscr[3:0]
-        data_seqn = data_unscr[31:4]
+        data_seqn, data_addr = DATA.unpack(data_unscr)
 
         out = {
             'GOOD': True, 
@@ -137,6 +144,120 @@ def data_checker(src_addr):
         yield out
 
 
+@lru_cache(maxsize=None)
+def crc_map():
+    '''crc_calc(CRC_IN, data) as a LinearMap of data, built on first use'''
+    return LinearMap.from_function(lambda data: crc_calc(CRC_IN, data), 32)
+
+
+def generate_frames(src_addr, start_seq, n):
+    '''
+    Batch version of data_generator
+
+    Returns a 64 bit BitVecArray with the frames for sequence numbers
+    start_seq .. start_seq+n-1 (wrapping at 28 bits)
+    '''
+    cnt = bva(28, range(start_seq, start_seq + n))
+    data = (cnt @ bv(4, src_addr)) ^ KEY
+    crc = crc_map()(data)
+    return FRAME.pack(crc=crc, data=data)
+
+
+def check_frames(frames, src_addr, prev_seqn=None):
+    '''
+    Batch version of data_checker
+
+    frames is a 64 bit BitVecArray. Returns a dictionary with one column
+    (a BitVecArray) per field of the data_checker output, with the same
+    values data_checker gives for the frames in order, and the counters
+    'good', 'drops', 'crc_errors', 'addr_errors' and 'last_seqn'.
+
+    prev_seqn is the sequence number of the last good frame before this
+    batch (None: no frame seen yet, like a new data_checker); pass the
+    returned 'last_seqn' to continue a stream over several batches.
+    '''
+    n = len(frames)
+    crc, data_field = FRAME.unpack(frames)
+    crc_pass = crc == crc_map()(data_field)
+
+    data_unscr = data_field ^ KEY
+    data_seqn, data_addr = DATA.unpack(data_unscr)
+    addr_ok = data_addr == bv(4, src_addr)
+    good = crc_pass & addr_ok
+
+    #seqn of the last good frame up to each frame, filled forward over the
+    #frames that are not good by doubling the look-back distance
+    last = data_seqn & (28 @ good)
+    have = good
+    step = 1
+    while step < n and (~have).packed:
+        last = last | (last.shift_elements(step) & (28 @ ~have))
+        have = have | have.shift_elements(step)
+        step *= 2
+    first = prev_seqn is None
+    if not first:
+        #frames before the first good one follow prev_seqn
+        last = last | ((28 @ ~have) & bv(28, prev_seqn))
+        have = have | 1
+
+    p_seqn = last.shift_elements(1, 0 if first else prev_seqn)
+    has_prev = have.shift_elements(1, 0 if first else 1)
+    drop = good & has_prev & ((p_seqn + 1)[27:0] != data_seqn)
+
+    if n and have.at(n - 1) == 1:
+        last_seqn = last.at(n - 1).get_val()
+    else:
+        last_seqn = prev_seqn
+    return {
+        'GOOD': good,
+        'DROP': drop,
+        'CRC_PASS': crc_pass,
+        'IS_VLD_ADRR': ~crc_pass | addr_ok,
+        'PREV_SEQN': p_seqn,
+        'PRESENT_SEQN': data_seqn,
+        'good': good.packed.bit_count(),
+        'drops': drop.packed.bit_count(),
+        'crc_errors': n - crc_pass.packed.bit_count(),
+        'addr_errors': (crc_pass & ~addr_ok).packed.bit_count(),
+        'last_seqn': last_seqn,
+    }
+
+
+async def stream_checker(reader, src_addr, queue, batch=4096, stats=None, prev_seqn=None):
+    '''
+    Async version of data_checker for frames arriving on an asyncio StreamReader
+
+    Frames are read as 8 byte little endian records, up to batch at a time,
+    checked with check_frames (the sequence continues across batches) and
+    put on queue as (src_addr, result). With a bounded queue the put waits
+    while the consumer is behind, which stops the reads, so TCP flow control
+    slows the sender down. Returns the seqn of the last good frame.
+    '''
+    async for frames in read_arrays(reader, 64, batch, stats=stats):
+        result = check_frames(frames, src_addr, prev_seqn)
+        prev_seqn = result['last_seqn']
+        await queue.put((src_addr, result))
+        if stats is not None:
+            stats.observe(queue)
+    return prev_seqn
+
+
+def checker_handler(queue, batch=4096, stats=None):
+    '''
+    Connection callback for asyncio.start_server / start_unix_server
+
+    Every connection is one source: its first byte is the 4 bit src addr,
+    followed by the frames. All connections publish to the same queue.
+    '''
+    async def handle(reader, writer):
+        try:
+            src_addr = (await reader.readexactly(1))[0] & 0xf
+            await stream_checker(reader, src_addr, queue, batch, stats)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+    return handle
+
 
 if __name__ == '__main__':
     gen = data_generator(bv(4, 0x1))
@@ -153,3 +274,12 @@ if __name__ == '__main__':
         check = checker.send(data)
         print(f"   CHECK: {check}")
         next(checker)
+
+    #same protocol, a batch at a time
+    values = generate_frames(0x1, 8, 1000).get_val()
+    values[500] ^= 1 #corrupting a single bit
+    frames = bva(64, values[:100] + values[110:]) #dropping 10 frames
+    result = check_frames(frames, 0x1, prev_seqn=7)
+    print(f"\nbatch of {len(frames)}: good={result['good']} drops={result['drops']} "
+          f"crc_errors={result['crc_errors']} addr_errors={result['addr_errors']} "
+          f"last_seqn={result['last_seqn']}")